@@ -0,0 +1,136 @@
+import gzip, os, re
+
+try:
+    import brotli
+except ImportError:  # opcional: sin el módulo no se escribe el .br
+    brotli = None
+
+VENDOR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'vendor')
+CSS_MARK = '<!--bundle:css-->'
+CLASS_RE = re.compile(r'\.(-?[A-Za-z_][\w-]*)')
+TOKEN_RE = re.compile(r'[A-Za-z_][\w-]*')
+BLOCK_RE = re.compile(r'(<(script|style)\b[^>]*>)(.*?)(</\2>)', re.S | re.I)
+
+
+class BudgetError(Exception):
+    pass
+
+
+def read_text(path):
+    # Los assets de la action (style.css, script.js, vendor/) se leen del disco o, dentro del zipapp de
+    # scripts/build_cli.py, del propio .pyz (la ruta queda por debajo del fichero y open() da ENOTDIR)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read()
+    except NotADirectoryError:
+        return __loader__.get_data(path).decode('utf-8')
+
+def vendor(name):
+    return read_text(os.path.join(VENDOR, name))
+
+def _split_top(text, sep):
+    # Divide por `sep` fuera de paréntesis (los selectores :not(a, b) no se parten)
+    parts, depth, cur = [], 0, []
+    for ch in text:
+        if ch == '(':
+            depth += 1
+        elif ch == ')':
+            depth -= 1
+        if ch == sep and depth == 0:
+            parts.append(''.join(cur))
+            cur = []
+        else:
+            cur.append(ch)
+    parts.append(''.join(cur))
+    return parts
+
+def _blocks(css):
+    # (prelude, cuerpo) de cada regla de primer nivel; los @media se devuelven con su contenido sin procesar
+    i, n = 0, len(css)
+    while i < n:
+        start = css.find('{', i)
+        if start < 0:
+            return
+        depth, j = 1, start + 1
+        while j < n and depth:
+            if css[j] == '{':
+                depth += 1
+            elif css[j] == '}':
+                depth -= 1
+            j += 1
+        yield css[i:start].strip(), css[start+1:j-1]
+        i = j
+
+def subset_css(css, used):
+    # Conserva solo los selectores cuyas clases aparecen en `used`; @media/@supports se recortan por dentro
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    out = []
+    for prelude, body in _blocks(css):
+        if prelude.startswith(('@media', '@supports')):
+            inner = subset_css(body, used)
+            if inner:
+                out.append(f'{prelude}{{{inner}}}')
+        elif prelude.startswith('@'):
+            out.append(f'{prelude}{{{body}}}')
+        else:
+            sels = [s.strip() for s in _split_top(prelude, ',') if all(c in used for c in CLASS_RE.findall(s))]
+            if sels:
+                out.append(f"{','.join(sels)}{{{body}}}")
+    return ''.join(out)
+
+def minify_css(css):
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r'\s*([{};,>])\s*', r'\1', css)
+    css = re.sub(r':\s+', ':', css)
+    return css.replace(';}', '}').strip()
+
+def minify_js(js):
+    # Conservador (sin parser): quita comentarios de línea completa, sangrías y líneas vacías; mantiene los saltos
+    # de línea para no depender de la inserción automática de ';'
+    lines = (l.strip() for l in js.splitlines())
+    return '\n'.join(l for l in lines if l and not l.startswith('//'))
+
+def minify_html(html):
+    # Fuera de <script>/<style> basta con colapsar espacios: entre badges inline el espacio es significativo
+    out, pos = [], 0
+    for m in BLOCK_RE.finditer(html):
+        out.append(re.sub(r'\s+', ' ', html[pos:m.start()]))
+        open_tag, tag, body, close = m.group(1), m.group(2).lower(), m.group(3), m.group(4)
+        if tag == 'style':
+            body = minify_css(body)
+        elif 'application/json' not in open_tag and 'src=' not in open_tag:
+            body = minify_js(body)
+        out.append(open_tag + body + close)
+        pos = m.end()
+    out.append(re.sub(r'\s+', ' ', html[pos:]))
+    return ''.join(out)
+
+def finalize(path, budget_kb=0, css_path=''):
+    # Sustituye CSS_MARK por el subconjunto de Bootstrap que usa el documento, minifica y escribe .gz/.br.
+    # Las clases se buscan en todo el texto (HTML y JS inline), así entran también las que pinta script.js.
+    with open(path, 'r', encoding='utf-8') as f:
+        html = f.read()
+    if css_path:
+        with open(css_path, 'r', encoding='utf-8') as f:
+            css = f.read()
+    else:
+        css = vendor('bootstrap-subset.css')
+    used = set(TOKEN_RE.findall(html))
+    html = minify_html(html.replace(CSS_MARK, f'<style>{subset_css(css, used)}</style>', 1))
+    data = html.encode('utf-8')
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+    sizes = {'html': len(data)}
+    with open(path + '.gz', 'wb') as f:
+        f.write(gzip.compress(data, 9, mtime=0))
+    sizes['gz'] = os.path.getsize(path + '.gz')
+    if brotli is not None:
+        with open(path + '.br', 'wb') as f:
+            f.write(brotli.compress(data, quality=11))
+        sizes['br'] = os.path.getsize(path + '.br')
+    if budget_kb and len(data) > budget_kb * 1024:
+        raise BudgetError(f"el bundle ocupa {len(data)/1024:.0f} KiB y supera el presupuesto de {budget_kb:g} KiB")
+    return sizes
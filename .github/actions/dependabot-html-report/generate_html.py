@@ -1,190 +1,190 @@
-import json, os, re
-from datetime import datetime, timezone
+import json, os, sys
 
-def main():
+for _p in [os.getenv('SCRIPTS_PATH',''), os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'scripts'), os.path.join('.reusable-scripts', 'scripts'), 'scripts']:
+    if _p and os.path.exists(os.path.join(_p, 'pr_records.py')):
+        sys.path.insert(0, os.path.abspath(_p))
+        break
+
+from pr_records import normalize_all, empty_agg, UPDATE_TYPES
+from collect_alerts import iter_alerts
+from dataset import Dataset, load_prs, load_records
+import charts
+import bundle
+import trends
+from profiling import phase, step
+from tracing import log
+
+STATES = ('open', 'merged', 'closed')
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Opciones de build_html; options_from_env() las lee de las variables de la action
+DEFAULTS = {
+    'html_path': 'docs/dependabot-report.html',
+    'issue_url': '',
+    'action_path': HERE,          # style.css y script.js
+    'repository': '',
+    'server_url': 'https://github.com',
+    'run_id': '',
+    'company': 'PRB',
+    'logo_url': 'https://extranet.prb.com.mx/Prb1.2/images/logos/logo_PRB.svg',
+    'stream': True,
+    'mode': 'auto',               # rows | island | auto (island a partir de island_min PRs)
+    'island_min': 2000,
+    'bundle': 'cdn',              # cdn | offline
+    'size_budget_kb': 0,
+    'bootstrap_css': '',
+    'alerts': None,               # iterable de alertas ya cargadas (tiene prioridad sobre alerts_file/alerts_json)
+    'alerts_file': '',
+    'alerts_json': '',
+    'trends': None,               # resumen ya calculado (trends.summary, lo pasa render_pipeline); si no, se lee de trends_db
+    'trends_db': '',
+}
+
+def island_payload(rows, pull_base):
+    # Columnas como arrays (una entrada por PR). Paquete, versiones, directorio, ecosistema y fecha son índices
+    # a `strings`, los labels índices a `labels`; la URL es 0 cuando coincide con pull_base + número.
+    strings, labels = {'': 0}, {}
+    sid = lambda v: strings.setdefault(v or '', len(strings))
+    cols = {k: [] for k in ('num','name','from','to','dir','eco','state','type','labels','created','url')}
+    for r in rows:
+        cols['num'].append(r.number)
+        cols['name'].append(sid(r.name))
+        cols['from'].append(sid(r.from_ver))
+        cols['to'].append(sid(r.to_ver))
+        cols['dir'].append(sid(r.directory))
+        cols['eco'].append(sid(r.ecosystem))
+        cols['state'].append(STATES.index(r.state or 'open'))
+        cols['type'].append(UPDATE_TYPES.index(r.update_type))
+        cols['labels'].append([labels.setdefault((l.get('name',''), l.get('color','0d6efd')), len(labels)) for l in r.labels])
+        cols['created'].append(sid(r.created.strftime('%Y-%m-%d') if r.created else ''))
+        cols['url'].append(0 if pull_base and r.url == f"{pull_base}{r.number}" else (r.url or '#'))
+    return {'v': 1, 'states': STATES, 'types': UPDATE_TYPES, 'base': pull_base, 'strings': list(strings),
+            'labels': [list(k) for k in labels], 'cols': cols}
+
+def options_from_env():
     try:
-        raw = os.getenv('PRS_DATA', '')
-        if raw.strip():
-            prs = json.loads(raw)
-        elif os.path.exists('docs/prs.json'):
-            with open('docs/prs.json', 'r') as f:
-                prs = json.load(f)
-        else:
-            prs = []
-    except Exception:
-        prs = []
-
-    html_path = os.getenv('HTML_PATH', 'docs/dependabot-report.html')
-    os.makedirs(os.path.dirname(html_path), exist_ok=True)
-    issue_url = os.getenv('ISSUE_URL', '')
-    action_path = os.getenv('ACTION_PATH', '.')
-
-    # Helper functions
-    def parse_title(t):
-        m = re.search(r"bump\s+([^\s]+)\s+from\s+([^\s]+)\s+to\s+([^\s]+)(?:\s+in\s+(.+))?", t, re.IGNORECASE)
-        if m:
-            return {'name': m.group(1), 'from': m.group(2), 'to': m.group(3), 'dir': m.group(4) or ''}
-        return {'name': '—', 'from': '', 'to': '', 'dir': ''}
-
-    def semver_tuple(s):
-        nums = [int(x) for x in re.findall(r"\d+", s)[:3]]
-        while len(nums) < 3:
-            nums.append(0)
-        return tuple(nums)
-
-    def update_type(f, t):
-        if not f or not t:
-            return 'other'
-        fM, fm, fp = semver_tuple(f)
-        tM, tm, tp = semver_tuple(t)
-        if tM != fM:
-            return 'major'
-        if tm != fm:
-            return 'minor'
-        if tp != fp:
-            return 'patch'
-        return 'other'
-
-    def directory_of(pr):
-        meta = parse_title(pr.get('title', ''))
-        if meta.get('dir'):
-            return meta['dir']
-        ref = pr.get('headRefName', '')
-        if '/' in ref:
-            parts = ref.split('/')
-            try:
-                idx = parts.index('dependabot')
-                if idx >= 0 and len(parts) > idx + 2:
-                    return '/' + '/'.join(parts[idx + 2:-1])
-            except Exception:
-                pass
-        return '/'
-
-    def ecosystem_of(pr):
-        ref = pr.get('headRefName', '')
-        if '/' in ref:
-            parts = ref.split('/')
-            try:
-                idx = parts.index('dependabot')
-                if idx >= 0 and len(parts) > idx + 1:
-                    eco = parts[idx + 1]
-                    return 'npm' if eco == 'npm_and_yarn' else eco
-            except Exception:
-                pass
-        return 'unknown'
-
-    def sanitize_dir_path(s, eco_hint=''):
-        try:
-            d = (s or '/').strip().replace('\\', '/')
-            if not d:
-                d = '/'
-            if d == '/':
-                return '/'
-            eco = (eco_hint or '').lower()
-            eco = 'github-actions' if eco == 'github_actions' else eco
-            if d.startswith('/main/') or d == '/main':
-                return '/.github/workflows' if eco == 'github-actions' else '/'
-            if ' ' in d:
-                return '/.github/workflows' if eco == 'github-actions' else '/'
-            first = d.split('/')[1] if d.startswith('/') and len(d.split('/')) > 1 else d.split('/')[0]
-            if eco == 'github-actions' and first in ['actions', 'appleboy', 'main']:
-                return '/.github/workflows'
-            if '/main' in d:
-                parts = [seg for seg in d.split('/') if seg and seg != 'main']
-                d2 = '/' + '/'.join(parts)
-                return '/' if d2 == '/' else d2
-            return d
-        except Exception:
-            return '/'
-
-    # Aggregation logic
-    total_agg = {'major': 0, 'minor': 0, 'patch': 0, 'other': 0}
+        island_min = int(os.getenv('HTML_ISLAND_MIN', '2000') or 2000)
+    except ValueError:
+        island_min = 2000
+    try:
+        budget = float(os.getenv('HTML_SIZE_BUDGET_KB', '0') or 0)
+    except ValueError:
+        budget = 0
+    return dict(DEFAULTS,
+        html_path=os.getenv('HTML_PATH', 'docs/dependabot-report.html'),
+        issue_url=os.getenv('ISSUE_URL', ''),
+        action_path=os.getenv('ACTION_PATH', '') or HERE,
+        repository=os.getenv('GITHUB_REPOSITORY', ''),
+        server_url=os.getenv('GITHUB_SERVER_URL', 'https://github.com'),
+        run_id=os.getenv('GITHUB_RUN_ID', '') or os.getenv('RUN_ID', ''),
+        company=(os.getenv('COMPANY_NAME', 'PRB') or 'PRB').strip(),
+        logo_url=os.getenv('LOGO_URL', DEFAULTS['logo_url']),
+        stream=os.getenv('HTML_STREAM', 'true').lower() != 'false',
+        mode=os.getenv('HTML_MODE', 'auto').lower(),
+        island_min=island_min,
+        bundle=os.getenv('HTML_BUNDLE', 'cdn').lower(),
+        size_budget_kb=budget,
+        bootstrap_css=os.getenv('BOOTSTRAP_CSS', '').strip(),
+        alerts_file=os.getenv('ALERTS_FILE', '').strip(),
+        alerts_json=os.getenv('ALERTS_JSON', '').strip(),
+        trends_db=os.getenv('TRENDS_DB', '').strip(),
+    )
+
+def build_html(dataset, options=None):
+    # Genera el HTML y devuelve {'path', 'mode', 'prs', 'alerts', 'sizes'}. No lee variables de entorno: todo va en
+    # `options` (claves de DEFAULTS). Con bundle offline y size_budget_kb superado lanza bundle.BudgetError.
+    opts = dict(DEFAULTS, **(options or {}))
+    dataset_path = dataset if isinstance(dataset, (str, os.PathLike)) else ''
+    step('html.load')
+    prs = load_prs(dataset)
+
+    html_path = opts['html_path']
+    os.makedirs(os.path.dirname(html_path) or '.', exist_ok=True)
+    issue_url = opts['issue_url']
+    action_path = opts['action_path']
+
+    # Primera pasada: agregados y KPIs, y PRs agrupados por estado para las secciones del listado
+    step('html.aggregate')
+    total_agg = empty_agg()
     dir_agg = {}
     eco_agg = {}
-    rows = []
-
-    for pr in prs:
-        meta = parse_title(pr.get('title', ''))
-        typ = update_type(meta.get('from', ''), meta.get('to', ''))
-        total_agg[typ] = total_agg.get(typ, 0) + 1
-        e = ecosystem_of(pr)
-        d_raw = directory_of(pr)
-        d = sanitize_dir_path(d_raw, e)
-        dir_agg.setdefault(d, {'major': 0, 'minor': 0, 'patch': 0, 'other': 0})
-        dir_agg[d][typ] += 1
-        eco_agg.setdefault(e, {'major': 0, 'minor': 0, 'patch': 0, 'other': 0})
-        eco_agg[e][typ] += 1
-        labels = ', '.join([l.get('name', '') for l in pr.get('labels', [])]) or '—'
-        created = pr.get('createdAt', '')
-        try:
-            created_fmt = datetime.fromisoformat(created.replace('Z', '+00:00')).strftime('%Y-%m-%d')
-        except Exception:
-            created_fmt = 'N/A'
-        rows.append({
-            'num': pr.get('number', ''),
-            'name': meta['name'],
-            'from': meta['from'],
-            'to': meta['to'],
-            'dir': d,
-            'eco': e,
-            'state': pr.get('state', 'open'),
-            'labels': labels,
-            'labels_list': pr.get('labels', []),
-            'created': created_fmt,
-            'created_iso': created,
-            'url': pr.get('url', '#')
-        })
+    rows = normalize_all(prs)
+    by_state = {k: [] for k in STATES}
+
+    for rec in rows:
+        typ = rec.update_type
+        total_agg[typ] += 1
+        dir_agg.setdefault(rec.directory, empty_agg())[typ] += 1
+        eco_agg.setdefault(rec.ecosystem, empty_agg())[typ] += 1
+        bucket = by_state.get(rec.state or 'open')
+        if bucket is not None:
+            bucket.append(rec)
 
     # Prepare HTML content
-    repo = os.getenv('GITHUB_REPOSITORY', '')
-    server_url = os.getenv('GITHUB_SERVER_URL', 'https://github.com')
-    run_id = os.getenv('GITHUB_RUN_ID', '') or os.getenv('RUN_ID', '')
+    step('html.render')
+    repo = opts['repository']
+    server_url = opts['server_url']
+    run_id = opts['run_id']
     run_link = f"{server_url}/{repo}/actions/runs/{run_id}" if run_id else ''
     owner = repo.split('/')[0] if '/' in (repo or '') else (repo or '')
     org_link = f"{server_url}/{owner}" if owner else ''
-    company = (os.getenv('COMPANY_NAME', 'PRB') or 'PRB').strip()
-    logo_url = os.getenv('LOGO_URL', 'https://extranet.prb.com.mx/Prb1.2/images/logos/logo_PRB.svg')
+    company = opts['company'] or 'PRB'
+    logo_url = opts['logo_url']
+    trend = opts['trends'] if opts['trends'] is not None else trends.load_summary(opts['trends_db'], repo)
+    trends_nav = '<li class="nav-item"><a class="nav-link" href="#tendencias">Tendencias</a></li>' if trend else ''
 
     # Read CSS and JS
     try:
-        with open(os.path.join(action_path, 'style.css'), 'r') as f:
-            css_content = f.read()
-    except FileNotFoundError:
+        css_content = bundle.read_text(os.path.join(action_path, 'style.css'))
+    except OSError:
         css_content = ''
     
     try:
-        with open(os.path.join(action_path, 'script.js'), 'r') as f:
-            js_content = f.read()
-    except FileNotFoundError:
+        js_content = bundle.read_text(os.path.join(action_path, 'script.js'))
+    except OSError:
         js_content = ''
 
-    html = []
-    html.append('<!doctype html><html data-bs-theme="dark"><head><meta charset="utf-8"><title>Reporte Dependabot</title>')
-    html.append('<meta name="viewport" content="width=device-width, initial-scale=1">')
-    html.append('<link href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.2/dist/css/bootstrap.min.css" rel="stylesheet">')
-    html.append(f'<style>{css_content}</style>')
-    html.append('</head><body>')
+    # stream (HTML_STREAM, por defecto): cada sección se escribe al fichero según se genera, sin acumular el documento.
+    # HTML_STREAM=false conserva el modo anterior (lista de fragmentos + join al final).
+    stream = opts['stream']
+    # mode (HTML_MODE): rows (un <tr> por PR), island (PRs en un JSON embebido y tabla virtualizada en el cliente)
+    # o auto (island a partir de HTML_ISLAND_MIN PRs)
+    mode = (opts['mode'] or 'auto').lower()
+    if mode not in ('rows', 'island'):
+        mode = 'island' if len(rows) >= opts['island_min'] else 'rows'
+    tmp_path = html_path + '.tmp'
+    out = open(tmp_path, 'w', encoding='utf-8', buffering=1 << 16)
+    parts = []
+    w = out.write if stream else parts.append
+    # HTML_BUNDLE=offline: sin CDN (subconjunto de Bootstrap, collapse y gráficas mínimas de vendor/), minificado y con .gz/.br
+    offline = opts['bundle'] == 'offline'
+
+    w('<!doctype html><html data-bs-theme="dark"><head><meta charset="utf-8"><title>Reporte Dependabot</title>')
+    w('<meta name="viewport" content="width=device-width, initial-scale=1">')
+    w(bundle.CSS_MARK if offline else '<link href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.2/dist/css/bootstrap.min.css" rel="stylesheet">')
+    w(f'<style>{css_content}</style>')
+    w('</head><body>')
     
     # Navbar
-    html.append(f'<nav class="navbar navbar-expand-md fixed-top bg-body-tertiary border-bottom"><div class="container"><a class="navbar-brand d-flex align-items-center" href="#"><img src="{logo_url}" alt="{company}" height="24" class="me-2">{company}</a><button class="navbar-toggler" type="button" data-bs-toggle="collapse" data-bs-target="#topNav" aria-controls="topNav" aria-expanded="false" aria-label="Toggle navigation"><span class="navbar-toggler-icon"></span></button><div class="collapse navbar-collapse" id="topNav"><ul class="navbar-nav ms-auto me-2"><li class="nav-item"><a class="nav-link" href="#listado">PRs</a></li><li class="nav-item"><a class="nav-link" href="#resumen">Resumen</a></li><li class="nav-item"><a class="nav-link" href="#dir">Directorios</a></li><li class="nav-item"><a class="nav-link" href="#eco">Ecosistemas</a></li><li class="nav-item"><a class="nav-link" href="#alertas">Alertas</a></li><li class="nav-item"><a class="nav-link" href="#recomendaciones">Recomendaciones</a></li><li class="nav-item"><a class="nav-link" href="#dir-detalles">Detalles</a></li><li class="nav-item"><a class="nav-link" href="{server_url}/{repo}" target="_blank" rel="noopener"><svg xmlns="http://www.w3.org/2000/svg" width="18" height="18" viewBox="0 0 16 16" fill="currentColor" class="me-1"><path d="M8 0C3.58 0 0 3.58 0 8c0 3.54 2.29 6.53 5.47 7.59.4.07.55-.17.55-.38 0-.19-.01-.82-.01-1.49-2.01 .37-2.53-.49-2.69-.94-.09-.23-.48-.94-.82-1.13-.28-.15-.68-.52-.01-.53.63-.01 1.08.58 1.23.82.72 1.21 1.87.87 2.33 .66 .07-.52 .28-.87 .51-1.07-1.78-.2-3.64-.89-3.64-3.95 0-.87 .31-1.59 .82-2.15-.08-.2-.36-1.02 .08-2.12 0 0 .67-.21 2.2 .82 .64-.18 1.32-.27 2-.27s1.36 .09 2 .27c1.53-1.04 2.2-.82 2.2-.82 .44 1.1 .16 1.92 .08 2.12 .51 .56 .82 1.27 .82 2.15 0 3.07-1.87 3.75-3.65 3.95 .29 .25 .54 .73 .54 1.48 0 1.07-.01 1.93-.01 2.2 0 .21 .15 .46 .55 .38A8.013 8.013 0"></path></svg><code>{repo or "—"}</code></a></li></ul></div></div></nav>')
+    w(f'<nav class="navbar navbar-expand-md fixed-top bg-body-tertiary border-bottom"><div class="container"><a class="navbar-brand d-flex align-items-center" href="#"><img src="{logo_url}" alt="{company}" height="24" class="me-2">{company}</a><button class="navbar-toggler" type="button" data-bs-toggle="collapse" data-bs-target="#topNav" aria-controls="topNav" aria-expanded="false" aria-label="Toggle navigation"><span class="navbar-toggler-icon"></span></button><div class="collapse navbar-collapse" id="topNav"><ul class="navbar-nav ms-auto me-2"><li class="nav-item"><a class="nav-link" href="#listado">PRs</a></li><li class="nav-item"><a class="nav-link" href="#resumen">Resumen</a></li><li class="nav-item"><a class="nav-link" href="#dir">Directorios</a></li><li class="nav-item"><a class="nav-link" href="#eco">Ecosistemas</a></li>{trends_nav}<li class="nav-item"><a class="nav-link" href="#alertas">Alertas</a></li><li class="nav-item"><a class="nav-link" href="#recomendaciones">Recomendaciones</a></li><li class="nav-item"><a class="nav-link" href="#dir-detalles">Detalles</a></li><li class="nav-item"><a class="nav-link" href="{server_url}/{repo}" target="_blank" rel="noopener"><svg xmlns="http://www.w3.org/2000/svg" width="18" height="18" viewBox="0 0 16 16" fill="currentColor" class="me-1"><path d="M8 0C3.58 0 0 3.58 0 8c0 3.54 2.29 6.53 5.47 7.59.4.07.55-.17.55-.38 0-.19-.01-.82-.01-1.49-2.01 .37-2.53-.49-2.69-.94-.09-.23-.48-.94-.82-1.13-.28-.15-.68-.52-.01-.53.63-.01 1.08.58 1.23.82.72 1.21 1.87.87 2.33 .66 .07-.52 .28-.87 .51-1.07-1.78-.2-3.64-.89-3.64-3.95 0-.87 .31-1.59 .82-2.15-.08-.2-.36-1.02 .08-2.12 0 0 .67-.21 2.2 .82 .64-.18 1.32-.27 2-.27s1.36 .09 2 .27c1.53-1.04 2.2-.82 2.2-.82 .44 1.1 .16 1.92 .08 2.12 .51 .56 .82 1.27 .82 2.15 0 3.07-1.87 3.75-3.65 3.95 .29 .25 .54 .73 .54 1.48 0 1.07-.01 1.93-.01 2.2 0 .21 .15 .46 .55 .38A8.013 8.013 0"></path></svg><code>{repo or "—"}</code></a></li></ul></div></div></nav>')
     
-    html.append('<div class="container my-4">')
+    w('<div class="container my-4">')
     if issue_url:
-        html.append(f'<div class="alert alert-secondary py-2">🧾 Reporte consolidado: <a href="{issue_url}" target="_blank" rel="noopener" class="text-decoration-none">{issue_url}</a></div>')
+        w(f'<div class="alert alert-secondary py-2">🧾 Reporte consolidado: <a href="{issue_url}" target="_blank" rel="noopener" class="text-decoration-none">{issue_url}</a></div>')
     
-    html.append(f'<h1 class="mb-3">Reporte Dependabot</h1><p class="text-muted">Repositorio: <a href="{server_url}/{repo}" target="_blank" rel="noopener" class="text-decoration-none"><code>{repo or "—"}</code></a></p>')
+    w(f'<h1 class="mb-3">Reporte Dependabot</h1><p class="text-muted">Repositorio: <a href="{server_url}/{repo}" target="_blank" rel="noopener" class="text-decoration-none"><code>{repo or "—"}</code></a></p>')
 
     # KPIs
-    open_rows = [r for r in rows if r['state'] == 'open']
-    merged_rows = [r for r in rows if r['state'] == 'merged']
-    closed_rows = [r for r in rows if r['state'] == 'closed']
+    open_rows = by_state['open']
+    merged_rows = by_state['merged']
+    closed_rows = by_state['closed']
 
-    html.append('<div class="row g-3 mb-2">')
-    html.append(f'<div class="col-md-3"><div class="kpi kpi-primary"><div class="fw-bold">📦 PRs totales</div><div class="display-6">{len(rows)}</div></div></div>')
-    html.append(f'<div class="col-md-3"><div class="kpi kpi-warning"><div class="fw-bold">🔓 Abiertos</div><div class="display-6">{len(open_rows)}</div></div></div>')
-    html.append(f'<div class="col-md-3"><div class="kpi kpi-success"><div class="fw-bold">✅ Fusionados</div><div class="display-6">{len(merged_rows)}</div></div></div>')
-    html.append(f'<div class="col-md-3"><div class="kpi kpi-danger"><div class="fw-bold">❌ Cerrados</div><div class="display-6">{len(closed_rows)}</div></div></div>')
-    html.append('</div>')
+    w('<div class="row g-3 mb-2">')
+    w(f'<div class="col-md-3"><div class="kpi kpi-primary"><div class="fw-bold">📦 PRs totales</div><div class="display-6">{len(rows)}</div></div></div>')
+    w(f'<div class="col-md-3"><div class="kpi kpi-warning"><div class="fw-bold">🔓 Abiertos</div><div class="display-6">{len(open_rows)}</div></div></div>')
+    w(f'<div class="col-md-3"><div class="kpi kpi-success"><div class="fw-bold">✅ Fusionados</div><div class="display-6">{len(merged_rows)}</div></div></div>')
+    w(f'<div class="col-md-3"><div class="kpi kpi-danger"><div class="fw-bold">❌ Cerrados</div><div class="display-6">{len(closed_rows)}</div></div></div>')
+    w('</div>')
 
     # Helper for badges
     def badge_for(ver, typ, kind):
@@ -203,107 +203,187 @@ def main():
             parts.append(f'<span class="badge rounded-pill" style="background-color: #{color}; color: #fff;">{name}</span>')
         return ' '.join(parts)
 
-    def render_rows(items):
-        html.append('<div class="table-responsive"><table class="table table-striped table-bordered table-sm mb-2 pr-table"><thead><tr><th data-sort="num">PR</th><th data-sort="name">Paquete</th><th data-sort="from">Desde</th><th data-sort="to">Hasta</th><th data-sort="dir">Dir</th><th data-sort="eco">Eco</th><th data-sort="state">Estado</th><th data-sort="labels">Labels</th><th data-sort="created">Creado</th></tr></thead><tbody>')
+    pr_head = '<thead><tr><th data-sort="num">PR</th><th data-sort="name">Paquete</th><th data-sort="from">Desde</th><th data-sort="to">Hasta</th><th data-sort="dir">Dir</th><th data-sort="eco">Eco</th><th data-sort="state">Estado</th><th data-sort="labels">Labels</th><th data-sort="created">Creado</th></tr></thead>'
+
+    def render_rows(items, state):
+        if mode == 'island':
+            # Solo el esqueleto: script.js pinta las filas visibles a partir de #pr-data
+            w(f'<div class="vt" data-state="{state}"><input type="search" class="form-control form-control-sm mb-2 vt-filter" placeholder="Filtrar por paquete, versión, directorio, ecosistema o label">'
+              f'<div class="table-responsive vt-scroll"><table class="table table-striped table-bordered table-sm mb-2 pr-table vt-table">{pr_head}<tbody></tbody></table></div>'
+              f'<div class="small text-muted vt-info">{len(items)} PRs</div></div>')
+            return
+        w(f'<div class="table-responsive"><table class="table table-striped table-bordered table-sm mb-2 pr-table">{pr_head}<tbody>')
         for r in items:
-            typ = update_type(r.get('from',''), r.get('to',''))
-            html.append(f'<tr data-num="{r["num"]}" data-name="{r["name"]}" data-created="{r["created"]}">'
-                        f'<td><a href="{r["url"]}" target="_blank">#{r["num"]}</a></td>'
-                        f'<td>{r["name"]}</td>'
-                        f'<td>{badge_for(r.get("from",""), typ, "from")}</td>'
-                        f'<td>{badge_for(r.get("to",""), typ, "to")}</td>'
-                        f'<td><code>{r.get("dir","/")}</code></td>'
-                        f'<td><code>{r.get("eco","unknown")}</code></td>'
-                        f'<td>{r["state"]}</td>'
-                        f'<td>{label_tags(r.get("labels_list",[]))}</td>'
-                        f'<td>{r["created"]}</td></tr>')
-        html.append('</tbody></table></div>')
-
-    html.append('<h2 id="listado" class="mt-4">PRs por estado</h2>')
-    html.append('<div class="accordion" id="prAccordion">')
+            created = r.created.strftime('%Y-%m-%d') if r.created else 'N/A'
+            w(f'<tr data-num="{r.number}" data-name="{r.name}" data-created="{created}">'
+                  f'<td><a href="{r.url or "#"}" target="_blank">#{r.number}</a></td>'
+                  f'<td>{r.name}</td>'
+                  f'<td>{badge_for(r.from_ver, r.update_type, "from")}</td>'
+                  f'<td>{badge_for(r.to_ver, r.update_type, "to")}</td>'
+                  f'<td><code>{r.directory}</code></td>'
+                  f'<td><code>{r.ecosystem}</code></td>'
+                  f'<td>{r.state or "open"}</td>'
+                  f'<td>{label_tags(r.labels)}</td>'
+                  f'<td>{created}</td></tr>')
+        w('</tbody></table></div>')
+
+    w('<h2 id="listado" class="mt-4">PRs por estado</h2>')
+    w('<div class="accordion" id="prAccordion">')
     
     # Open
-    html.append('<div class="accordion-item"><h2 class="accordion-header" id="headingOpen"><button class="accordion-button" type="button" data-bs-toggle="collapse" data-bs-target="#collapseOpen">PRs Abiertos ({})</button></h2>'.format(len(open_rows)))
-    html.append('<div id="collapseOpen" class="accordion-collapse collapse show" data-bs-parent="#prAccordion"><div class="accordion-body">')
-    render_rows(open_rows)
-    html.append('</div></div></div>')
+    w('<div class="accordion-item"><h2 class="accordion-header" id="headingOpen"><button class="accordion-button" type="button" data-bs-toggle="collapse" data-bs-target="#collapseOpen">PRs Abiertos ({})</button></h2>'.format(len(open_rows)))
+    w('<div id="collapseOpen" class="accordion-collapse collapse show" data-bs-parent="#prAccordion"><div class="accordion-body">')
+    render_rows(open_rows, 'open')
+    w('</div></div></div>')
 
     # Merged
-    html.append('<div class="accordion-item"><h2 class="accordion-header" id="headingMerged"><button class="accordion-button collapsed" type="button" data-bs-toggle="collapse" data-bs-target="#collapseMerged">PRs Fusionados ({})</button></h2>'.format(len(merged_rows)))
-    html.append('<div id="collapseMerged" class="accordion-collapse collapse" data-bs-parent="#prAccordion"><div class="accordion-body">')
-    render_rows(merged_rows)
-    html.append('</div></div></div>')
+    w('<div class="accordion-item"><h2 class="accordion-header" id="headingMerged"><button class="accordion-button collapsed" type="button" data-bs-toggle="collapse" data-bs-target="#collapseMerged">PRs Fusionados ({})</button></h2>'.format(len(merged_rows)))
+    w('<div id="collapseMerged" class="accordion-collapse collapse" data-bs-parent="#prAccordion"><div class="accordion-body">')
+    render_rows(merged_rows, 'merged')
+    w('</div></div></div>')
 
     # Closed
-    html.append('<div class="accordion-item"><h2 class="accordion-header" id="headingClosed"><button class="accordion-button collapsed" type="button" data-bs-toggle="collapse" data-bs-target="#collapseClosed">PRs Cerrados ({})</button></h2>'.format(len(closed_rows)))
-    html.append('<div id="collapseClosed" class="accordion-collapse collapse" data-bs-parent="#prAccordion"><div class="accordion-body">')
-    render_rows(closed_rows)
-    html.append('</div></div></div>')
-    html.append('</div>')
+    w('<div class="accordion-item"><h2 class="accordion-header" id="headingClosed"><button class="accordion-button collapsed" type="button" data-bs-toggle="collapse" data-bs-target="#collapseClosed">PRs Cerrados ({})</button></h2>'.format(len(closed_rows)))
+    w('<div id="collapseClosed" class="accordion-collapse collapse" data-bs-parent="#prAccordion"><div class="accordion-body">')
+    render_rows(closed_rows, 'closed')
+    w('</div></div></div>')
+    w('</div>')
 
     # Resumen
-    html.append('<h2 id="resumen" class="mt-4">📊 Resumen general</h2>')
-    html.append('<div class="row g-3 mb-2"><div class="col-md-6"><table class="table table-striped table-bordered table-sm mb-2"><thead><tr><th>Tipo</th><th>Cantidad</th></tr></thead><tbody>')
+    w('<h2 id="resumen" class="mt-4">📊 Resumen general</h2>')
+    w('<div class="row g-3 mb-2"><div class="col-md-6"><table class="table table-striped table-bordered table-sm mb-2"><thead><tr><th>Tipo</th><th>Cantidad</th></tr></thead><tbody>')
     for k in ['major','minor','patch','other']:
-        html.append(f'<tr><td>{k}</td><td>{total_agg[k]}</td></tr>')
-    html.append('</tbody></table></div>')
-    html.append('<div class="col-md-6"><div class="section-card"><canvas id="chartTypes" style="max-height:200px"></canvas></div></div></div>')
+        w(f'<tr><td>{k}</td><td>{total_agg[k]}</td></tr>')
+    w('</tbody></table></div>')
+    w(f'<div class="col-md-6"><div class="section-card">{charts.svg(charts.types_spec(total_agg))}</div></div></div>')
+
+    # Directorios
+    w('<h2 id="dir" class="mt-4">Métricas por directorio</h2>')
+    w('<div class="row g-3 mb-2"><div class="col-md-6"><table class="table table-striped table-bordered table-sm mb-2"><thead><tr><th>Directorio</th><th>major</th><th>minor</th><th>patch</th><th>other</th></tr></thead><tbody>')
+    for d in sorted(dir_agg.keys()):
+        v = dir_agg[d]
+        w(f'<tr><td><code>{d}</code></td><td>{v["major"]}</td><td>{v["minor"]}</td><td>{v["patch"]}</td><td>{v["other"]}</td></tr>')
+    w('</tbody></table></div>')
+    w(f'<div class="col-md-6"><div class="section-card">{charts.svg(charts.dirs_spec(dir_agg))}</div></div></div>')
 
     # Ecosistemas
-    html.append('<h2 id="eco" class="mt-4">Métricas por ecosistema</h2>')
-    html.append('<div class="row g-3 mb-2"><div class="col-md-6"><table class="table table-striped table-bordered table-sm mb-2"><thead><tr><th>Ecosistema</th><th>major</th><th>minor</th><th>patch</th><th>other</th></tr></thead><tbody>')
+    w('<h2 id="eco" class="mt-4">Métricas por ecosistema</h2>')
+    w('<div class="row g-3 mb-2"><div class="col-md-6"><table class="table table-striped table-bordered table-sm mb-2"><thead><tr><th>Ecosistema</th><th>major</th><th>minor</th><th>patch</th><th>other</th></tr></thead><tbody>')
     for e in sorted(eco_agg.keys()):
         v = eco_agg[e]
-        html.append(f'<tr><td><code>{e}</code></td><td>{v["major"]}</td><td>{v["minor"]}</td><td>{v["patch"]}</td><td>{v["other"]}</td></tr>')
-    html.append('</tbody></table></div>')
-    html.append('<div class="col-md-6"><div class="section-card"><canvas id="chartEcos" style="max-height:200px"></canvas></div></div></div>')
+        w(f'<tr><td><code>{e}</code></td><td>{v["major"]}</td><td>{v["minor"]}</td><td>{v["patch"]}</td><td>{v["other"]}</td></tr>')
+    w('</tbody></table></div>')
+    w(f'<div class="col-md-6"><div class="section-card">{charts.svg(charts.ecos_spec(eco_agg))}</div></div></div>')
+
+    # Tendencias (histórico SQLite de scripts/trends.py)
+    if trend:
+        w('<h2 id="tendencias" class="mt-4">📈 Tendencias</h2>')
+        w(f'<p class="small text-muted">{trends.caption(trend)}</p>')
+        w('<div class="row g-3 mb-2">')
+        for title, head, trend_rows in trends.sections(trend):
+            w(f'<div class="col-md-6"><h3 class="h6">{title}</h3><div class="table-responsive"><table class="table table-striped table-bordered table-sm mb-2"><thead><tr>'
+              + ''.join(f'<th>{h}</th>' for h in head) + '</tr></thead><tbody>')
+            for r in trend_rows:
+                w('<tr>' + ''.join(f'<td>{v}</td>' for v in r) + '</tr>')
+            w('</tbody></table></div></div>')
+        w(f'<div class="col-md-6"><div class="section-card">{charts.svg(charts.backlog_spec(trend["weekly"]))}</div></div></div>')
 
     # Alertas
-    html.append('<h2 id="alertas" class="mt-4">🛡️ Alertas de Seguridad</h2>')
-    try:
-        raw_alerts = os.getenv('ALERTS_JSON', '').strip()
-        alerts = json.loads(raw_alerts) if raw_alerts else []
-    except:
-        alerts = []
-    
-    if alerts:
-        html.append(f'<div class="alert alert-warning">Se encontraron {len(alerts)} alertas de seguridad.</div>')
+    w('<h2 id="alertas" class="mt-4">🛡️ Alertas de Seguridad</h2>')
+    # Alertas del dataset, las dadas en opciones o las del NDJSON (ALERTS_FILE), leídas en streaming; ALERTS_JSON se
+    # mantiene por compatibilidad
+    alerts_file = opts['alerts_file']
+    has_alerts = False
+    if dataset_path and os.path.exists(dataset_path):
+        with Dataset(dataset_path) as ds:
+            has_alerts = 'alerts' in ds.sections
+    if has_alerts:
+        alerts = load_records('alerts', path=dataset_path)
+    elif opts['alerts'] is not None:
+        alerts = opts['alerts']
+    elif alerts_file:
+        alerts = iter_alerts(alerts_file)
+    else:
+        try:
+            raw_alerts = opts['alerts_json']
+            alerts = json.loads(raw_alerts) if raw_alerts else []
+        except ValueError as e:
+            log(f"ALERTS_JSON inválido: {e}")
+            alerts = []
+
+    alert_rows = []
+    alerts_count = 0
+    for a in alerts:
+        if not isinstance(a, dict): continue
+        alerts_count += 1
+        if len(alert_rows) >= 50: continue
+        dep = a.get('dependency', {}).get('package', {})
+        pkg = dep.get('name', '—')
+        eco = dep.get('ecosystem', '—')
+        sev = a.get('severity', 'unknown')
+        summary = a.get('security_advisory', {}).get('summary', '—')
+        alert_rows.append(f'<tr><td>{pkg}</td><td>{sev}</td><td>{eco}</td><td>{summary}</td></tr>')
+
+    if alerts_count:
+        w(f'<div class="alert alert-warning">Se encontraron {alerts_count} alertas de seguridad.</div>')
         # Simple table for alerts
-        html.append('<div class="table-responsive"><table class="table table-striped table-bordered table-sm mb-2"><thead><tr><th>Paquete</th><th>Severidad</th><th>Ecosistema</th><th>Resumen</th></tr></thead><tbody>')
-        for a in alerts[:50]:
-            if not isinstance(a, dict): continue
-            dep = a.get('dependency', {}).get('package', {})
-            pkg = dep.get('name', '—')
-            eco = dep.get('ecosystem', '—')
-            sev = a.get('severity', 'unknown')
-            summary = a.get('security_advisory', {}).get('summary', '—')
-            html.append(f'<tr><td>{pkg}</td><td>{sev}</td><td>{eco}</td><td>{summary}</td></tr>')
-        html.append('</tbody></table></div>')
+        w('<div class="table-responsive"><table class="table table-striped table-bordered table-sm mb-2"><thead><tr><th>Paquete</th><th>Severidad</th><th>Ecosistema</th><th>Resumen</th></tr></thead><tbody>')
+        for row in alert_rows:
+            w(row)
+        w('</tbody></table></div>')
     else:
-        html.append('<div class="alert alert-success">No se detectaron alertas de seguridad.</div>')
+        w('<div class="alert alert-success">No se detectaron alertas de seguridad.</div>')
 
     # Footer
-    html.append('<footer class="bg-body-tertiary border-top mt-4"><div class="container py-4"><div class="text-center small text-muted">Generado automáticamente por Dependabot Report Workflow</div></div></footer>')
+    w('<footer class="bg-body-tertiary border-top mt-4"><div class="container py-4"><div class="text-center small text-muted">Generado automáticamente por Dependabot Report Workflow</div></div></footer>')
 
-    # Scripts
-    html.append('<script src="https://cdn.jsdelivr.net/npm/bootstrap@5.3.2/dist/js/bootstrap.bundle.min.js"></script>')
-    html.append('<script src="https://cdn.jsdelivr.net/npm/chart.js"></script>')
-    
-    # Inject Data for Charts
-    chart_types_data = [total_agg[k] for k in ['major','minor','patch','other']]
-    eco_labels = sorted(list(eco_agg.keys()))
-    eco_values = [eco_agg[e]['major']+eco_agg[e]['minor']+eco_agg[e]['patch']+eco_agg[e]['other'] for e in eco_labels]
-    
-    html.append('<script>')
-    html.append(f'window.reportData = {{ types: {json.dumps(chart_types_data)}, ecos: {{ labels: {json.dumps(eco_labels)}, values: {json.dumps(eco_values)} }} }};')
-    html.append('</script>')
+    # Scripts (las gráficas ya van como SVG inline, sin Chart.js)
+    if offline:
+        w(f"<script>{bundle.vendor('collapse.js')}</script>")
+    else:
+        w('<script src="https://cdn.jsdelivr.net/npm/bootstrap@5.3.2/dist/js/bootstrap.bundle.min.js"></script>')
+    if mode == 'island':
+        pull_base = f"{server_url}/{repo}/pull/" if repo else ''
+        island = json.dumps(island_payload(open_rows + merged_rows + closed_rows, pull_base), separators=(',', ':'), ensure_ascii=False)
+        w('<script type="application/json" id="pr-data">' + island.replace('</', '<\\/') + '</script>')
     
-    html.append(f'<script>{js_content}</script>')
-    html.append('</body></html>')
+    w(f'<script>{js_content}</script>')
+    w('</body></html>')
+
+    step('html.write', offline=offline)
+    if not stream:
+        out.write(''.join(parts))
+    out.close()
+    os.replace(tmp_path, html_path)
+    sizes = bundle.finalize(html_path, opts['size_budget_kb'], opts['bootstrap_css']) if offline else {}
+    return {'path': html_path, 'mode': mode, 'prs': len(rows), 'alerts': alerts_count, 'sizes': sizes}
 
-    with open(html_path, 'w', encoding='utf-8') as f:
-        f.write(''.join(html))
-    print(f"HTML generado en {html_path}")
+def main():
+    try:
+        dataset_path = os.getenv('DATASET_PATH', '').strip()
+        raw = os.getenv('PRS_DATA', '')
+        if dataset_path and os.path.exists(dataset_path):
+            dataset = dataset_path
+        elif raw.strip():
+            dataset = json.loads(raw)
+        elif os.path.exists('docs/prs.json'):
+            with open('docs/prs.json', 'r') as f:
+                dataset = json.load(f)
+        else:
+            dataset = []
+    except (OSError, ValueError) as e:
+        log(f"PRs no disponibles (PRS_DATA / docs/prs.json): {e}")
+        dataset = []
+    try:
+        with phase('render.html') as attrs:
+            result = build_html(dataset, options_from_env())
+            attrs.update(mode=result['mode'], prs=result['prs'], alerts=result['alerts'])
+    except bundle.BudgetError as e:
+        print(f"::error::{e}")
+        raise SystemExit(1)
+    print(f"HTML generado en {result['path']}")
+    if result['sizes']:
+        print('Bundle offline: ' + ', '.join(f"{k} {v/1024:.0f} KiB" for k, v in result['sizes'].items()))
 
 if __name__ == '__main__':
     main()
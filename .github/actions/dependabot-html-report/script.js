@@ -1,4 +1,4 @@
-document.querySelectorAll("table thead th[data-sort]").forEach(th => {
+document.querySelectorAll("table:not(.vt-table) thead th[data-sort]").forEach(th => {
     th.style.cursor = "pointer";
     th.addEventListener("click", () => {
         const key = th.dataset.sort;
@@ -34,63 +34,104 @@ document.querySelectorAll("table thead th[data-sort]").forEach(th => {
     });
 });
 
-function cssColors() {
-    const style = getComputedStyle(document.body);
-    return {
-        text: style.getPropertyValue('--bs-body-color') || '#adb5bd',
-        grid: style.getPropertyValue('--bs-border-color') || '#495057'
-    };
+// Tabla virtualizada (HTML_MODE=island): los PRs llegan una sola vez en #pr-data como columnas y solo se
+// pintan las filas visibles; ordenar y filtrar trabajan sobre arrays de índices, sin tocar el DOM.
+function esc(s) {
+    return String(s).replace(/[&<>"]/g, c => ({ "&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;" }[c]));
 }
 
-let chartTypes, chartEcos;
-
-function initCharts() {
-    try {
-        const ct = document.getElementById("chartTypes");
-        const ce = document.getElementById("chartEcos");
-        const cc = cssColors();
-        
-        if (ct && window.reportData && window.reportData.types) {
-            chartTypes = new Chart(ct, {
-                type: "bar",
-                data: {
-                    labels: ["major", "minor", "patch", "other"],
-                    datasets: [{
-                        label: "Tipos",
-                        data: window.reportData.types,
-                        backgroundColor: ["#dc3545", "#ffc107", "#198754", "#6c757d"]
-                    }]
-                },
-                options: {
-                    responsive: true,
-                    plugins: { legend: { display: false } },
-                    scales: {
-                        x: { ticks: { color: cc.text }, grid: { color: cc.grid } },
-                        y: { ticks: { color: cc.text }, grid: { color: cc.grid } }
-                    }
-                }
-            });
+function initVirtualTables() {
+    const island = document.getElementById("pr-data");
+    if (!island) return;
+    const d = JSON.parse(island.textContent);
+    const c = d.cols, S = d.strings, total = c.num.length;
+    const emoji = { major: "🔺", minor: "🟡", patch: "🟢", other: "🔹" };
+    const color = { major: "text-bg-danger", minor: "text-bg-warning", patch: "text-bg-success", other: "text-bg-secondary" };
+    const labelHtml = d.labels.map(([name, col]) => `<span class="badge rounded-pill" style="background-color: #${esc(col)}; color: #fff;">${esc(name)}</span>`);
+    const num = i => parseInt(String(c.num[i]).replace(/[^0-9]/g, "")) || 0;
+    const keys = {
+        num: num,
+        name: i => S[c.name[i]],
+        from: i => S[c.from[i]],
+        to: i => S[c.to[i]],
+        dir: i => S[c.dir[i]],
+        eco: i => S[c.eco[i]],
+        state: i => d.states[c.state[i]],
+        labels: i => c.labels[i].map(l => d.labels[l][0]).join(" "),
+        created: i => S[c.created[i]]
+    };
+    function rowHtml(i) {
+        const typ = d.types[c.type[i]];
+        const created = S[c.created[i]] || "N/A";
+        const url = c.url[i] === 0 ? d.base + c.num[i] : c.url[i];
+        const labels = c.labels[i].length ? c.labels[i].map(l => labelHtml[l]).join(" ") : "—";
+        return `<tr><td><a href="${esc(url)}" target="_blank">#${esc(c.num[i])}</a></td><td>${esc(S[c.name[i]])}</td>`
+            + `<td><span class="badge text-bg-secondary badge-ver">↩️ ${esc(S[c.from[i]])}</span></td>`
+            + `<td><span class="badge ${color[typ]} badge-ver">${emoji[typ]} ${esc(S[c.to[i]])}</span></td>`
+            + `<td><code>${esc(S[c.dir[i]])}</code></td><td><code>${esc(S[c.eco[i]])}</code></td>`
+            + `<td>${d.states[c.state[i]]}</td><td>${labels}</td><td>${created}</td></tr>`;
+    }
+    document.querySelectorAll(".vt").forEach(box => {
+        const st = d.states.indexOf(box.dataset.state);
+        const base = [];
+        for (let i = 0; i < total; i++) if (c.state[i] === st) base.push(i);
+        const scroller = box.querySelector(".vt-scroll");
+        const tbody = box.querySelector("tbody");
+        const info = box.querySelector(".vt-info");
+        let order = base, view = base, query = "", rowH = 0, first = -1, last = -1;
+        function pad(h) {
+            return h > 0 ? `<tr class="vt-pad"><td colspan="9" style="height:${h}px"></td></tr>` : "";
         }
-        if (ce && window.reportData && window.reportData.ecos) {
-            chartEcos = new Chart(ce, {
-                type: "doughnut",
-                data: {
-                    labels: window.reportData.ecos.labels,
-                    datasets: [{
-                        data: window.reportData.ecos.values,
-                        backgroundColor: ["#0d6efd", "#6610f2", "#6f42c1", "#20c997", "#fd7e14", "#198754", "#dc3545", "#6c757d"]
-                    }]
-                },
-                options: {
-                    responsive: true,
-                    plugins: { legend: { labels: { color: cc.text } } }
-                }
-            });
+        function render(force) {
+            if (!scroller.clientHeight) return;
+            if (!rowH) {
+                tbody.innerHTML = view.length ? rowHtml(view[0]) : "";
+                rowH = (tbody.rows[0] && tbody.rows[0].offsetHeight) || 30;
+            }
+            const headH = scroller.querySelector("thead").offsetHeight;
+            // inicio par para que el rayado de filas no cambie al desplazarse
+            let start = Math.max(0, Math.floor((scroller.scrollTop - headH) / rowH) - 10);
+            start -= start % 2;
+            const end = Math.min(view.length, start + Math.ceil(scroller.clientHeight / rowH) + 20);
+            if (!force && start === first && end === last) return;
+            first = start; last = end;
+            let html = pad(start * rowH);
+            for (let k = start; k < end; k++) html += rowHtml(view[k]);
+            tbody.innerHTML = html + pad((view.length - end) * rowH);
         }
-    } catch (e) { console.error(e); }
+        scroller.addEventListener("scroll", () => render(false), { passive: true });
+        window.addEventListener("resize", () => render(true));
+        const collapse = box.closest(".accordion-collapse");
+        if (collapse) collapse.addEventListener("shown.bs.collapse", () => render(true));
+        function apply() {
+            view = !query ? order : order.filter(i => [keys.name(i), keys.from(i), keys.to(i), keys.dir(i), keys.eco(i), keys.labels(i)].join(" ").toLowerCase().includes(query));
+            info.textContent = query ? `${view.length} de ${base.length} PRs` : `${base.length} PRs`;
+            scroller.scrollTop = 0;
+            render(true);
+        }
+        let timer;
+        box.querySelector(".vt-filter").addEventListener("input", e => {
+            clearTimeout(timer);
+            timer = setTimeout(() => {
+                query = e.target.value.trim().toLowerCase();
+                apply();
+            }, 150);
+        });
+        box.querySelectorAll("thead th[data-sort]").forEach(th => {
+            th.style.cursor = "pointer";
+            th.addEventListener("click", () => {
+                const key = th.dataset.sort, get = keys[key];
+                const asc = th.dataset.order != "desc";
+                const vals = new Array(total);
+                base.forEach(i => { vals[i] = get(i); });
+                const cmp = key === "num" ? (a, b) => vals[a] - vals[b] : (a, b) => String(vals[a]).localeCompare(String(vals[b]));
+                order = base.slice().sort(asc ? cmp : (a, b) => cmp(b, a));
+                th.dataset.order = asc ? "desc" : "asc";
+                apply();
+            });
+        });
+        render(true);
+    });
 }
 
-// Initialize charts if Chart.js is loaded
-if (typeof Chart !== 'undefined') {
-    initCharts();
-}
+initVirtualTables();
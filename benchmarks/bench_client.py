@@ -0,0 +1,37 @@
+import os, subprocess, sys, time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..', 'scripts'))
+os.environ.setdefault('TRACE_PATH', '')  # sin docs/trace.json en el directorio actual
+from gh_api import GitHubClient
+from fake_github import FakeGitHub, start_server
+from synthetic import make_prs
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    gh = os.getenv('GH_BIN', os.path.join(HERE, 'fake_gh'))
+    state = FakeGitHub(make_prs(50))
+    server, url = start_server(state)
+    env = dict(os.environ, GITHUB_API_URL=url)
+    path = f"repos/{state.repo}/pulls/1"
+
+    t0 = time.perf_counter()
+    for _ in range(n):
+        subprocess.run([gh, 'api', path], capture_output=True, env=env, check=True)
+    forks = time.perf_counter() - t0
+
+    client = GitHubClient(base_url=url, token='x', cache=False)
+    t0 = time.perf_counter()
+    for _ in range(n):
+        client.get(path)
+    pooled = time.perf_counter() - t0
+    server.shutdown()
+
+    print(f"{n} llamadas secuenciales a {path}")
+    print(f"  gh api (fork por llamada): {forks*1000:8.1f} ms  ({forks/n*1000:.2f} ms/llamada)")
+    print(f"  cliente con pool:          {pooled*1000:8.1f} ms  ({pooled/n*1000:.2f} ms/llamada, {client.connections} conexión/es)")
+    print(f"  speedup: {forks/pooled:.1f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+import os, re, shutil, subprocess, sys, tempfile, time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ACTION = os.path.join(HERE, '..', '.github', 'actions', 'dependabot-html-report')
+sys.path.insert(0, os.path.join(HERE, '..', 'scripts'))
+from dataset import DatasetWriter
+from synthetic import make_alerts, make_prs
+
+# Ejecuta generate_html en un proceso propio y mide tiempo y pico de RSS de ese proceso.
+# En Linux se usa VmHWM: ru_maxrss se hereda del proceso padre a través de fork/exec y arrastraría la memoria del benchmark.
+RUNNER = """
+import os, resource, runpy, sys, time
+t0 = time.perf_counter()
+sys.argv = [sys.argv[1]]
+sys.path.insert(0, os.path.dirname(sys.argv[0]))
+runpy.run_path(sys.argv[0], run_name='__main__')
+wall = time.perf_counter() - t0
+try:
+    rss = int([l for l in open('/proc/self/status') if l.startswith('VmHWM:')][0].split()[1])
+except Exception:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print('BENCH', wall, rss)
+"""
+
+MODES = [
+    ('lista + join (anterior)', {'HTML_STREAM': 'false', 'HTML_MODE': 'rows'}),
+    ('streaming', {'HTML_STREAM': 'true', 'HTML_MODE': 'rows'}),
+    ('streaming + island', {'HTML_STREAM': 'true', 'HTML_MODE': 'island'}),
+    ('island + bundle offline', {'HTML_STREAM': 'true', 'HTML_MODE': 'island', 'HTML_BUNDLE': 'offline'}),
+]
+
+# Primer pintado: con Chrome/Chromium disponible (CHROME_BIN o en PATH) se mide lo que tarda --screenshot
+# (carga del documento + primer frame) restando el de una página vacía. Sin navegador se muestra n/d.
+CHROME = os.getenv('CHROME_BIN') or next((shutil.which(b) for b in ('chromium', 'chromium-browser', 'google-chrome', 'chrome') if shutil.which(b)), None)
+
+
+def run(dataset, out, env_extra):
+    env = dict(os.environ, DATASET_PATH=dataset, HTML_PATH=out, ACTION_PATH=ACTION, GITHUB_REPOSITORY='acme/monorepo', **env_extra)
+    r = subprocess.run([sys.executable, '-c', RUNNER, os.path.join(ACTION, 'generate_html.py')], env=env, capture_output=True, text=True, check=True)
+    line = [l for l in r.stdout.splitlines() if l.startswith('BENCH')][-1]
+    _, wall, rss = line.split()
+    gz = out + '.gz'
+    return float(wall), int(rss) / 1024, os.path.getsize(out), os.path.getsize(gz) if os.path.exists(gz) else None
+
+def screenshot_time(url, tmp):
+    cmd = [CHROME, '--headless=new', '--disable-gpu', '--no-sandbox', '--hide-scrollbars', '--window-size=1280,900',
+           f"--screenshot={os.path.join(tmp, 'shot.png')}", url]
+    t0 = time.perf_counter()
+    subprocess.run(cmd, capture_output=True, timeout=300)
+    return time.perf_counter() - t0
+
+def first_paint(path, tmp):
+    if not CHROME:
+        return None
+    return max(0.0, screenshot_time('file://' + os.path.abspath(path), tmp) - screenshot_time('about:blank', tmp))
+
+def island_parse(path, tmp):
+    # Coste en el cliente del modo island: JSON.parse del bloque #pr-data (requiere node)
+    node = shutil.which('node')
+    with open(path, encoding='utf-8') as f:
+        m = re.search(r'<script type="application/json" id="pr-data">(.*?)</script>', f.read(), re.S)
+    if not node or not m:
+        return None
+    data = os.path.join(tmp, 'island.json')
+    with open(data, 'w', encoding='utf-8') as f:
+        f.write(m.group(1).replace('<\\/', '</'))
+    js = "const s=require('fs').readFileSync(process.argv[1],'utf8');const t=process.hrtime.bigint();JSON.parse(s);console.log(Number(process.hrtime.bigint()-t)/1e6)"
+    return float(subprocess.run([node, '-e', js, data], capture_output=True, text=True, check=True).stdout)
+
+def fmt(v, spec):
+    return 'n/d' if v is None else format(v, spec)
+
+def main():
+    sizes = [int(x) for x in (sys.argv[1:] or ['50000'])]
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            dataset = os.path.join(tmp, f"ds-{n}.bin")
+            with DatasetWriter(dataset, {'repo': 'acme/monorepo'}) as ds:
+                ds.add('prs', make_prs(n))
+                ds.add('alerts', make_alerts(min(n, 2000)))
+            print(f"{n} PRs (dataset {os.path.getsize(dataset)/1024:.0f} KiB)")
+            print(f"  {'modo':<26} {'tiempo s':>9} {'pico RSS MiB':>13} {'HTML KiB':>10} {'.gz KiB':>8} {'1er pintado s':>14} {'parse island ms':>16}")
+            for i, (name, env_extra) in enumerate(MODES):
+                out = os.path.join(tmp, f"{n}-{i}.html")
+                wall, rss, size, gz = run(dataset, out, env_extra)
+                paint = first_paint(out, tmp)
+                parse = island_parse(out, tmp)
+                print(f"  {name:<26} {wall:>9.2f} {rss:>13.1f} {size/1024:>10.0f} {fmt(gz and gz/1024, '.0f'):>8} {fmt(paint, '.2f'):>14} {fmt(parse, '.1f'):>16}")
+
+if __name__ == '__main__':
+    main()
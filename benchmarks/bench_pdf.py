@@ -0,0 +1,77 @@
+import argparse, json, os, subprocess, sys, tempfile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SCRIPTS = os.path.join(HERE, '..', 'scripts')
+sys.path.insert(0, SCRIPTS)
+from dataset import DatasetWriter
+from synthetic import make_prs
+
+# build_pdf en un proceso propio (sin variables de entorno: opciones en JSON por argv); tiempo de pared y pico de RSS
+# (VmHWM) de ese proceso, igual que bench_html
+RUNNER = """
+import json, os, resource, sys, time
+sys.path.insert(0, sys.argv[1])
+from generate_pdf import build_pdf
+t0 = time.perf_counter()
+build_pdf(sys.argv[2], json.loads(sys.argv[3]))
+wall = time.perf_counter() - t0
+try:
+    rss = int([l for l in open('/proc/self/status') if l.startswith('VmHWM:')][0].split()[1])
+except Exception:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print('BENCH', wall, rss)
+"""
+
+MODES = [
+    ('tabla única (anterior)', {'table_chunk': 0, 'backend': 'reportlab'}),
+    ('LongTable por página', {'backend': 'reportlab'}),
+    ('minipdf (stdlib)', {'backend': 'builtin'}),
+]
+
+try:
+    import pypdf
+except ImportError:  # opcional: la estructura del PDF de minipdf la valida tests/test_minipdf.py sin pypdf
+    pypdf = None
+
+def resolved(prs):
+    # Sin red: los estados ya vienen resueltos y generate_pdf no consulta GraphQL
+    for pr in prs:
+        if pr.get('mergedAt'):
+            pr['state'] = 'merged'
+        pr['stateResolved'] = True
+    return prs
+
+def run(dataset, out, alerts, extra):
+    opts = dict(extra, pdf_path=out, alerts_file=alerts, repository='acme/monorepo', repo='acme/monorepo')
+    r = subprocess.run([sys.executable, '-c', RUNNER, SCRIPTS, dataset, json.dumps(opts)], capture_output=True, text=True, check=True)
+    line = [l for l in r.stdout.splitlines() if l.startswith('BENCH')][-1]
+    _, wall, rss = line.split()
+    return float(wall), int(rss) / 1024, os.path.getsize(out)
+
+def check(path):
+    # Abre el PDF con un parser estándar (pypdf, modo estricto) y devuelve el número de páginas
+    if pypdf is None:
+        return None
+    return len(pypdf.PdfReader(path, strict=True).pages)
+
+def main():
+    ap = argparse.ArgumentParser(description='build_pdf por backend: tiempo, pico de RSS, tamaño y páginas del PDF')
+    ap.add_argument('sizes', nargs='*', type=int, default=[500, 5000, 20000], help='PRs por escenario')
+    sizes = ap.parse_args().sizes
+    with tempfile.TemporaryDirectory() as tmp:
+        alerts = os.path.join(tmp, 'alerts.ndjson')
+        open(alerts, 'w').close()
+        for n in sizes:
+            dataset = os.path.join(tmp, f"ds-{n}.bin")
+            with DatasetWriter(dataset, {'repo': 'acme/monorepo'}) as ds:
+                ds.add('prs', resolved(make_prs(n)))
+            print(f"{n} PRs (ms/PR constante = escalado lineal)")
+            print(f"  {'modo':<24} {'tiempo s':>9} {'ms/PR':>7} {'pico RSS MiB':>13} {'PDF KiB':>9} {'páginas':>8}")
+            for i, (name, extra) in enumerate(MODES):
+                out = os.path.join(tmp, f"{n}-{i}.pdf")
+                wall, rss, size = run(dataset, out, alerts, extra)
+                pages = check(out)
+                print(f"  {name:<24} {wall:>9.2f} {wall * 1000 / n:>7.2f} {rss:>13.1f} {size/1024:>9.0f} {'n/d' if pages is None else pages:>8}")
+
+if __name__ == '__main__':
+    main()
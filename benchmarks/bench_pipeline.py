@@ -0,0 +1,67 @@
+import os, subprocess, sys, tempfile, time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SCRIPTS = os.path.join(HERE, '..', 'scripts')
+HTML = os.path.join(HERE, '..', '.github', 'actions', 'dependabot-html-report', 'generate_html.py')
+sys.path.insert(0, SCRIPTS)
+from dataset import DatasetWriter
+from fake_github import FakeGitHub, start_server
+from synthetic import make_alerts, make_prs
+
+# Los cuatro scripts por separado (como los pasos/jobs anteriores: cada uno relee el dataset y el PDF vuelve a
+# consultar estados) frente a render_pipeline.py en serie (RENDER_WORKERS=1) y con pool de procesos.
+# Todo contra el servidor simulado de fake_github.py; no incluye el arranque de jobs ni los checkouts.
+SEPARATE = [('issue', os.path.join(SCRIPTS, 'create_issue.py')), ('summary', os.path.join(SCRIPTS, 'generate_summary.py')),
+            ('html', HTML), ('pdf', os.path.join(SCRIPTS, 'generate_pdf.py'))]
+
+def run(cmd, env, cwd):
+    t0 = time.perf_counter()
+    r = subprocess.run([sys.executable, cmd], capture_output=True, text=True, env=env, cwd=cwd)
+    if r.returncode:
+        raise SystemExit(f"{os.path.basename(cmd)} falló:\n{r.stdout}{r.stderr}")
+    return time.perf_counter() - t0, r.stdout
+
+def main():
+    sizes = [int(x) for x in (sys.argv[1:] or ['500', '5000'])]
+    for n in sizes:
+        prs = make_prs(n)
+        state = FakeGitHub(prs, alerts=make_alerts(min(n, 500)))
+        server, url = start_server(state)
+        with tempfile.TemporaryDirectory() as tmp:
+            dataset = os.path.join(tmp, 'ds.bin')
+            with DatasetWriter(dataset, {'repo': state.repo}) as ds:
+                ds.add('prs', prs)
+                ds.add('alerts', list(state.alerts.values()))
+            base = dict(os.environ, GITHUB_API_URL=url, GH_TOKEN='x', GITHUB_REPOSITORY=state.repo, REPO=state.repo,
+                        GITHUB_RUN_ID='1', DATASET_PATH=dataset, PRS_COUNT=str(n), PDF_BACKEND='builtin',
+                        GITHUB_OUTPUT=os.path.join(tmp, 'out'), GITHUB_STEP_SUMMARY=os.path.join(tmp, 'summary.md'),
+                        HTML_PATH=os.path.join(tmp, 'r.html'), PDF_PATH=os.path.join(tmp, 'r.pdf'), CHARTS_DIR=os.path.join(tmp, 'charts'))
+            print(f"{n} PRs")
+            rows, calls = [], {}
+            # Título distinto por ejecución: si no, el Issue se reutiliza y no se piden los cuerpos de los PRs
+            env = dict(base, ISSUE_TITLE_TPL='separados ${date}')
+            state.calls.clear()
+            times = {name: run(path, env, tmp)[0] for name, path in SEPARATE}
+            calls['separados'] = state.calls.get('POST graphql', 0)
+            rows.append(('scripts separados', sum(times.values()), times))
+            for label, workers in (('pipeline en serie', '1'), ('pipeline con pool', '0')):
+                env = dict(base, ISSUE_TITLE_TPL=f'{label} ${{date}}', RENDER_WORKERS=workers)
+                state.calls.clear()
+                wall, out = run(os.path.join(SCRIPTS, 'render_pipeline.py'), env, tmp)
+                calls[label] = state.calls.get('POST graphql', 0)
+                times = {}
+                for line in out.splitlines():
+                    if line.startswith('⏱️') and not line.startswith('⏱️ total'):
+                        name, s = line[2:].strip().split(':')[:2]
+                        times[name] = float(s.split()[0])
+                rows.append((label, wall, times))
+            # El Issue debe ser el mismo en los tres modos (cambia solo el título)
+            assert len({i['body'] for i in state.issues[-3:]}) == 1, 'cuerpos de Issue distintos'
+            print(f"  {'modo':<20} {'total s':>8} " + ' '.join(f"{k:>8}" for k in ('load', 'issue', 'summary', 'html', 'pdf')) + f" {'GraphQL':>8}")
+            for label, total, times in rows:
+                key = 'separados' if label.startswith('scripts') else label
+                print(f"  {label:<20} {total:>8.2f} " + ' '.join(f"{times.get(k, 0):>8.2f}" if k in times else f"{'—':>8}" for k in ('load', 'issue', 'summary', 'html', 'pdf')) + f" {calls[key]:>8}")
+        server.shutdown()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+import os, re, sys, time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+from pr_records import normalize_all
+from synthetic import make_prs
+
+
+# Copia de las funciones tal y como estaban duplicadas en cada renderer
+def legacy_parse_title(t):
+    m = re.search(r"bump\s+([^\s]+)\s+from\s+([^\s]+)\s+to\s+([^\s]+)(?:\s+in\s+(.+))?", t, re.IGNORECASE)
+    if m:
+        return {'name': m.group(1), 'from': m.group(2), 'to': m.group(3), 'dir': m.group(4) or ''}
+    return {'name':'—','from':'','to':'','dir':''}
+
+def legacy_semver_tuple(s):
+    nums = [int(x) for x in re.findall(r"\d+", s)[:3]]
+    while len(nums) < 3:
+        nums.append(0)
+    return tuple(nums)
+
+def legacy_update_type(f, t):
+    if not f or not t:
+        return 'other'
+    fM,fm,fp = legacy_semver_tuple(f)
+    tM,tm,tp = legacy_semver_tuple(t)
+    if tM != fM:
+        return 'major'
+    if tm != fm:
+        return 'minor'
+    if tp != fp:
+        return 'patch'
+    return 'other'
+
+def legacy_directory_of(pr):
+    meta = legacy_parse_title(pr.get('title',''))
+    if meta.get('dir'):
+        return meta['dir']
+    ref = pr.get('headRefName','')
+    if '/' in ref:
+        parts = ref.split('/')
+        try:
+            idx = parts.index('dependabot')
+            if idx >= 0 and len(parts) > idx+2:
+                return '/' + '/'.join(parts[idx+2:-1])
+        except Exception:
+            pass
+    return '/'
+
+def legacy_ecosystem_of(pr):
+    ref = pr.get('headRefName','')
+    if '/' in ref:
+        parts = ref.split('/')
+        try:
+            idx = parts.index('dependabot')
+            if idx >= 0 and len(parts) > idx+1:
+                eco = parts[idx+1]
+                return 'npm' if eco == 'npm_and_yarn' else eco
+        except Exception:
+            pass
+    return 'unknown'
+
+def legacy_sanitize_dir_path(s, eco_hint=''):
+    d = (s or '/').strip().replace('\\','/') or '/'
+    if d == '/':
+        return '/'
+    eco = (eco_hint or '').lower()
+    eco = 'github-actions' if eco == 'github_actions' else eco
+    if d.startswith('/main/') or d == '/main' or ' ' in d:
+        return '/.github/workflows' if eco == 'github-actions' else '/'
+    first = d.split('/')[1] if d.startswith('/') and len(d.split('/'))>1 else d.split('/')[0]
+    if eco == 'github-actions' and first in ['actions','appleboy','main']:
+        return '/.github/workflows'
+    if '/main' in d:
+        parts = [seg for seg in d.split('/') if seg and seg != 'main']
+        return '/' + '/'.join(parts)
+    return d
+
+def legacy_pdf(prs):
+    # generate_pdf: agregación + listado + cobertura (3 pasadas, directory_of reparsea el título)
+    for pr in prs:
+        meta = legacy_parse_title(pr.get('title',''))
+        legacy_update_type(meta['from'], meta['to'])
+        e = legacy_ecosystem_of(pr)
+        legacy_sanitize_dir_path(legacy_directory_of(pr), e)
+    now = datetime.now(timezone.utc)
+    for pr in prs:
+        meta = legacy_parse_title(pr.get('title',''))
+        created = pr.get('createdAt','')
+        datetime.fromisoformat(created.replace('Z','+00:00')).strftime('%Y-%m-%d')
+        meta.get('dir') or legacy_directory_of(pr)
+        legacy_update_type(meta['from'], meta['to'])
+        (now - datetime.fromisoformat(created.replace('Z','+00:00'))).days
+    for pr in prs:
+        e = legacy_ecosystem_of(pr)
+        legacy_sanitize_dir_path(legacy_directory_of(pr), e)
+
+def measure(fn, prs, repeat):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(prs)
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    return best
+
+def main():
+    sizes = [int(x) for x in (sys.argv[1:] or ['1000','10000','50000'])]
+    print(f"{'PRs':>8} {'antes µs/PR':>12} {'después µs/PR':>14} {'speedup':>8}")
+    for n in sizes:
+        prs = make_prs(n)
+        before = measure(legacy_pdf, prs, 3)
+        after = measure(normalize_all, prs, 3)
+        print(f"{n:>8} {before/n*1e6:>12.2f} {after/n*1e6:>14.2f} {before/after:>7.1f}x")
+
+if __name__ == '__main__':
+    main()
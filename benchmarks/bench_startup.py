@@ -0,0 +1,83 @@
+import argparse, os, statistics, subprocess, sys, tempfile, time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SCRIPTS = os.path.join(HERE, '..', 'scripts')
+sys.path.insert(0, SCRIPTS)
+from build_cli import build
+from fake_github import FakeGitHub, start_server
+from synthetic import make_alerts, make_prs
+
+# Arranque hasta la primera llamada a la API (la primera request que recibe el servidor simulado) de cada paso:
+#   scripts              python3 scripts/<script>.py con __pycache__ ya escrito
+#   scripts sin caché    lo mismo compilando todo (PYTHONPYCACHEPREFIX vacío), como el primer paso tras el checkout
+#   pyz                  python3 dependabot-report.pyz <subcomando> (scripts/build_cli.py)
+# Con -X importtime comprueba además que ningún subcomando sin PDF importa generate_pdf, minipdf ni reportlab.
+STEPS = [('detect', 'detect_prs.py'), ('alerts', 'collect_alerts.py'), ('issue', 'create_issue.py')]
+PDF_MODULES = ('generate_pdf', 'minipdf', 'reportlab')
+LAZY = ('detect', 'alerts', 'dataset', 'issue', 'summary', 'html')
+
+def first_call_ms(state, cmd, env, cwd):
+    state.first_call = None
+    t0 = time.time()
+    r = subprocess.run(cmd, env=env, cwd=cwd, capture_output=True, text=True)
+    if r.returncode or state.first_call is None:
+        raise RuntimeError(f"{' '.join(cmd)} falló:\n{r.stdout[-2000:]}{r.stderr[-2000:]}")
+    return (state.first_call - t0) * 1000
+
+def imported(pyz, name, args, env, cwd):
+    r = subprocess.run([sys.executable, '-X', 'importtime', pyz, name] + args, env=env, cwd=cwd, capture_output=True, text=True)
+    return {l.rsplit('|', 1)[1].strip().split('.')[0] for l in r.stderr.splitlines() if l.startswith('import time:') and '|' in l}
+
+def main():
+    ap = argparse.ArgumentParser(description='Arranque hasta la primera llamada a la API: scripts sueltos frente al zipapp')
+    ap.add_argument('--prs', type=int, default=300)
+    ap.add_argument('--runs', type=int, default=5, help='repeticiones por paso y modo (se toma la mediana)')
+    ap.add_argument('--budget-ms', type=float, default=150.0, help='máximo para la mediana del .pyz en cualquier paso')
+    args = ap.parse_args()
+
+    state = FakeGitHub(make_prs(args.prs), alerts=make_alerts(args.prs // 2))
+    server, url = start_server(state)
+    failures = []
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            pyz = build(os.path.join(tmp, 'dependabot-report.pyz'))['path']
+            env = dict(os.environ, GITHUB_API_URL=url, GH_TOKEN='x', GITHUB_REPOSITORY=state.repo, REPO=state.repo,
+                       GITHUB_RUN_ID='1', RUN_ID='1', PRS_STATE='all', DATASET_PATH=os.path.join(tmp, 'docs', 'ds.bin'),
+                       ALERTS_FILE=os.path.join(tmp, 'docs', 'alerts.ndjson'), GITHUB_OUTPUT=os.path.join(tmp, 'out'),
+                       GITHUB_STEP_SUMMARY=os.path.join(tmp, 'summary.md'), HTML_PATH=os.path.join(tmp, 'docs', 'r.html'),
+                       PDF_PATH=os.path.join(tmp, 'docs', 'r.pdf'), CHARTS_DIR=os.path.join(tmp, 'docs', 'charts'),
+                       HTTP_CACHE_DIR='', SNAPSHOT_PATH='', TRENDS_DB='', TRACE_PATH='', TRIGGER_DEPENDABOT_NOW='false', PDF_BACKEND='auto',
+                       ISSUE_TITLE_TPL='Bench startup ${date}')
+            os.makedirs(os.path.join(tmp, 'docs'))
+            modes = [('scripts', lambda name, script, i: ([sys.executable, os.path.join(SCRIPTS, script)], {})),
+                     ('scripts sin caché', lambda name, script, i: ([sys.executable, os.path.join(SCRIPTS, script)],
+                                                                    {'PYTHONPYCACHEPREFIX': os.path.join(tmp, f"pyc-{name}-{i}")})),
+                     ('pyz', lambda name, script, i: ([sys.executable, pyz, name], {}))]
+            print(f"Arranque hasta la primera llamada a la API, mediana de {args.runs} (ms)")
+            print(f"  {'paso':<8} " + ' '.join(f"{m:>18}" for m, _ in modes))
+            for name, script in STEPS:
+                cells = []
+                for label, make in modes:
+                    times = []
+                    for i in range(args.runs):
+                        cmd, extra = make(name, script, i)
+                        times.append(first_call_ms(state, cmd, dict(env, **extra), tmp))
+                    cells.append(statistics.median(times))
+                    if label == 'pyz' and cells[-1] > args.budget_ms:
+                        failures.append(f"{name}: {cells[-1]:.0f} ms > {args.budget_ms:.0f} ms")
+                print(f"  {name:<8} " + ' '.join(f"{c:>18.1f}" for c in cells))
+
+            print('Módulos de PDF importados por subcomando')
+            for name in LAZY + ('pdf',):
+                loaded = sorted(m for m in imported(pyz, name, ['info', env['DATASET_PATH']] if name == 'dataset' else [], env, tmp) if m in PDF_MODULES)
+                print(f"  {name:<8} {', '.join(loaded) or '—'}")
+                if name in LAZY and loaded:
+                    failures.append(f"{name} importa {', '.join(loaded)}")
+    finally:
+        server.shutdown()
+    for f in failures:
+        print(f"::error::{f}")
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
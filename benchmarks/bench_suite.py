@@ -0,0 +1,204 @@
+import argparse, json, os, platform, subprocess, sys, tempfile, time
+from datetime import datetime, timezone
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.join(HERE, '..')
+SCRIPTS = os.path.join(ROOT, 'scripts')
+sys.path.insert(0, SCRIPTS)
+from cassette import Cassette, CassetteGitHub, make_cassette_handler
+from fake_github import FakeGitHub, start_server
+from synthetic import make_alerts, make_prs
+
+# Cada script en su propio proceso, en el orden del workflow (detect_prs y collect_alerts escriben el dataset que leen
+# los demás), contra el servidor simulado: tiempo de pared, pico de RSS (VmHWM, como bench_html) y llamadas a la API
+# por endpoint. Los resultados van a JSON para comparar entre commits (--compare). Con --cassette reproduce las
+# respuestas grabadas de un repositorio real (fake_github.py --record) en lugar de generar datos sintéticos.
+RUNNER = """
+import os, resource, runpy, sys, time
+t0 = time.perf_counter()
+sys.argv = [sys.argv[1]]
+sys.path.insert(0, os.path.dirname(sys.argv[0]))
+try:
+    runpy.run_path(sys.argv[0], run_name='__main__')
+except SystemExit as e:
+    if e.code:
+        raise
+wall = time.perf_counter() - t0
+try:
+    rss = int([l for l in open('/proc/self/status') if l.startswith('VmHWM:')][0].split()[1])
+except Exception:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print('BENCH', wall, rss)
+"""
+
+STEPS = [
+    ('detect_prs', os.path.join(SCRIPTS, 'detect_prs.py'), {}),
+    ('collect_alerts', os.path.join(SCRIPTS, 'collect_alerts.py'), {}),
+    ('create_issue', os.path.join(SCRIPTS, 'create_issue.py'), {}),
+    ('generate_summary', os.path.join(SCRIPTS, 'generate_summary.py'), {}),
+    ('generate_html', os.path.join(ROOT, '.github', 'actions', 'dependabot-html-report', 'generate_html.py'), {}),
+    ('generate_pdf', os.path.join(SCRIPTS, 'generate_pdf.py'), {'PDF_BACKEND': 'builtin'}),
+    ('render_pipeline', os.path.join(SCRIPTS, 'render_pipeline.py'), {'PDF_BACKEND': 'builtin'}),
+]
+METRICS = (('wall_s', 'tiempo s'), ('peak_rss_mib', 'pico RSS MiB'), ('api_calls', 'llamadas API'))
+
+def commit():
+    try:
+        return subprocess.run(['git', '-C', ROOT, 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ''
+
+def run_step(path, env, cwd):
+    r = subprocess.run([sys.executable, '-c', RUNNER, path], capture_output=True, text=True, env=env, cwd=cwd)
+    lines = [l for l in r.stdout.splitlines() if l.startswith('BENCH')]
+    if r.returncode or not lines:
+        raise RuntimeError(f"{os.path.basename(path)} falló:\n{r.stdout[-2000:]}{r.stderr[-2000:]}")
+    _, wall, rss = lines[-1].split()
+    return float(wall), int(rss) / 1024
+
+def read_budget(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def bench_size(n, steps, latency, per_page, alerts_ratio, budget=0, cassette=''):
+    if cassette:
+        state = CassetteGitHub(Cassette(cassette), latency=latency)
+        server, url = start_server(state, handler=make_cassette_handler(state))
+    else:
+        state = FakeGitHub(make_prs(n), alerts=make_alerts(int(n * alerts_ratio)), latency=latency, max_per_page=per_page)
+        server, url = start_server(state)
+    out = []
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(os.environ, GITHUB_API_URL=url, GH_TOKEN='x', GITHUB_REPOSITORY=state.repo, REPO=state.repo,
+                       GITHUB_RUN_ID='1', RUN_ID='1', PRS_STATE='all', ALERT_STATES='open,fixed,dismissed,auto_dismissed',
+                       DATASET_PATH=os.path.join(tmp, 'docs', 'dependabot-dataset.bin'), ALERTS_FILE=os.path.join(tmp, 'docs', 'alerts.ndjson'),
+                       GITHUB_OUTPUT=os.path.join(tmp, 'out'), GITHUB_STEP_SUMMARY=os.path.join(tmp, 'summary.md'),
+                       HTML_PATH=os.path.join(tmp, 'docs', 'r.html'), PDF_PATH=os.path.join(tmp, 'docs', 'r.pdf'),
+                       CHARTS_DIR=os.path.join(tmp, 'docs', 'charts'), PRS_COUNT=str(n) if n else '',
+                       HTTP_CACHE_DIR='', SNAPSHOT_PATH='', TRENDS_DB='', TRIGGER_DEPENDABOT_NOW='false',
+                       API_BUDGET=str(budget), API_BUDGET_FILE=os.path.join(tmp, 'docs', 'api-calls.json'))
+            os.makedirs(os.path.join(tmp, 'docs'))
+            for name, path, extra in STEPS:
+                if name not in steps:
+                    continue
+                # Título distinto por script: si no, el Issue se reutiliza y no se piden los cuerpos de los PRs
+                step_env = dict(env, ISSUE_TITLE_TPL=f"Bench {name} ${{date}}", **extra)
+                with state.lock:
+                    state.calls.clear()
+                wall, rss = run_step(path, step_env, tmp)
+                calls = dict(sorted(state.calls.items()))
+                # El conteo de scripts/api_budget.py (lado cliente) tiene que coincidir exactamente con el del servidor
+                accounted = read_budget(step_env['API_BUDGET_FILE'])
+                counted = (accounted.get('scripts') or {}).get(name, {})
+                if counted != calls:
+                    raise RuntimeError(f"{name}: api_budget cuenta {counted} y el servidor {calls}")
+                out.append({'size': n, 'script': name, 'wall_s': round(wall, 4), 'peak_rss_mib': round(rss, 1),
+                            'api_calls': sum(calls.values()), 'api_by_endpoint': calls,
+                            'degraded': (accounted.get('degraded') or {}).get(name, [])})
+        if cassette and state.cassette.misses:
+            print(f"::warning::{len(state.cassette.misses)} requests sin grabación en {cassette}, p.ej. {state.cassette.misses[0]}")
+    finally:
+        server.shutdown()
+    return out
+
+def check_issue_reuse(per_page):
+    # Issue del día ya creado y después más de una página de PRs abiertos más recientes (el listado de Issues de GitHub
+    # los incluye): la segunda ejecución de create_issue tiene que encontrarlo paginando y no abrir otro
+    state = FakeGitHub(max_per_page=per_page)
+    server, url = start_server(state)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            out = os.path.join(tmp, 'out')
+            env = dict(os.environ, GITHUB_API_URL=url, GH_TOKEN='x', GITHUB_REPOSITORY=state.repo, GITHUB_OUTPUT=out,
+                       ISSUE_TITLE_TPL='Bench reuse ${date}', DATASET_PATH='', PRS_DATA='', HTTP_CACHE_DIR='', API_BUDGET='0')
+            run_step(os.path.join(SCRIPTS, 'create_issue.py'), env, tmp)
+            for num in range(2, 2 * per_page + 2):
+                state.touch('pr', num)
+            run_step(os.path.join(SCRIPTS, 'create_issue.py'), env, tmp)
+            with open(out) as f:
+                urls = [l.split('=', 1)[1].strip() for l in f if l.startswith('issue_url=')]
+    finally:
+        server.shutdown()
+    if len(state.issues) != 1 or len(set(urls)) != 1:
+        return f"create_issue no reutilizó el Issue con {2 * per_page} PRs abiertos más recientes: {urls}"
+    return ''
+
+def compare(base, results, threshold, params):
+    # Regresión: tiempo o memoria > threshold relativo, o más llamadas a la API, para el mismo (tamaño, script)
+    old = {(r['size'], r['script']): r for r in base['results']}
+    regressions = []
+    print(f"Comparación con {base.get('commit') or '?'} (umbral {threshold:.0%})")
+    for key in ('latency_ms', 'per_page', 'alerts_ratio', 'api_budget', 'cassette'):
+        if base.get(key) != params.get(key):
+            print(f"::warning::{key} distinto ({base.get(key)} → {params.get(key)}): los resultados no son comparables")
+    for r in results:
+        o = old.get((r['size'], r['script']))
+        if not o:
+            continue
+        cells = []
+        for key, _ in METRICS:
+            a, b = o[key], r[key]
+            delta = (b - a) / a if a else (1.0 if b else 0.0)
+            # Umbral absoluto mínimo (0.1 s / 2 MiB) para no marcar el ruido de los escenarios pequeños
+            worse = b > a if key == 'api_calls' else delta > threshold and b - a > (0.1 if key == 'wall_s' else 2)
+            cells.append(f"{key} {a}→{b} ({delta:+.0%}){' ⚠️' if worse else ''}")
+            if worse:
+                regressions.append((r['size'], r['script'], key))
+        print(f"  {r['size']:>7} {r['script']:<17} " + ' · '.join(cells))
+    return regressions
+
+def main():
+    ap = argparse.ArgumentParser(description='Benchmark de los scripts del reporte contra un GitHub simulado')
+    ap.add_argument('--sizes', default='10,100,1000,10000', help='PRs por escenario, separados por coma (hasta 100000)')
+    ap.add_argument('--scripts', default=','.join(s[0] for s in STEPS))
+    ap.add_argument('--latency-ms', type=float, default=0.0, help='latencia simulada por request')
+    ap.add_argument('--per-page', type=int, default=100, help='tope de per_page del servidor simulado')
+    ap.add_argument('--alerts-ratio', type=float, default=0.5, help='alertas por PR')
+    ap.add_argument('--out', default='', help='fichero JSON de resultados')
+    ap.add_argument('--compare', default='', help='JSON de una ejecución anterior con el que comparar')
+    ap.add_argument('--threshold', type=float, default=0.15, help='aumento relativo que cuenta como regresión')
+    ap.add_argument('--api-budget', type=int, default=0, help='API_BUDGET de la ejecución completa (0 = sin límite)')
+    ap.add_argument('--cassette', default='', help='reproduce este cassette en lugar de los escenarios de --sizes')
+    args = ap.parse_args()
+    sizes = [0] if args.cassette else [int(x) for x in args.sizes.split(',') if x.strip()]
+    steps = {s.strip() for s in args.scripts.split(',') if s.strip()}
+
+    results = []
+    for n in sizes:
+        t0 = time.perf_counter()
+        rows = bench_size(n, steps, args.latency_ms / 1000, args.per_page, args.alerts_ratio, args.api_budget, args.cassette)
+        results += rows
+        print(f"{os.path.basename(args.cassette) if args.cassette else f'{n} PRs'} ({time.perf_counter() - t0:.1f} s)")
+        print(f"  {'script':<17} {'tiempo s':>9} {'ms/PR':>7} {'pico RSS MiB':>13} {'llamadas API':>13}")
+        for r in rows:
+            per_pr = f"{r['wall_s'] * 1000 / n:.2f}" if n else '—'
+            print(f"  {r['script']:<17} {r['wall_s']:>9.2f} {per_pr:>7} {r['peak_rss_mib']:>13.1f} {r['api_calls']:>13}"
+                  + ''.join(f"\n    ↳ degradado: {d}" for d in r['degraded']))
+
+    if 'create_issue' in steps and not args.cassette:
+        error = check_issue_reuse(args.per_page)
+        print(f"::error::{error}" if error else f"create_issue reutiliza el Issue con {2 * args.per_page} PRs abiertos más recientes")
+        if error:
+            return 1
+
+    doc = {'commit': commit(), 'date': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'), 'python': platform.python_version(),
+           'latency_ms': args.latency_ms, 'per_page': args.per_page, 'alerts_ratio': args.alerts_ratio, 'api_budget': args.api_budget,
+           'cassette': os.path.basename(args.cassette), 'results': results}
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(doc, f, indent=1)
+        print(f"Resultados en {args.out}")
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(json.load(f), results, args.threshold, doc)
+        if regressions:
+            print(f"{len(regressions)} regresión/es: " + ', '.join(f"{n}/{s}/{k}" for n, s, k in regressions))
+            return 1
+    return 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,113 @@
+import argparse, os, random, statistics, sys, tempfile, time
+from datetime import datetime, timedelta, timezone
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..', 'scripts'))
+from pr_records import normalize
+from synthetic import make_alert, make_pr
+import trends
+
+# Años de ejecuciones diarias contra scripts/trends.py: cada día Dependabot abre PRs y alertas nuevas, parte del
+# backlog se fusiona o se cierra y el run registra el listado completo (como PRS_STATE=all). Al cerrar cada año mide
+# el registro de un run y summary() (mediana), el tamaño de la base y, con EXPLAIN QUERY PLAN, que ninguna consulta
+# de summary() recorre una tabla entera. Falla si summary() supera --budget-ms con todo el histórico cargado.
+REPO = 'acme/monorepo'
+# Probabilidad diaria de fusionar / cerrar un PR abierto según el tipo (los majors se quedan más tiempo)
+MERGE_P = {'patch': 0.25, 'minor': 0.12, 'major': 0.02, 'other': 0.08}
+CLOSE_P = 0.01
+
+def iso(dt):
+    return dt.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+def scans(db, statements):
+    # Consultas de summary() cuyo plan tiene un SCAN de tabla (sin índice); los SCAN de subconsultas no cuentan
+    out = []
+    for sql in statements:
+        if not sql.lstrip().upper().startswith('SELECT'):
+            continue
+        for row in db.execute('EXPLAIN QUERY PLAN ' + sql):
+            detail = row[-1]
+            if detail.startswith('SCAN ') and 'SUBQUERY' not in detail and 'CONSTANT ROW' not in detail:
+                out.append(f"{detail}: {' '.join(sql.split())[:120]}")
+    return out
+
+def main():
+    ap = argparse.ArgumentParser(description='Histórico de tendencias (SQLite): registro diario y consultas con años de runs')
+    ap.add_argument('--years', type=int, default=3)
+    ap.add_argument('--daily-prs', type=float, default=8, help='PRs nuevos por día (media)')
+    ap.add_argument('--daily-alerts', type=float, default=1, help='alertas nuevas por día (media)')
+    ap.add_argument('--budget-ms', type=float, default=50.0, help='máximo para la mediana de summary() con todo el histórico')
+    ap.add_argument('--db', default='', help='ruta de la base (por defecto, una temporal)')
+    args = ap.parse_args()
+
+    rng = random.Random(11)
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc) - timedelta(days=365 * args.years)
+    prs, alerts, live = [], [], []
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.db or os.path.join(tmp, 'trends.sqlite')
+        if os.path.exists(path):
+            os.remove(path)
+        store = trends.TrendStore(path)
+        statements = []
+        print(f"{args.years} años de runs diarios, ~{args.daily_prs:g} PRs y ~{args.daily_alerts:g} alertas nuevas por día")
+        print(f"  {'año':>4} {'runs':>6} {'PRs':>7} {'alertas':>8} {'base MiB':>9} {'registro ms':>12} {'summary ms':>11}")
+        record_ms = []
+        for day in range(365 * args.years):
+            now = start + timedelta(days=day, hours=6)
+            # Nuevos PRs y alertas del día; los PRs se normalizan una vez y después solo cambia el estado
+            for _ in range(int(args.daily_prs) + (rng.random() < args.daily_prs % 1)):
+                pr = make_pr(rng, len(prs) + 1, now)
+                pr.update(state='open', createdAt=iso(now - timedelta(hours=rng.randint(0, 20))), stateResolved=True)
+                pr.pop('mergedAt', None)
+                prs.append(normalize(pr, now))
+                live.append(len(prs) - 1)
+            for _ in range(int(args.daily_alerts) + (rng.random() < args.daily_alerts % 1)):
+                a = make_alert(rng, len(alerts) + 1, now)
+                a.update(state='open', created_at=iso(now))
+                alerts.append(a)
+            still = []
+            for i in live:
+                rec = prs[i]
+                if rng.random() < MERGE_P[rec.update_type]:
+                    prs[i] = rec._replace(state='merged', merged_at=iso(now))
+                elif rng.random() < CLOSE_P:
+                    prs[i] = rec._replace(state='closed', closed_at=iso(now))
+                else:
+                    still.append(i)
+            live = still
+            for a in alerts:
+                if a['state'] == 'open' and rng.random() < 0.03:
+                    a.update(state='fixed', fixed_at=iso(now))
+            # Como ALERT_STATES=open: el run solo ve las alertas abiertas
+            t0 = time.perf_counter()
+            store.record(REPO, prs, [a for a in alerts if a['state'] == 'open'], now=now, run_id=str(day))
+            record_ms.append((time.perf_counter() - t0) * 1000)
+
+            if (day + 1) % 365 == 0:
+                times = []
+                for i in range(5):
+                    if i == 0:
+                        store.db.set_trace_callback(statements.append)
+                    t0 = time.perf_counter()
+                    summary = store.summary(REPO)
+                    times.append((time.perf_counter() - t0) * 1000)
+                    store.db.set_trace_callback(None)
+                ms = statistics.median(times)
+                size = os.path.getsize(path) / 1024 / 1024
+                print(f"  {(day + 1) // 365:>4} {summary['runs']:>6} {len(prs):>7} {len(alerts):>8} {size:>9.1f} "
+                      f"{statistics.median(record_ms[-30:]):>12.1f} {ms:>11.1f}")
+        for s in sorted(set(scans(store.db, statements))):
+            failures.append(f"consulta sin índice: {s}")
+        if ms > args.budget_ms:
+            failures.append(f"summary() {ms:.1f} ms > {args.budget_ms:.0f} ms")
+        print(trends.caption(summary))
+        for title, head, rows in trends.sections(summary)[:2]:
+            print(f"  {title}: " + '; '.join(f"{r[0]} {r[1:]}" for r in rows))
+        store.close()
+    for f in failures:
+        print(f"::error::{f}")
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
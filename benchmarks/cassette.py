@@ -0,0 +1,140 @@
+import hashlib, http.client, json, os, sys, threading, time
+from urllib.parse import parse_qsl, urlencode, urlparse
+
+from fake_github import FakeGitHub, make_handler
+
+# Cabeceras que se guardan de cada respuesta; el resto (Date, Server, X-GitHub-Request-Id...) cambia en cada request
+KEEP_HEADERS = ('link', 'etag', 'last-modified', 'retry-after', 'x-ratelimit-limit', 'x-ratelimit-remaining', 'x-ratelimit-used',
+                'x-ratelimit-reset', 'x-ratelimit-resource')
+FORWARD_HEADERS = ('Authorization', 'Accept', 'Content-Type', 'User-Agent', 'X-GitHub-Api-Version')
+BASE = '{base}'
+
+
+def request_key(method, path, body=b''):
+    # Método, ruta y query ordenada. GraphQL añade un digest de la consulta; el resto de POST (crear el Issue) no,
+    # porque su cuerpo lleva la fecha y el cassette dejaría de servir al día siguiente.
+    u = urlparse(path)
+    q = urlencode(sorted(parse_qsl(u.query, keep_blank_values=True)))
+    key = f"{method} {u.path}" + (f"?{q}" if q else '')
+    if u.path == '/graphql' and body:
+        try:
+            body = json.dumps(json.loads(body), sort_keys=True).encode('utf-8')
+        except ValueError:
+            pass
+        key += ' ' + hashlib.sha256(body).hexdigest()[:16]
+    return key
+
+
+class Cassette:
+    # Interacciones grabadas en NDJSON, una por línea: {key, method, path, status, headers, body, ms}.
+    # Al reproducir, las respuestas de una misma clave salen en el orden en que se grabaron y después se repite la
+    # última (polling, reintentos). Las URLs del upstream en Link se guardan como {base}.
+    def __init__(self, path, record=False):
+        self.path = path
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.served = {}
+        self.misses = []
+        if record:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            open(path, 'w').close()
+            return
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    e = json.loads(line)
+                    self.entries.setdefault(e['key'], []).append(e)
+
+    @property
+    def repo(self):
+        # owner/repo de la primera ruta repos/... grabada (para GITHUB_REPOSITORY al reproducir)
+        for entries in self.entries.values():
+            parts = urlparse(entries[0]['path']).path.strip('/').split('/')
+            if parts[0] == 'repos' and len(parts) >= 3:
+                return f"{parts[1]}/{parts[2]}"
+        return ''
+
+    def add(self, entry):
+        with self.lock:
+            self.entries.setdefault(entry['key'], []).append(entry)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+
+    def next(self, key):
+        with self.lock:
+            entries = self.entries.get(key)
+            if not entries:
+                self.misses.append(key)
+                return None
+            i = self.served.get(key, 0)
+            self.served[key] = i + 1
+            return entries[min(i, len(entries) - 1)]
+
+
+class CassetteGitHub(FakeGitHub):
+    # Servidor de cassette: con upstream graba (proxy hacia la API real), sin él reproduce. Cuenta las llamadas y
+    # aplica latencia y límites como FakeGitHub. recorded_latency: al reproducir, espera lo que tardó cada respuesta.
+    # Al grabar solo pasan los GET y GraphQL; crear Issues en el repositorio real exige allow_writes.
+    def __init__(self, cassette, upstream='', allow_writes=False, recorded_latency=False, **kwargs):
+        super().__init__(repo=cassette.repo, **kwargs)
+        self.cassette = cassette
+        self.upstream = upstream.rstrip('/')
+        self.allow_writes = allow_writes
+        self.recorded_latency = recorded_latency
+        self._local = threading.local()
+
+    def forward(self, method, path, body, headers):
+        u = urlparse(self.upstream)
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            cls = http.client.HTTPSConnection if u.scheme == 'https' else http.client.HTTPConnection
+            conn = self._local.conn = cls(u.hostname, u.port, timeout=60)
+        try:
+            conn.request(method, u.path.rstrip('/') + path, body=body or None, headers=headers)
+            resp = conn.getresponse()
+            return resp.status, resp.getheaders(), resp.read()
+        except (http.client.HTTPException, OSError):
+            conn.close()
+            self._local.conn = None
+            raise
+
+
+def make_cassette_handler(state):
+    class Handler(make_handler(state)):
+        def base(self):
+            return f"http://{self.headers.get('Host')}"
+
+        def route(self, u, params):
+            key = request_key(self.command, self.path, self.body)
+            if state.upstream:
+                return self.record(key)
+            entry = state.cassette.next(key)
+            if entry is None:
+                print(f"cassette: sin grabación para {key}", file=sys.stderr)
+                return self.send_json(404, {'message': f"cassette: sin grabación para {key}"})
+            if state.recorded_latency:
+                time.sleep(entry['ms'] / 1000)
+            headers = {k: v.replace(BASE, self.base()) for k, v in entry['headers'].items()}
+            self.send_body(entry['status'], entry['body'].encode('utf-8'), headers)
+
+        def record(self, key):
+            if self.command != 'GET' and urlparse(self.path).path != '/graphql' and not state.allow_writes:
+                status, headers, body = 403, {}, json.dumps({'message': 'cassette: escritura bloqueada al grabar (allow_writes)'}).encode('utf-8')
+                ms = 0
+            else:
+                # Sin cabeceras condicionales (el cassette guarda cuerpos completos; el ETag lo resuelve send_body) ni gzip
+                fwd = {k: self.headers[k] for k in FORWARD_HEADERS if self.headers.get(k)}
+                t0 = time.perf_counter()
+                try:
+                    status, raw_headers, body = state.forward(self.command, self.path, self.body, fwd)
+                except (http.client.HTTPException, OSError) as e:
+                    return self.send_json(502, {'message': f"cassette: upstream {e}"})
+                ms = round((time.perf_counter() - t0) * 1000, 1)
+                headers = {k.lower(): v.replace(state.upstream, BASE) for k, v in raw_headers if k.lower() in KEEP_HEADERS}
+            state.cassette.add({'key': key, 'method': self.command, 'path': self.path, 'status': status, 'headers': headers,
+                                'body': body.decode('utf-8', 'replace'), 'ms': ms})
+            self.send_body(status, body, {k: v.replace(BASE, self.base()) for k, v in headers.items()})
+
+        route_get = route_post = route
+
+    return Handler
@@ -0,0 +1,388 @@
+import argparse, base64, hashlib, json, re, sys, threading, time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+ALIAS_RE = re.compile(r'(\w+)\s*:\s*pullRequest\(number:\s*(\d+)\)')
+# Ventana del rate limit primario por recurso, como en GitHub (search es por minuto)
+RATE_WINDOWS = {'core': 3600, 'search': 60, 'graphql': 3600}
+SEARCH_MAX = 1000
+SECONDARY_MESSAGE = 'You have exceeded a secondary rate limit. Please wait a few minutes before you try again.'
+
+
+class FakeGitHub:
+    # Estado en memoria del repositorio simulado; los PRs usan el formato de detect_prs.
+    # latency: segundos de espera por request (simula la red); max_per_page: tope de per_page (100 en GitHub)
+    # rate_limits: requests por ventana y recurso, p.ej. {'core': 5000, 'search': 30}; sin él no hay límite ni cabeceras
+    # X-RateLimit-*. Límite secundario (403 + Retry-After): más de max_inflight requests simultáneas o, para probar
+    # reintentos de forma determinista, una de cada secondary_every.
+    def __init__(self, prs=None, repo='acme/monorepo', login='dependabot[bot]', alerts=None, latency=0.0, max_per_page=100,
+                 rate_limits=None, max_inflight=0, secondary_every=0, retry_after=60):
+        self.repo = repo
+        self.login = login
+        self.prs = {pr['number']: pr for pr in (prs or [])}
+        self.alerts = {a['number']: a for a in (alerts or [])}
+        self.issues = []
+        self.lock = threading.Lock()
+        self.calls = {}
+        self.first_call = None        # time.time() de la primera request (bench_startup: arranque hasta la API)
+        self.latency = latency
+        self.max_per_page = max_per_page
+        self.rate_limits = dict(rate_limits or {})
+        self.max_inflight = max_inflight
+        self.secondary_every = secondary_every
+        self.retry_after = retry_after
+        self.inflight = 0
+        self.requests = 0
+        self.rejected = {'primary': 0, 'secondary': 0}
+        self._buckets = {}
+        self._lists = {}
+
+    def count(self, method, path):
+        # Clave por endpoint sin owner/repo y con los números como :n, p.ej. 'GET pulls', 'GET pulls/:n', 'POST graphql'.
+        # La latencia simulada se aplica aquí, una vez por request.
+        parts = path.strip('/').split('/')
+        parts = parts[3:] if parts[0] == 'repos' and len(parts) > 3 else parts
+        key = method + ' ' + '/'.join(':n' if p.isdigit() else p for p in parts)
+        if self.first_call is None:
+            self.first_call = time.time()
+        if self.latency:
+            time.sleep(self.latency)
+        with self.lock:
+            self.calls[key] = self.calls.get(key, 0) + 1
+
+    def resource(self, path):
+        return 'search' if path.startswith('/search/') else 'graphql' if path == '/graphql' else 'core'
+
+    def _rate_headers(self, resource, bucket):
+        limit = self.rate_limits[resource]
+        return {'x-ratelimit-limit': str(limit), 'x-ratelimit-remaining': str(max(0, limit - bucket['used'])),
+                'x-ratelimit-used': str(bucket['used']), 'x-ratelimit-reset': str(bucket['reset']), 'x-ratelimit-resource': resource}
+
+    def admit(self, resource):
+        # Entrada de una request: (rechazo o None, cabeceras de rate limit). Hay que llamar a release() al terminar.
+        with self.lock:
+            self.inflight += 1
+            self.requests += 1
+            headers = {}
+            bucket = None
+            if self.rate_limits.get(resource):
+                now = int(time.time())
+                bucket = self._buckets.get(resource)
+                if not bucket or now >= bucket['reset']:
+                    bucket = self._buckets[resource] = {'used': 0, 'reset': now + RATE_WINDOWS.get(resource, 3600)}
+                headers = self._rate_headers(resource, bucket)
+            if (self.max_inflight and self.inflight > self.max_inflight) or (self.secondary_every and self.requests % self.secondary_every == 0):
+                self.rejected['secondary'] += 1
+                return (403, {'message': SECONDARY_MESSAGE}, {'retry-after': str(self.retry_after)}), headers
+            if bucket is None:
+                return None, headers
+            if bucket['used'] >= self.rate_limits[resource]:
+                self.rejected['primary'] += 1
+                return (403, {'message': f"API rate limit exceeded for {resource}."}, {}), headers
+            bucket['used'] += 1
+            return None, self._rate_headers(resource, bucket)
+
+    def refund(self, resource):
+        # Un 304 (If-None-Match) no gasta rate limit en GitHub
+        with self.lock:
+            bucket = self._buckets.get(resource)
+            if not bucket:
+                return {}
+            bucket['used'] = max(0, bucket['used'] - 1)
+            return self._rate_headers(resource, bucket)
+
+    def release(self):
+        with self.lock:
+            self.inflight -= 1
+
+    def rest_pr(self, pr):
+        return {
+            'number': pr['number'],
+            'title': pr['title'],
+            'html_url': pr['url'],
+            'labels': pr.get('labels', []),
+            'created_at': pr.get('createdAt', ''),
+            'updated_at': pr.get('updatedAt') or pr.get('createdAt', ''),
+            'head': {'ref': pr.get('headRefName', '')},
+            'state': 'closed' if pr.get('state') in ('closed', 'merged') else 'open',
+            'merged_at': pr.get('mergedAt') or None,
+            'closed_at': pr.get('closedAt') or None,
+            'user': {'login': self.login},
+            'body': pr.get('body', f"Bumps {pr['title']}.\n\nRelease notes..."),
+        }
+
+    def _cached(self, key, build):
+        # Listados ordenados cacheados hasta el siguiente touch(): con 100k PRs cada página no reconstruye la lista
+        with self.lock:
+            out = self._lists.get(key)
+        if out is None:
+            out = build()
+            with self.lock:
+                self._lists[key] = out
+        return out
+
+    def list_pulls(self, state, sort='created', direction='desc'):
+        return self._cached(('pulls', state, sort, direction), lambda: self._list_pulls(state, sort, direction))
+
+    def _list_pulls(self, state, sort, direction):
+        out = [self.rest_pr(p) for p in self.prs.values()]
+        field = 'updated_at' if sort == 'updated' else 'number'
+        out.sort(key=lambda p: (p[field], p['number']), reverse=direction != 'asc')
+        if state in ('open', 'closed'):
+            out = [p for p in out if p['state'] == state]
+        return out
+
+    def search_issues(self, q):
+        # Subconjunto de la sintaxis de búsqueda que usa detect_prs: repo:, is:pr|issue|open|closed|merged, author:,
+        # label:. Los valores de una misma clave se combinan con OR (los paréntesis y OR se ignoran), las claves con AND.
+        terms = {}
+        for tok in q.replace('(', ' ').replace(')', ' ').split():
+            if ':' not in tok:
+                continue
+            k, v = tok.split(':', 1)
+            v = v.strip('"').lower()
+            terms.setdefault('type' if k == 'is' and v in ('pr', 'issue') else k, set()).add(v)
+        if ('repo' in terms and self.repo.lower() not in terms['repo']) or ('type' in terms and 'pr' not in terms['type']):
+            return []
+        authors = {a[4:] + '[bot]' if a.startswith('app/') else a for a in terms.get('author', ())}
+        out = []
+        for pr in self.list_pulls('all'):
+            state = 'merged' if pr['merged_at'] else pr['state']
+            if authors and self.login.lower() not in authors:
+                continue
+            if 'label' in terms and not terms['label'] & {l.get('name', '').lower() for l in pr['labels']}:
+                continue
+            if 'is' in terms and not terms['is'] & {pr['state'], state}:
+                continue
+            item = {k: v for k, v in pr.items() if k not in ('head', 'merged_at', 'body')}
+            item['pull_request'] = {'html_url': pr['html_url'], 'merged_at': pr['merged_at']}
+            out.append(item)
+        return out
+
+    def list_issues(self, state='open', since=''):
+        return self._cached(('issues', state, since), lambda: self._list_issues(state, since))
+
+    def _list_issues(self, state, since):
+        # Como GitHub, el listado de Issues incluye los PRs (con la clave pull_request); del más nuevo al más antiguo
+        pulls = [dict(p, pull_request={'html_url': p['html_url']}) for p in self.list_pulls('all')]
+        out = sorted(pulls + self.issues, key=lambda i: i['number'], reverse=True)
+        if state in ('open', 'closed'):
+            out = [i for i in out if i['state'] == state]
+        return [i for i in out if i['updated_at'] >= since] if since else out
+
+    def list_alerts(self, states=None, sort='created', direction='desc'):
+        return self._cached(('alerts', tuple(states or ()), sort, direction), lambda: self._list_alerts(states, sort, direction))
+
+    def _list_alerts(self, states, sort, direction):
+        out = list(self.alerts.values())
+        if states:
+            out = [a for a in out if a['state'] in states]
+        field = 'updated_at' if sort == 'updated' else 'created_at'
+        out.sort(key=lambda a: (a[field], a['number']), reverse=direction != 'asc')
+        return out
+
+    def touch(self, kind, num, **changes):
+        # Simula un cambio en el repositorio: actualiza campos y el timestamp de modificación
+        now = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+        with self.lock:
+            self._lists.clear()
+            if kind == 'pr':
+                self.prs[num] = dict(self.prs.get(num, {'number': num, 'title': f"Bump pkg{num} from 1.0.0 to 1.0.1", 'url': f"https://github.com/{self.repo}/pull/{num}", 'createdAt': now}), updatedAt=now, **changes)
+            else:
+                self.alerts[num] = dict(self.alerts[num], updated_at=now, **changes)
+
+    def graphql_pr(self, num):
+        pr = self.prs.get(num)
+        if not pr:
+            return None
+        rest = self.rest_pr(pr)
+        st = 'MERGED' if rest['merged_at'] else rest['state'].upper()
+        return {'number': num, 'state': st, 'mergedAt': rest['merged_at'], 'headRefName': pr.get('headRefName', ''), 'body': rest['body'],
+                'labels': {'nodes': [{'name': l.get('name', ''), 'color': l.get('color', '')} for l in pr.get('labels', [])]}}
+
+
+def paginate(items, params, max_per_page=100):
+    per_page = min(int(params.get('per_page', ['30'])[0]), max_per_page)
+    page = int(params.get('page', ['1'])[0])
+    last = max(1, (len(items) + per_page - 1) // per_page)
+    return items[(page-1)*per_page:page*per_page], page, last
+
+def cursor(i):
+    return base64.urlsafe_b64encode(f"i:{i}".encode()).decode().rstrip('=')
+
+def paginate_cursor(items, params, max_per_page=100):
+    # Paginación por cursor como la API de alertas: `after` opaco y solo rel="next"
+    per_page = min(int(params.get('per_page', ['30'])[0]), max_per_page)
+    after = params.get('after', [''])[0]
+    start = int(base64.urlsafe_b64decode(after + '=' * (-len(after) % 4)).decode().split(':')[1]) if after else 0
+    chunk = items[start:start+per_page]
+    return chunk, (cursor(start + per_page) if start + per_page < len(items) else '')
+
+
+def make_handler(state):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        disable_nagle_algorithm = True
+        rate_headers = {}
+        resource = 'core'
+
+        def log_message(self, *args):
+            pass
+
+        def send_body(self, status, body, headers=None):
+            # Los GET 200 llevan ETag (el recibido de GitHub al reproducir un cassette o un hash del cuerpo); con
+            # If-None-Match igual se responde 304 sin cuerpo ni Link. Los límites emulados pisan los grabados.
+            headers = dict({k.lower(): v for k, v in (headers or {}).items()}, **self.rate_headers)
+            if self.command == 'GET' and status == 200:
+                headers.setdefault('etag', '"' + hashlib.sha1(body).hexdigest() + '"')
+                if headers['etag'] in (self.headers.get('If-None-Match') or ''):
+                    # Sin Link, como GitHub: el cliente tiene que reponerlo desde la caché para seguir paginando
+                    status, body = 304, b''
+                    headers.pop('link', None)
+                    headers.update(state.refund(self.resource))
+            self.send_response(status)
+            if status != 304:
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            for k, v in headers.items():
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def send_json(self, status, data, headers=None):
+            self.send_body(status, json.dumps(data).encode('utf-8'), headers)
+
+        def page_links(self, path, params, page, last):
+            def url(p):
+                q = '&'.join(f"{k}={v[0]}" for k, v in params.items() if k != 'page')
+                return f"<http://{self.headers.get('Host')}{path}?{q}&page={p}>"
+            links = []
+            if page < last:
+                links.append(f'{url(page+1)}; rel="next"')
+            links.append(f'{url(last)}; rel="last"')
+            return {'Link': ', '.join(links)}
+
+        def handle_api(self, method, route):
+            # Conteo y latencia, límites primario y secundario, y después la ruta. El cuerpo se lee siempre, también
+            # si la request se rechaza, para no desincronizar la conexión keep-alive.
+            u = urlparse(self.path)
+            length = int(self.headers.get('Content-Length', '0') or 0)
+            self.body = self.rfile.read(length) if length else b''
+            state.count(method, u.path)
+            self.resource = state.resource(u.path)
+            rejected, self.rate_headers = state.admit(self.resource)
+            try:
+                if rejected:
+                    return self.send_json(*rejected)
+                return route(u, parse_qs(u.query))
+            finally:
+                state.release()
+
+        def do_GET(self):
+            self.handle_api('GET', self.route_get)
+
+        def do_POST(self):
+            self.handle_api('POST', self.route_post)
+
+        def route_get(self, u, params):
+            parts = u.path.strip('/').split('/')
+            if u.path == '/rate_limit':
+                return self.send_json(200, {'resources': {'core': {'limit': 5000, 'remaining': 5000}}})
+            if u.path == '/search/issues':
+                items = state.search_issues(params.get('q', [''])[0])
+                page_items, page, last = paginate(items[:SEARCH_MAX], params, state.max_per_page)
+                return self.send_json(200, {'total_count': len(items), 'incomplete_results': False, 'items': page_items},
+                                      self.page_links(u.path, params, page, last))
+            if len(parts) == 4 and parts[0] == 'repos' and parts[3] == 'pulls':
+                pulls = state.list_pulls(params.get('state', ['open'])[0], params.get('sort', ['created'])[0], params.get('direction', ['desc'])[0])
+                items, page, last = paginate(pulls, params, state.max_per_page)
+                return self.send_json(200, items, self.page_links(u.path, params, page, last))
+            if len(parts) == 5 and parts[0] == 'repos' and parts[3:] == ['dependabot', 'alerts']:
+                states = [s for s in params.get('state', [''])[0].split(',') if s]
+                alerts = state.list_alerts(states, params.get('sort', ['created'])[0], params.get('direction', ['desc'])[0])
+                items, after = paginate_cursor(alerts, params, state.max_per_page)
+                headers = {}
+                if after:
+                    q = '&'.join(f"{k}={v[0]}" for k, v in params.items() if k != 'after')
+                    headers['Link'] = f'<http://{self.headers.get("Host")}{u.path}?{q}&after={after}>; rel="next"'
+                return self.send_json(200, items, headers)
+            if len(parts) == 5 and parts[0] == 'repos' and parts[3] == 'pulls':
+                pr = state.prs.get(int(parts[4]))
+                return self.send_json(200, state.rest_pr(pr)) if pr else self.send_json(404, {'message': 'Not Found'})
+            if len(parts) == 4 and parts[0] == 'repos' and parts[3] == 'issues':
+                issues = state.list_issues(params.get('state', ['open'])[0], params.get('since', [''])[0])
+                items, page, last = paginate(issues, params, state.max_per_page)
+                return self.send_json(200, items, self.page_links(u.path, params, page, last))
+            return self.send_json(404, {'message': 'Not Found'})
+
+        def route_post(self, u, params):
+            data = json.loads(self.body or b'{}')
+            parts = u.path.strip('/').split('/')
+            if u.path == '/graphql':
+                repo = {}
+                for alias, num in ALIAS_RE.findall(data.get('query', '')):
+                    repo[alias] = state.graphql_pr(int(num))
+                return self.send_json(200, {'data': {'repository': repo}})
+            if len(parts) == 4 and parts[0] == 'repos' and parts[3] == 'issues':
+                with state.lock:
+                    # Issues y PRs comparten numeración
+                    num = max([0, *state.prs, *(i['number'] for i in state.issues)]) + 1
+                    now = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+                    issue = {'number': num, 'title': data.get('title', ''), 'body': data.get('body', ''), 'state': 'open',
+                             'created_at': now, 'updated_at': now,
+                             'labels': [{'name': l} for l in data.get('labels', [])], 'html_url': f"https://github.com/{state.repo}/issues/{num}"}
+                    state.issues.append(issue)
+                    state._lists.clear()
+                return self.send_json(201, issue)
+            return self.send_json(404, {'message': 'Not Found'})
+
+    return Handler
+
+
+def start_server(state, port=0, handler=None):
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler or make_handler(state))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+def parse_rate_limits(raw):
+    # 'core=5000,search=30,graphql=5000'
+    return {k.strip(): int(v) for k, v in (item.split('=', 1) for item in raw.split(',') if '=' in item)}
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser(description='GitHub simulado (datos sintéticos) o servidor de cassettes (--record/--replay)')
+    ap.add_argument('prs', nargs='?', type=int, default=500, help='PRs sintéticos')
+    ap.add_argument('port', nargs='?', type=int, default=8765)
+    ap.add_argument('latency_ms', nargs='?', type=float, default=0.0, help='latencia por request')
+    ap.add_argument('per_page', nargs='?', type=int, default=100, help='tope de per_page')
+    ap.add_argument('--rate-limit', default='', help='requests por ventana y recurso, p.ej. core=5000,search=30,graphql=5000')
+    ap.add_argument('--max-inflight', type=int, default=0, help='límite secundario: requests simultáneas (0 = sin límite)')
+    ap.add_argument('--secondary-every', type=int, default=0, help='límite secundario en una de cada N requests')
+    ap.add_argument('--retry-after', type=int, default=60)
+    ap.add_argument('--record', metavar='CASSETTE', default='', help='graba las respuestas de --upstream')
+    ap.add_argument('--upstream', default='https://api.github.com')
+    ap.add_argument('--allow-writes', action='store_true', help='al grabar, deja pasar los POST que no son GraphQL')
+    ap.add_argument('--replay', metavar='CASSETTE', default='', help='reproduce un cassette')
+    ap.add_argument('--recorded-latency', action='store_true', help='al reproducir, la latencia grabada de cada respuesta')
+    args = ap.parse_args()
+    limits = dict(latency=args.latency_ms / 1000, max_per_page=args.per_page, rate_limits=parse_rate_limits(args.rate_limit),
+                  max_inflight=args.max_inflight, secondary_every=args.secondary_every, retry_after=args.retry_after)
+    if args.record or args.replay:
+        from cassette import Cassette, CassetteGitHub, make_cassette_handler
+        cassette = Cassette(args.record or args.replay, record=bool(args.record))
+        state = CassetteGitHub(cassette, args.upstream if args.record else '', args.allow_writes, args.recorded_latency, **limits)
+        server, url = start_server(state, args.port, make_cassette_handler(state))
+        if args.replay:
+            print(f"GITHUB_REPOSITORY={cassette.repo}")
+    else:
+        from synthetic import make_alerts, make_prs
+        server, url = start_server(FakeGitHub(make_prs(args.prs), alerts=make_alerts(args.prs), **limits), args.port)
+    print(f"GITHUB_API_URL={url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+        if args.replay and cassette.misses:
+            print(f"cassette: {len(cassette.misses)} requests sin grabación", file=sys.stderr)
@@ -0,0 +1,88 @@
+import random
+from datetime import datetime, timedelta, timezone
+
+ECOSYSTEMS = ['npm_and_yarn','pip','github_actions','docker','maven','gomod','cargo','bundler']
+DIRECTORIES = ['', '/', '/api', '/app', '/web/frontend', '/services/auth', '/main/tools', '/infra docker']
+PACKAGES = ['lodash','requests','actions/checkout','node','spring-core','golang.org/x/net','serde','rails','axios','urllib3','express','pytest']
+LABELS = [{'name':'dependencies','color':'0366d6'},{'name':'security','color':'d73a4a'},{'name':'javascript','color':'f1e05a'},{'name':'python','color':'3572A5'},{'name':'github_actions','color':'000000'}]
+
+
+def _version(rng):
+    return f"{rng.randint(0,12)}.{rng.randint(0,30)}.{rng.randint(0,40)}"
+
+def make_pr(rng, num, now):
+    eco = rng.choice(ECOSYSTEMS)
+    pkg = rng.choice(PACKAGES)
+    frm = _version(rng)
+    kind = rng.random()
+    M, m, p = (int(x) for x in frm.split('.'))
+    if kind < 0.15:
+        to = f"{M+1}.0.0"
+    elif kind < 0.45:
+        to = f"{M}.{m+1}.0"
+    else:
+        to = f"{M}.{m}.{p+1}"
+    d = rng.choice(DIRECTORIES)
+    title = f"Bump {pkg} from {frm} to {to}" + (f" in {d}" if d else '')
+    if rng.random() < 0.03:
+        title = f"Update dependency {pkg}"
+    ref_dir = (d or '/').strip('/').replace(' ', '-')
+    ref = '/'.join(x for x in ['dependabot', eco, ref_dir, f"{pkg}-{to}"] if x)
+    created = now - timedelta(days=rng.randint(0, 120), hours=rng.randint(0, 23))
+    state = rng.choices(['open','closed','merged'], weights=[6,2,2])[0]
+    merged_at = (created + timedelta(days=rng.randint(0, 10))).strftime('%Y-%m-%dT%H:%M:%SZ') if state == 'merged' else ''
+    updated = min(now, created + timedelta(days=rng.randint(0, 14), minutes=rng.randint(0, 59)))
+    pr = {
+        'number': num,
+        'title': title,
+        'url': f"https://github.com/acme/monorepo/pull/{num}",
+        'labels': rng.sample(LABELS, rng.randint(0, 3)),
+        'createdAt': created.strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'updatedAt': updated.strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'headRefName': ref,
+        'state': 'closed' if state == 'merged' else state,
+    }
+    if merged_at:
+        pr['mergedAt'] = merged_at
+    if state != 'open':
+        pr['closedAt'] = merged_at or pr['updatedAt']
+    return pr
+
+def make_prs(n, seed=42, now=None):
+    rng = random.Random(seed)
+    now = now or datetime(2026, 1, 1, tzinfo=timezone.utc)
+    return [make_pr(rng, i + 1, now) for i in range(n)]
+
+SEVERITIES = ['critical','high','medium','low']
+ALERT_ECOSYSTEMS = {'npm': 'package-lock.json', 'pip': 'requirements.txt', 'maven': 'pom.xml', 'go': 'go.sum', 'rubygems': 'Gemfile.lock', 'actions': '.github/workflows/ci.yml'}
+
+def make_alert(rng, num, now):
+    # Forma de la respuesta REST de repos/{repo}/dependabot/alerts
+    eco = rng.choice(sorted(ALERT_ECOSYSTEMS))
+    pkg = rng.choice(PACKAGES)
+    d = rng.choice(DIRECTORIES).strip().replace(' ', '-').strip('/')
+    manifest = ALERT_ECOSYSTEMS[eco] if eco == 'actions' else '/'.join(x for x in [d, ALERT_ECOSYSTEMS[eco]] if x)
+    sev = rng.choices(SEVERITIES, weights=[1,3,4,2])[0]
+    created = now - timedelta(days=rng.randint(0, 365), hours=rng.randint(0, 23))
+    updated = min(now, created + timedelta(days=rng.randint(0, 30), minutes=rng.randint(0, 59)))
+    state = rng.choices(['open','fixed','dismissed','auto_dismissed'], weights=[6,2,1,1])[0]
+    frm = _version(rng)
+    ghsa = 'GHSA-' + '-'.join(''.join(rng.choice('23456789cfghjmpqrvwx') for _ in range(4)) for _ in range(3))
+    cve = f"CVE-{rng.randint(2018, 2026)}-{rng.randint(1000, 99999)}" if rng.random() < 0.8 else None
+    return {
+        'number': num,
+        'state': state,
+        'html_url': f"https://github.com/acme/monorepo/security/dependabot/{num}",
+        'created_at': created.strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'updated_at': updated.strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'dependency': {'package': {'ecosystem': eco, 'name': pkg}, 'manifest_path': manifest, 'scope': rng.choice(['runtime','development'])},
+        'security_advisory': {'ghsa_id': ghsa, 'cve_id': cve, 'summary': f"{pkg} vulnerable to {rng.choice(['prototype pollution','ReDoS','path traversal','SSRF','XSS'])}",
+                              'severity': sev, 'cvss': {'score': round(rng.uniform(1, 10), 1)}},
+        'security_vulnerability': {'package': {'ecosystem': eco, 'name': pkg}, 'severity': sev, 'vulnerable_version_range': f"< {frm}",
+                                   'first_patched_version': {'identifier': frm} if rng.random() < 0.85 else None},
+    }
+
+def make_alerts(n, seed=7, now=None):
+    rng = random.Random(seed)
+    now = now or datetime(2026, 1, 1, tzinfo=timezone.utc)
+    return [make_alert(rng, i + 1, now) for i in range(n)]
@@ -0,0 +1,130 @@
+import atexit, json, os, sys, threading
+
+from tracing import log
+
+_budget = None
+_budget_lock = threading.Lock()
+
+
+class ApiBudget:
+    # Cuenta las requests a la API por clase de endpoint ('GET pulls', 'GET pulls/:n', 'POST graphql'...; las mismas
+    # claves que benchmarks/fake_github.py) y por script. El total de la ejecución se acumula entre los pasos del job
+    # en `path`. Con límite (API_BUDGET > 0) el trabajo opcional pregunta antes con allows(): si no cabe, el script
+    # toma un camino degradado (sin cuerpos de PR, estados del listado...) en lugar de fallar. Lo imprescindible
+    # (listar PRs, crear el Issue) no pregunta y puede pasarse del límite.
+    def __init__(self, limit=0, path='', script=''):
+        self.limit = limit
+        self.path = path
+        self.script = script or os.path.splitext(os.path.basename(sys.argv[0] or 'python'))[0]
+        self.pid = os.getpid()
+        self.lock = threading.Lock()
+        self.counts = {}
+        self.degraded = {}
+        self.previous, self.previous_degraded = {}, {}
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+            if isinstance(data, dict) and isinstance(data.get('scripts'), dict):
+                self.previous, self.previous_degraded = data['scripts'], data.get('degraded') or {}
+        except Exception:
+            pass
+
+    def record(self, key, n=1):
+        with self.lock:
+            self.counts[key] = self.counts.get(key, 0) + n
+
+    def merge(self, counts):
+        # Llamadas hechas en un proceso del pool de render_pipeline (ver delta)
+        for key, n in counts.items():
+            self.record(key, n)
+
+    def mark(self):
+        with self.lock:
+            return dict(self.counts)
+
+    def delta(self, mark):
+        with self.lock:
+            return {k: n - mark.get(k, 0) for k, n in self.counts.items() if n - mark.get(k, 0)}
+
+    def script_calls(self):
+        with self.lock:
+            return sum(self.counts.values())
+
+    def used(self):
+        return sum(sum(c.values()) for c in self.previous.values()) + self.script_calls()
+
+    def allows(self, n, what):
+        # ¿Caben n llamadas más? Si no, deja constancia de lo que se omite (log, output y aviso al terminar)
+        if self.limit <= 0 or self.used() + n <= self.limit:
+            return True
+        note = f"{what} ({n} llamadas; usadas {self.used()}/{self.limit})"
+        with self.lock:
+            first = what not in self.degraded
+            self.degraded.setdefault(what, note)
+        if first:
+            log(f"api_budget: sin presupuesto para {note}")
+        return False
+
+    def totals(self):
+        merged = {name: dict(c) for name, c in self.previous.items()}
+        mine = merged.setdefault(self.script, {})
+        for key, n in self.mark().items():
+            mine[key] = mine.get(key, 0) + n
+        return merged
+
+    def save(self):
+        scripts = self.totals()
+        total = sum(sum(c.values()) for c in scripts.values())
+        degraded = dict(self.previous_degraded)
+        if self.degraded:
+            degraded[self.script] = degraded.get(self.script, []) + list(self.degraded.values())
+        if self.path:
+            try:
+                os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                with open(self.path + '.tmp', 'w') as f:
+                    json.dump({'limit': self.limit, 'total': total, 'scripts': scripts, 'degraded': degraded}, f, indent=1, sort_keys=True)
+                os.replace(self.path + '.tmp', self.path)
+            except Exception:
+                pass
+        mine = self.script_calls()
+        by_key = ', '.join(f"{k}={n}" for k, n in sorted(self.mark().items()))
+        log(f"api_budget: {self.script} {mine} llamadas ({by_key or '—'}); total de la ejecución {total}" + (f"/{self.limit}" if self.limit > 0 else ''))
+        out = os.getenv('GITHUB_OUTPUT')
+        if out:
+            try:
+                with open(out, 'a') as f:
+                    f.write(f"api_calls={mine}\napi_calls_total={total}\napi_degraded={'true' if self.degraded else 'false'}\n")
+            except Exception:
+                pass
+        for note in self.degraded.values():
+            print(f"::warning::Presupuesto de API agotado: se omitió {note}")
+
+
+def get_budget():
+    # API_BUDGET: máximo de llamadas de toda la ejecución (0 = sin límite); API_BUDGET_FILE: acumulado entre pasos
+    # (el workflow usa docs/api-calls.json; sin él cada script cuenta solo lo suyo)
+    global _budget
+    with _budget_lock:
+        if _budget is None:
+            try:
+                limit = int(os.getenv('API_BUDGET','0') or 0)
+            except ValueError:
+                limit = 0
+            _budget = ApiBudget(limit, os.getenv('API_BUDGET_FILE','').strip())
+        return _budget
+
+def set_budget(budget):
+    global _budget
+    with _budget_lock:
+        _budget = budget
+
+def allows(n, what):
+    return get_budget().allows(n, what)
+
+def _at_exit():
+    # Solo si el script usó la API (get_budget) y desde el proceso que lo creó: los del pool no escriben
+    b = _budget
+    if b is not None and os.getpid() == b.pid:
+        b.save()
+
+atexit.register(_at_exit)
@@ -0,0 +1,51 @@
+import argparse, glob, os, py_compile, shutil, sys, tempfile, zipapp
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+HTML_ACTION = os.path.join(HERE, '..', '.github', 'actions', 'dependabot-html-report')
+OUT = os.path.join('dist', 'dependabot-report.pyz')
+# Del generador HTML entran sus módulos y los assets que lee (bundle.read_text los saca del .pyz)
+HTML_FILES = ('generate_html.py', 'bundle.py', 'style.css', 'script.js', 'vendor')
+MAIN = 'import sys\nfrom cli import main\nsys.exit(main())\n'
+
+
+def build(out=OUT, interpreter='/usr/bin/env python3'):
+    # Zipapp con los módulos de scripts/ y el generador HTML. Junto a cada .py va su .pyc (hash sin comprobar, del
+    # intérprete que construye): zipimport lo carga sin compilar y, con otra versión de Python, usa el .py.
+    # Sin comprimir: descomprimir cada módulo al importar cuesta más que los KiB que se ahorran.
+    with tempfile.TemporaryDirectory() as stage:
+        sources = [p for p in glob.glob(os.path.join(HERE, '*.py')) if os.path.basename(p) != 'build_cli.py']
+        for name in HTML_FILES:
+            src = os.path.join(HTML_ACTION, name)
+            if os.path.isdir(src):
+                shutil.copytree(src, os.path.join(stage, name))
+            elif name.endswith('.py'):
+                sources.append(src)
+            else:
+                shutil.copy(src, stage)
+        with open(os.path.join(stage, '__main__.py'), 'w') as f:
+            f.write(MAIN)
+        sources.append(os.path.join(stage, '__main__.py'))
+        for src in sources:
+            name = os.path.basename(src)
+            if os.path.dirname(src) != stage:
+                shutil.copy(src, stage)
+            py_compile.compile(os.path.join(stage, name), cfile=os.path.join(stage, name + 'c'), dfile=name, doraise=True,
+                               invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH)
+        os.makedirs(os.path.dirname(out) or '.', exist_ok=True)
+        zipapp.create_archive(stage, out, interpreter=interpreter, compressed=False)
+    return {'path': out, 'modules': len(sources), 'bytes': os.path.getsize(out)}
+
+def main():
+    ap = argparse.ArgumentParser(description='Empaqueta scripts/ como zipapp ejecutable (dependabot-report)')
+    ap.add_argument('--out', default=OUT)
+    args = ap.parse_args()
+    result = build(args.out)
+    print(f"📦 {result['path']}: {result['modules']} módulos, {result['bytes']/1024:.0f} KiB (bytecode de Python {sys.version_info[0]}.{sys.version_info[1]})")
+    out = os.getenv('GITHUB_OUTPUT')
+    if out:
+        with open(out, 'a') as f:
+            f.write(f"cli_path={result['path']}\n")
+    return 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
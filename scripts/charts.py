@@ -0,0 +1,181 @@
+import hashlib, json, math, os
+from functools import lru_cache
+from xml.sax.saxutils import escape
+
+from pr_records import UPDATE_TYPES
+
+TYPE_COLORS = {'major':'#dc3545','minor':'#ffc107','patch':'#198754','other':'#6c757d'}
+PALETTE = ['#0d6efd','#6610f2','#6f42c1','#20c997','#fd7e14','#198754','#dc3545','#6c757d']
+WIDTH, HEIGHT = 480, 220
+CHARTS_DIR = os.path.join('docs','charts')
+
+
+def total(agg):
+    return sum(agg.get(k, 0) for k in UPDATE_TYPES)
+
+# Especificaciones (kind, título, etiquetas, valores, colores) a partir de los agregados de pr_records.
+# Son tuplas para servir de clave de cache: mismos agregados -> mismo SVG.
+def types_spec(total_agg):
+    return ('bar', 'Tipos de actualización', UPDATE_TYPES, tuple(total_agg.get(k, 0) for k in UPDATE_TYPES), tuple(TYPE_COLORS[k] for k in UPDATE_TYPES))
+
+def ecos_spec(eco_agg):
+    labels = tuple(sorted(eco_agg))
+    return ('donut', 'PRs por ecosistema', labels, tuple(total(eco_agg[e]) for e in labels), tuple(PALETTE[i % len(PALETTE)] for i in range(len(labels))))
+
+def dirs_spec(dir_agg, limit=8):
+    top = sorted(dir_agg.items(), key=lambda kv: (-total(kv[1]), kv[0]))[:limit]
+    return ('bar', 'PRs por directorio', tuple(d or '/' for d, _ in top), tuple(total(v) for _, v in top), (PALETTE[0],))
+
+def backlog_spec(weekly):
+    # weekly: [(día, PRs abiertos)] del último run de cada semana (trends.summary)
+    return ('bar', 'Backlog abierto por semana', tuple(d[5:] for d, _ in weekly), tuple(n for _, n in weekly), (PALETTE[0],))
+
+def specs(total_agg, eco_agg, dir_agg):
+    return {'types': types_spec(total_agg), 'ecosystems': ecos_spec(eco_agg), 'directories': dirs_spec(dir_agg)}
+
+def _nice_step(vmax, ticks=4):
+    # Paso 1/2/5 x 10^n que deja unas `ticks` divisiones
+    raw = max(vmax / ticks, 1)
+    mag = 10 ** math.floor(math.log10(raw))
+    return next(mag * m for m in (1, 2, 5, 10) if mag * m >= raw)
+
+def _short(s, n=14):
+    return s if len(s) <= n else s[:n-1] + '…'
+
+def shapes(spec, width=WIDTH, height=HEIGHT):
+    # Geometría común en coordenadas SVG (y hacia abajo), así el SVG y el dibujo de reportlab son idénticos:
+    #   ('line', x1, y1, x2, y2) · ('rect', x, y, w, h, color) · ('ring', cx, cy, r, r_in, a0, a1, color) · ('text', x, y, s, anchor, size)
+    kind, _, labels, values, colors = spec
+    out = []
+    if kind == 'donut':
+        tot = sum(values)
+        r = height / 2 - 10
+        cx, cy = r + 10, height / 2
+        a = 90.0
+        for i, v in enumerate(values):
+            if not v:
+                continue
+            sweep = 360.0 * v / tot
+            out.append(('ring', cx, cy, r, r * 0.55, a - sweep, a, colors[i % len(colors)]))
+            a -= sweep
+        if not tot:
+            out.append(('text', cx, cy + 4, '0', 'middle', 11))
+        line = min(18, (height - 10) / max(1, len(labels)))
+        y0 = cy - (len(labels) - 1) * line / 2
+        for i, label in enumerate(labels):
+            y = y0 + i * line
+            out.append(('rect', cx + r + 20, y - 5, 10, 10, colors[i % len(colors)]))
+            out.append(('text', cx + r + 36, y + 4, f"{_short(label, 22)} ({values[i]})", 'start', 11))
+        return out
+    vmax = max(values or (0,)) or 1
+    step = _nice_step(vmax)
+    vmax = math.ceil(vmax / step) * step
+    left, top, bottom = 10 + 7 * len(str(vmax)), 10, height - 24
+    for k in range(int(vmax / step) + 1):
+        v = k * step
+        y = bottom - (bottom - top) * v / vmax
+        out.append(('line', left, y, width - 4, y))
+        out.append(('text', left - 4, y + 4, str(v), 'end', 10))
+    slot = (width - left) / max(1, len(labels))
+    for i, label in enumerate(labels):
+        h = (bottom - top) * values[i] / vmax
+        out.append(('rect', left + slot * (i + 0.15), bottom - h, slot * 0.7, h, colors[i % len(colors)]))
+        out.append(('text', left + slot * (i + 0.5), bottom + 14, _short(label, max(4, int(slot / 7))), 'middle', 10))
+    return out
+
+def _ring_path(cx, cy, r, ri, a0, a1):
+    if a1 - a0 >= 359.999:
+        # anillo completo: dos semicírculos por radio (un arco de 360° no se dibuja)
+        return (f"M{cx-r:.2f},{cy:.2f}A{r:.2f},{r:.2f} 0 1 0 {cx+r:.2f},{cy:.2f}A{r:.2f},{r:.2f} 0 1 0 {cx-r:.2f},{cy:.2f}Z"
+                f"M{cx-ri:.2f},{cy:.2f}A{ri:.2f},{ri:.2f} 0 1 1 {cx+ri:.2f},{cy:.2f}A{ri:.2f},{ri:.2f} 0 1 1 {cx-ri:.2f},{cy:.2f}Z")
+    pt = lambda rad, a: (cx + rad * math.cos(math.radians(a)), cy - rad * math.sin(math.radians(a)))
+    large = 1 if a1 - a0 > 180 else 0
+    (x0, y0), (x1, y1) = pt(r, a1), pt(r, a0)
+    (x2, y2), (x3, y3) = pt(ri, a0), pt(ri, a1)
+    return (f"M{x0:.2f},{y0:.2f}A{r:.2f},{r:.2f} 0 {large} 1 {x1:.2f},{y1:.2f}"
+            f"L{x2:.2f},{y2:.2f}A{ri:.2f},{ri:.2f} 0 {large} 0 {x3:.2f},{y3:.2f}Z")
+
+@lru_cache(maxsize=64)
+def _svg(spec, width, height):
+    title = spec[1]
+    parts = [f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {width} {height}" width="100%" style="max-height:{height}px" role="img" aria-label="{escape(title)}">',
+             f'<title>{escape(title)}</title><g font-family="system-ui,sans-serif" fill="currentColor">']
+    for s in shapes(spec, width, height):
+        if s[0] == 'line':
+            parts.append(f'<line x1="{s[1]:.1f}" y1="{s[2]:.1f}" x2="{s[3]:.1f}" y2="{s[4]:.1f}" stroke="currentColor" stroke-opacity=".25"/>')
+        elif s[0] == 'rect':
+            parts.append(f'<rect x="{s[1]:.1f}" y="{s[2]:.1f}" width="{s[3]:.1f}" height="{s[4]:.1f}" fill="{s[5]}"/>')
+        elif s[0] == 'ring':
+            parts.append(f'<path d="{_ring_path(*s[1:7])}" fill="{s[7]}" fill-rule="evenodd"/>')
+        else:
+            parts.append(f'<text x="{s[1]:.1f}" y="{s[2]:.1f}" text-anchor="{s[4]}" font-size="{s[5]}">{escape(s[3])}</text>')
+    parts.append('</g></svg>')
+    return ''.join(parts)
+
+def svg(spec, width=WIDTH, height=HEIGHT):
+    # Cache en memoria (lru) y, con CHART_CACHE_DIR, en disco entre pasos/jobs; la clave es el hash de la especificación
+    cache_dir = os.getenv('CHART_CACHE_DIR','').strip()
+    if not cache_dir:
+        return _svg(spec, width, height)
+    key = hashlib.sha256(json.dumps([spec, width, height]).encode('utf-8')).hexdigest()[:32]
+    path = os.path.join(cache_dir, f"{key}.svg")
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read()
+    except OSError:
+        pass
+    data = _svg(spec, width, height)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(data)
+    except OSError:
+        pass
+    return data
+
+def drawing(spec, width=WIDTH, height=HEIGHT, text_color='#212529', backend='reportlab'):
+    # Mismas formas para el PDF con reportlab.graphics o con minipdf (backend 'builtin'); ambos tienen la y hacia arriba
+    if backend == 'builtin':
+        return _mini_drawing(spec, width, height, text_color)
+    from reportlab.graphics.shapes import Drawing, Line, Rect, String, Wedge
+    from reportlab.lib import colors
+    d = Drawing(width, height)
+    ink = colors.HexColor(text_color)
+    for s in shapes(spec, width, height):
+        if s[0] == 'line':
+            d.add(Line(s[1], height - s[2], s[3], height - s[4], strokeColor=colors.HexColor('#ced4da'), strokeWidth=0.5))
+        elif s[0] == 'rect':
+            d.add(Rect(s[1], height - s[2] - s[4], s[3], s[4], fillColor=colors.HexColor(s[5]), strokeColor=None))
+        elif s[0] == 'ring':
+            _, cx, cy, r, ri, a0, a1, color = s
+            d.add(Wedge(cx, height - cy, r, a0, a1, radius1=ri, fillColor=colors.HexColor(color), strokeColor=None))
+        else:
+            d.add(String(s[1], height - s[2], s[3], textAnchor=s[4], fontSize=s[5], fontName='Helvetica', fillColor=ink))
+    return d
+
+def _mini_drawing(spec, width, height, text_color):
+    import minipdf
+    d = minipdf.Drawing(width, height)
+    ink, grid = minipdf.HexColor(text_color), minipdf.HexColor('#ced4da')
+    for s in shapes(spec, width, height):
+        if s[0] == 'line':
+            d.add('line', s[1], height - s[2], s[3], height - s[4], grid, 0.5)
+        elif s[0] == 'rect':
+            d.add('rect', s[1], height - s[2] - s[4], s[3], s[4], minipdf.HexColor(s[5]))
+        elif s[0] == 'ring':
+            _, cx, cy, r, ri, a0, a1, color = s
+            d.add('wedge', cx, height - cy, r, a0, a1, ri, minipdf.HexColor(color))
+        else:
+            d.add('text', s[1], height - s[2], s[3], s[4], s[5], ink)
+    return d
+
+def write_charts(chart_specs, out_dir=None):
+    # Escribe cada SVG como <nombre>.svg (p.ej. para adjuntarlos como artefacto) y devuelve las rutas
+    out_dir = out_dir or os.getenv('CHARTS_DIR','') or CHARTS_DIR
+    os.makedirs(out_dir, exist_ok=True)
+    paths = {}
+    for name, spec in chart_specs.items():
+        paths[name] = os.path.join(out_dir, f"{name}.svg")
+        with open(paths[name], 'w', encoding='utf-8') as f:
+            f.write(svg(spec))
+    return paths
@@ -0,0 +1,89 @@
+import os, sys
+
+HTML_ACTION = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '.github', 'actions', 'dependabot-html-report')
+DATASET_PATH = os.path.join('docs','dependabot-dataset.bin')
+
+# Punto de entrada único del workflow: dependabot-report <subcomando> (python3 cli.py o el .pyz de build_cli.py).
+# Cada subcomando importa su módulo al ejecutarse, así el arranque hasta la primera llamada a la API no paga los de
+# los demás (reportlab, p. ej., solo se carga al generar el PDF con ese backend).
+
+def _detect(args):
+    import detect_prs
+    from profiling import phase
+    with phase('detect_prs'):
+        detect_prs.main()
+
+def _alerts(args):
+    import collect_alerts
+    collect_alerts.main()
+
+def _dataset(args):
+    import dataset
+    return dataset.main(args)
+
+def _issue(args):
+    import create_issue
+    create_issue.main()
+
+def _summary(args):
+    import generate_summary
+    generate_summary.main()
+
+def _html(args):
+    # Desde el checkout el generador vive en la action; en el .pyz va junto al resto de módulos
+    if os.path.isdir(HTML_ACTION) and HTML_ACTION not in sys.path:
+        sys.path.insert(0, HTML_ACTION)
+    import generate_html
+    generate_html.main()
+
+def _pdf(args):
+    import generate_pdf
+    return generate_pdf.main()
+
+def _trends(args):
+    import trends
+    return trends.main(args)
+
+def _report(args):
+    import render_pipeline
+    return render_pipeline.main()
+
+def _all(args):
+    # detect, alerts y report en este proceso: módulos, cliente HTTP, tracer y presupuesto de API se cargan una vez
+    # y report reparte entre los renderers el dataset que acaban de escribir los dos primeros
+    os.environ.setdefault('DATASET_PATH', DATASET_PATH)
+    for run in (_detect, _alerts, _report):
+        code = run(args)
+        if code:
+            return code
+    return 0
+
+# subcomando: (función, nombre del proceso en trazas/perfiles/conteo de API, ayuda)
+COMMANDS = {
+    'detect': (_detect, 'detect_prs', 'detecta los PRs de Dependabot y escribe el dataset'),
+    'alerts': (_alerts, 'collect_alerts', 'recoge las alertas de Dependabot y las añade al dataset'),
+    'dataset': (_dataset, 'dataset', 'info|digest|cat <ruta> [sección]'),
+    'issue': (_issue, 'create_issue', 'crea o actualiza el Issue'),
+    'summary': (_summary, 'generate_summary', 'escribe el step summary'),
+    'html': (_html, 'generate_html', 'genera el reporte HTML'),
+    'pdf': (_pdf, 'generate_pdf', 'genera el reporte PDF'),
+    'trends': (_trends, 'trends', '[ruta] [owner/repo] [--json]: tendencias del histórico (TRENDS_DB)'),
+    'report': (_report, 'render_pipeline', 'Issue, Summary, HTML y PDF desde el dataset (RENDERERS)'),
+    'all': (_all, 'dependabot-report', 'detect, alerts y report en un solo proceso'),
+}
+
+def usage():
+    return 'uso: dependabot-report <subcomando> [args]\n\n' + ''.join(f"  {name:<9} {help}\n" for name, (_, _, help) in COMMANDS.items())
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] not in COMMANDS:
+        print(usage(), file=sys.stderr, end='')
+        return 0 if argv and argv[0] in ('-h', '--help') else 2
+    run, process, _ = COMMANDS[argv[0]]
+    # Mismo nombre de proceso que el script suelto: las trazas, los perfiles y el conteo de API no cambian
+    sys.argv = [process] + argv[1:]
+    return run(argv[1:]) or 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,135 @@
+import json, os, threading
+from concurrent.futures import ThreadPoolExecutor
+
+from api_budget import allows
+from dataset import DatasetWriter
+from gh_api import fetch_pages
+from snapshot_store import open_snapshot
+from tracing import log, span
+
+ALERTS_FILE = os.path.join('docs','alerts.ndjson')
+
+def parse_states(raw):
+    return [s.strip().lower() for s in (raw or 'open').split(',') if s.strip()] or ['open']
+
+
+class NdjsonWriter:
+    # Una alerta por línea; las páginas se escriben en cuanto llegan (thread-safe para varios estados en paralelo)
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.path = path
+        self.tmp = path + '.tmp'
+        self.f = open(self.tmp, 'w', encoding='utf-8')
+        self.lock = threading.Lock()
+        self.count = 0
+
+    def write(self, items):
+        lines = [json.dumps(a, separators=(',', ':')) + '\n' for a in items if isinstance(a, dict)]
+        with self.lock:
+            self.f.writelines(lines)
+            self.count += len(lines)
+
+    def close(self):
+        self.f.close()
+        os.replace(self.tmp, self.path)
+
+    def abort(self):
+        self.f.close()
+        try:
+            os.remove(self.tmp)
+        except Exception:
+            pass
+
+def iter_alerts(path):
+    # Lectura incremental: no carga el fichero completo en memoria
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    a = json.loads(line)
+                except Exception:
+                    continue
+                if isinstance(a, dict):
+                    yield a
+    except FileNotFoundError:
+        return
+
+def collect_alerts(repo, path, states=('open',), snapshot=None, workers=None):
+    # Escribe en `path` (NDJSON) todas las alertas en `states` siguiendo los cursores rel="next".
+    # Sin snapshot, cada estado se pide en paralelo y las páginas se vuelcan al fichero según llegan.
+    # Con snapshot solo se piden las alertas actualizadas desde el último watermark
+    # (la API de alertas no tiene `since`: sort=updated desc y se corta al pasar el watermark).
+    api = f"repos/{repo}/dependabot/alerts"
+    states = list(states)
+    scope = f"{repo}|{','.join(sorted(states))}"
+    keep = lambda a: (a.get('state','') or '').lower() in states
+    updated = lambda a: a.get('updated_at','')
+    since = snapshot.watermark('alerts', scope) if snapshot else ''
+    writer = NdjsonWriter(path)
+    if not allows(1 if since else len(states), 'alertas de Dependabot (el reporte va sin alertas)'):
+        writer.close()
+        return 0
+    try:
+        with span('collect_alerts', states=','.join(states), incremental=bool(since)) as attrs:
+            if since:
+                delta = []
+                stop = lambda items: any((a.get('updated_at') or '') < since for a in items)
+                pages = fetch_pages(api, {'sort': 'updated', 'direction': 'desc'}, on_items=delta.extend, stop=stop)
+                delta = [a for a in delta if (a.get('updated_at') or '') >= since]
+                alerts = snapshot.merge('alerts', delta, key=lambda a: a.get('number'), updated=updated, keep=keep, scope=scope)
+                alerts.sort(key=lambda a: a.get('number') or 0, reverse=True)
+                writer.write(alerts)
+                attrs.update(pages=pages, delta=len(delta), alerts=writer.count)
+                log(f"collect_alerts incremental since {since} pages: {pages} delta: {len(delta)} alerts: {writer.count}")
+            else:
+                collected = [] if snapshot else None
+                def on_items(items):
+                    writer.write(items)
+                    if collected is not None:
+                        collected.extend(items)
+                def fetch_state(state):
+                    with span('collect_alerts.state', state=state) as a:
+                        a['pages'] = fetch_pages(api, {'state': state}, on_items=on_items, stop=lambda items: False)
+                    return a['pages']
+                workers = workers or int(os.getenv('ALERT_WORKERS','4') or 4)
+                with ThreadPoolExecutor(max_workers=max(1, min(workers, len(states)))) as ex:
+                    pages = sum(ex.map(fetch_state, states))
+                if snapshot:
+                    snapshot.merge('alerts', collected, key=lambda a: a.get('number'), updated=updated, full=True, scope=scope)
+                attrs.update(pages=pages, alerts=writer.count)
+                log(f"collect_alerts states: {','.join(states)} pages: {pages} alerts: {writer.count}")
+    except Exception:
+        writer.abort()
+        raise
+    writer.close()
+    return writer.count
+
+def main():
+    repo = os.getenv('REPO') or os.getenv('GITHUB_REPOSITORY','')
+    path = os.getenv('ALERTS_FILE','') or ALERTS_FILE
+    snapshot = open_snapshot()
+    count = 0
+    try:
+        count = collect_alerts(repo, path, parse_states(os.getenv('ALERT_STATES','open')), snapshot)
+    except Exception as e:
+        log(f"collect_alerts exception: {e}")
+        NdjsonWriter(path).close()
+    if snapshot:
+        snapshot.save()
+    dataset_path = os.getenv('DATASET_PATH','').strip()
+    if dataset_path:
+        # Añade la sección de alertas al dataset que ya escribió detect_prs, leyendo el NDJSON en streaming
+        with span('dataset.write', section='alerts'), DatasetWriter(dataset_path, append=True) as ds:
+            ds.reset('alerts').add('alerts', iter_alerts(path))
+    out = os.environ.get('GITHUB_OUTPUT')
+    if out:
+        with open(out,'a') as f:
+            f.write(f"alerts_path={path}\n")
+            f.write(f"alerts_count={count}\n")
+    print(f"🛡️ Alertas: {count} ({path})")
+
+if __name__ == '__main__':
+    main()
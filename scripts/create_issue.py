@@ -1,140 +1,174 @@
-import json, os, re, subprocess
+import json, os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from functools import partial
+from http.client import HTTPException
 
-debug_path = os.path.join('docs','output.txt')
+from api_budget import allows
+from dataset import load_records
+from gh_api import ApiError, fetch_pages, gh_get, gh_graphql, gh_post
+from pr_records import normalize_all, empty_agg
+from pr_state import BATCH_SIZE, query_pull_requests
+from profiling import phase, step
+from tracing import log, span
 
-def log(msg):
+# Opciones de publish_issue/build_body; options_from_env() las lee de las variables del workflow
+DEFAULTS = {
+    'repository': '',
+    'title_tpl': 'Reporte Dependabot: ${date}',
+    'labels': (),
+    'run_id': '',
+    'server_url': 'https://github.com',
+    'body_mode': 'rest',          # rest | graphql (ver fetch_bodies)
+    'body_workers': 8,
+    'body_timeout': 15,
+}
+
+def env_num(name, default, cast=int):
     try:
-        with open(debug_path,'a') as df:
-            df.write(msg + "\n")
+        return cast(os.getenv(name,'') or default)
     except Exception:
-        pass
+        return default
+
+def options_from_env():
+    return dict(DEFAULTS,
+        repository=os.getenv('GITHUB_REPOSITORY',''),
+        title_tpl=os.getenv('ISSUE_TITLE_TPL','Reporte Dependabot: ${date}'),
+        labels=tuple(l.strip() for l in os.getenv('ISSUE_LABELS','').split(',') if l.strip()),
+        run_id=os.getenv('RUN_ID',''),
+        server_url=os.getenv('SERVER_URL','https://github.com'),
+        body_mode=os.getenv('BODY_FETCH_MODE','rest'),
+        body_workers=env_num('BODY_WORKERS', 8),
+        body_timeout=env_num('BODY_TIMEOUT', 15, float),
+    )
 
-def pr_details(num, repo):
+def pr_details(num, repo, timeout=None):
     try:
-        r = subprocess.run(['gh','pr','view',str(num),'--repo',repo,'--json','body'], capture_output=True, text=True)
-        if r.returncode == 0:
-            data = json.loads(r.stdout)
-            return data.get('body','')
-        return ''
+        _, _, raw = gh_get(f"repos/{repo}/pulls/{num}", timeout=timeout)
+        return json.loads(raw).get('body','') or ''
     except Exception:
         return ''
 
-def parse_title(t):
-    m = re.search(r"bump\s+([^\s]+)\s+from\s+([^\s]+)\s+to\s+([^\s]+)(?:\s+in\s+(.+))?", t, re.IGNORECASE)
-    if m:
-        return {'name': m.group(1), 'from': m.group(2), 'to': m.group(3), 'dir': m.group(4) or ''}
-    return None
-
-def semver_tuple(s):
-    parts = re.findall(r"\d+", s)
-    nums = [int(x) for x in parts[:3]]
-    while len(nums) < 3:
-        nums.append(0)
-    return tuple(nums)
+def fetch_bodies(numbers, repo, mode=None, workers=None, timeout=None):
+    # Devuelve los cuerpos en el mismo orden que numbers.
+    # rest: un GET por PR con concurrencia acotada; graphql: hasta 100 PRs por consulta.
+    mode = (mode or os.getenv('BODY_FETCH_MODE','rest')).strip().lower()
+    workers = max(1, workers or env_num('BODY_WORKERS', 8))
+    timeout = timeout or env_num('BODY_TIMEOUT', 15, float)
+    if not numbers:
+        return []
+    # Con presupuesto de API limitado: REST (una llamada por PR) -> GraphQL (una por cada 100) -> sin cuerpos
+    batches = (len(numbers)+BATCH_SIZE-1)//BATCH_SIZE
+    if mode != 'graphql' and not allows(len(numbers), f"cuerpos de {len(numbers)} PRs por REST (se usa GraphQL)"):
+        mode = 'graphql'
+    if mode == 'graphql' and not allows(batches, f"cuerpos de {len(numbers)} PRs (el Issue va sin fragmentos)"):
+        return [''] * len(numbers)
+    if mode == 'graphql':
+        try:
+            with span('fetch_bodies', mode='graphql', prs=len(numbers)) as attrs:
+                found = query_pull_requests(repo, numbers, fields='number body', graphql=partial(gh_graphql, timeout=timeout))
+                attrs['found'] = len(found)
+            log(f"fetch_bodies graphql: {len(found)}/{len(numbers)} PRs")
+            return [(found.get(n) or {}).get('body','') or '' for n in numbers]
+        except Exception as e:
+            log(f"fetch_bodies graphql exception: {e}; usando REST")
+    with span('fetch_bodies', mode='rest', prs=len(numbers), workers=min(workers, len(numbers))):
+        with ThreadPoolExecutor(max_workers=min(workers, len(numbers))) as ex:
+            return list(ex.map(lambda n: pr_details(n, repo, timeout), numbers))
 
-def update_type(f, t):
-    fM,fm,fp = semver_tuple(f)
-    tM,tm,tp = semver_tuple(t)
-    if tM != fM:
-        return 'major'
-    if tm != fm:
-        return 'minor'
-    if tp != fp:
-        return 'patch'
-    return 'other'
-
-def build_body(prs, date, repo):
+def build_body(records, date, repo, options=None):
+    opts = dict(DEFAULTS, **(options or {}))
     lines = []
-    run_id = os.getenv('RUN_ID','')
-    server_url = os.getenv('SERVER_URL','https://github.com')
+    run_id, server_url = opts['run_id'], opts['server_url']
     if run_id:
         lines.append(f"**Descargar reportes (PDF/HTML):** {server_url}/{repo}/actions/runs/{run_id}\n\n")
     lines.append(f"### Reporte de actualizaciones ({date})\n")
-    if prs:
-        agg = {'major':0,'minor':0,'patch':0,'other':0}
+    if records:
+        step('issue.enrich')
+        bodies = fetch_bodies([rec.number for rec in records], repo, opts['body_mode'], opts['body_workers'], opts['body_timeout'])
+        step('issue.render')
+        agg = empty_agg()
         lines.append("\n| PR | Paquete | Desde | Hasta | Dir | Labels |\n")
         lines.append("|:--:|:-------|:-----:|:-----:|:---:|:------:|\n")
-        for pr in prs:
-            num = pr.get('number')
-            url = pr.get('url')
-            title_pr = pr.get('title','')
-            meta = parse_title(title_pr) or {'name':'—','from':'—','to':'—','dir':''}
-            labels_pr = ', '.join([l.get('name','') for l in pr.get('labels',[])]) or '—'
-            lines.append(f"| [#{num}]({url}) | {meta['name']} | {meta['from']} | {meta['to']} | {meta['dir']} | {labels_pr} |\n")
-            if meta['from'] != '—' and meta['to'] != '—':
-                agg[update_type(meta['from'], meta['to'])] += 1
+        for rec in records:
+            labels_pr = ', '.join(rec.label_names) or '—'
+            from_ver = rec.from_ver if rec.parsed else '—'
+            to_ver = rec.to_ver if rec.parsed else '—'
+            lines.append(f"| [#{rec.number}]({rec.url}) | {rec.name} | {from_ver} | {to_ver} | {rec.title_dir} | {labels_pr} |\n")
+            if rec.parsed:
+                agg[rec.update_type] += 1
         lines.append("\n#### Resumen por tipo\n")
         lines.append(f"- Major: {agg['major']}\n- Minor: {agg['minor']}\n- Patch: {agg['patch']}\n- Other: {agg['other']}\n")
         lines.append("\n#### Detalles\n")
-        for pr in prs:
-            num = pr.get('number')
-            url = pr.get('url')
-            title_pr = pr.get('title','')
-            body = pr_details(num, repo)
+        for rec, body in zip(records, bodies):
             snippet = (body or '').strip()
             if len(snippet) > 1200:
                 snippet = snippet[:1200] + '…'
-            lines.append(f"- [#{num}]({url}) {title_pr}\n")
+            lines.append(f"- [#{rec.number}]({rec.url}) {rec.title}\n")
             if snippet:
                 lines.append(f"  \n  {snippet}\n")
     else:
         lines.append("\nNo se encontraron PRs de Dependabot en este momento.\n")
     return ''.join(lines)
 
-def find_existing_issue(title, repo):
+def find_existing_issue(title, repo, since=''):
+    # El listado de Issues incluye los PRs abiertos: se pagina hasta el primer Issue con el título. Con since (inicio
+    # del día del título) solo llegan los actualizados desde entonces y los PRs antiguos no ocupan páginas.
+    found = []
+    def on_items(items):
+        found.extend(it.get('html_url','') for it in items if 'pull_request' not in it and it.get('title','') == title)
+    params = {'state': 'open', 'since': since} if since else {'state': 'open'}
     try:
-        r = subprocess.run(['gh','issue','list','--repo',repo,'--state','open','--limit','100','--json','number,title,url'], capture_output=True, text=True)
-        if r.returncode == 0 and r.stdout.strip():
-            items = json.loads(r.stdout)
-            for it in items:
-                if it.get('title','') == title:
-                    return it.get('url','')
-        return ''
+        fetch_pages(f"repos/{repo}/issues", params, on_items=on_items, stop=lambda items: bool(found))
     except Exception:
         return ''
+    return found[0] if found else ''
 
-def main():
-    prs_raw = os.getenv('PRS_DATA','[]')
-    prs = json.loads(prs_raw) if prs_raw.strip() else []
+def publish_issue(prs, options=None):
+    # Reutiliza el Issue abierto con el mismo título o crea uno nuevo; devuelve (url, reutilizado).
+    # prs: dicts o PRRecord ya normalizados
+    opts = dict(DEFAULTS, **(options or {}))
     date = datetime.now(timezone.utc).strftime('%Y-%m-%d')
-    title_tpl = os.getenv('ISSUE_TITLE_TPL','Reporte Dependabot: ${date}')
-    title = title_tpl.replace('${date}', date)
-    labels = [l.strip() for l in os.getenv('ISSUE_LABELS','').split(',') if l.strip()]
-    repo = os.getenv('GITHUB_REPOSITORY')
-    existing = find_existing_issue(title, repo)
+    title = opts['title_tpl'].replace('${date}', date)
+    repo = opts['repository']
+    attrs = step('issue.lookup')
+    existing = find_existing_issue(title, repo, f"{date}T00:00:00Z" if '${date}' in opts['title_tpl'] else '')
+    attrs['found'] = bool(existing)
     if existing:
-        with open(os.environ['GITHUB_OUTPUT'],'a') as f:
-            f.write(f"issue_url={existing}\n")
         log(f"Issue existente reutilizado: {existing}")
-        print(f"🧾 Issue reutilizado: {existing}")
-        return
-    body = build_body(prs, date, repo)
-    cmd = ['gh','issue','create','--repo',repo,'--title',title,'--body',body]
-    for l in labels:
-        cmd += ['--label', l]
-    result = subprocess.run(cmd, capture_output=True, text=True)
+        return existing, True
+    body = build_body(normalize_all(prs), date, repo, opts)
+    step('issue.write', bytes=len(body))
     url = ''
-    if result.returncode == 0:
-        for line in result.stdout.splitlines():
-            if line.strip().startswith('https://'):
-                url = line.strip()
-                break
-    else:
-        log(f"Fallo al crear issue con labels. stderr: {result.stderr.strip()}")
-        result2 = subprocess.run(['gh','issue','create','--repo',repo,'--title',title,'--body',body], capture_output=True, text=True)
-        if result2.returncode == 0:
-            for line in result2.stdout.splitlines():
-                if line.strip().startswith('https://'):
-                    url = line.strip()
-                    break
-        else:
-            log(f"Intento sin labels también falló. stderr: {result2.stderr.strip()}")
-    with open(os.environ['GITHUB_OUTPUT'],'a') as f:
-        f.write(f"issue_url={url}\n")
+    try:
+        url = gh_post(f"repos/{repo}/issues", {'title': title, 'body': body, 'labels': list(opts['labels'])}).get('html_url','')
+    except ApiError as e:
+        # Respuesta de error (p.ej. 422 por labels inexistentes): el Issue no se creó y se puede reintentar sin labels
+        log(f"Fallo al crear issue con labels. error: {e}")
+        try:
+            url = gh_post(f"repos/{repo}/issues", {'title': title, 'body': body}).get('html_url','')
+        except Exception as e2:
+            log(f"Intento sin labels también falló. error: {e2}")
+    except (HTTPException, OSError) as e:
+        # Sin respuesta: el servidor pudo crearlo, así que no se repite para no duplicar el Issue
+        log(f"Conexión perdida al crear issue (no se reintenta). error: {e}")
     log(f"Issue title: {title}")
     log(f"Issue created: {url if url else 'N/A'}")
-    print(f"🧾 Issue creado: {url if url else 'N/A'}")
+    return url, False
+
+def main():
+    with phase('issue.load') as attrs:
+        prs = list(load_records('prs', 'PRS_DATA'))
+        attrs['prs'] = len(prs)
+    with phase('render.issue', prs=len(prs)) as attrs:
+        url, reused = publish_issue(prs, options_from_env())
+        attrs['reused'] = reused
+    with open(os.environ['GITHUB_OUTPUT'],'a') as f:
+        f.write(f"issue_url={url}\n")
+    if reused:
+        print(f"🧾 Issue reutilizado: {url}")
+    else:
+        print(f"🧾 Issue creado: {url if url else 'N/A'}")
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,228 @@
+import hashlib, json, mmap, os, struct, sys, zlib
+
+from tracing import log
+
+MAGIC = b'DPDSET\x00\x01'
+TRAILER = struct.Struct('<QI4s')
+TRAILER_MARK = b'DPIX'
+VERSION = 1
+BLOCK_RECORDS = 500
+DATASET_FILE = os.path.join('docs','dependabot-dataset.bin')
+
+
+class DatasetError(ValueError):
+    pass
+
+
+class DatasetWriter:
+    # Formato v1 (un solo fichero, se sube como artifact entre jobs):
+    #   MAGIC (8 bytes) | bloques gzip con NDJSON ... | índice JSON gzip | trailer <offset índice, longitud, 'DPIX'>
+    # Cada bloque tiene hasta block_records registros de una sección ('prs', 'alerts', ...). El índice guarda por
+    # sección la lista de bloques [offset, longitud, registros] y metadatos, así un lector salta directo a una
+    # sección y descomprime bloque a bloque. En modo append los bloques nuevos se escriben encima del índice anterior.
+    def __init__(self, path, meta=None, append=False, block_records=BLOCK_RECORDS):
+        self.path = path
+        self.block_records = block_records
+        self.buffers = {}
+        self.index = {'version': VERSION, 'meta': {}, 'sections': {}}
+        self.base = None
+        offset = None
+        if append and os.path.exists(path):
+            try:
+                with Dataset(path) as ds:
+                    self.index = {'version': VERSION, 'meta': ds.meta, 'sections': ds.sections}
+                    offset = ds.index_offset
+                self.base = json.loads(json.dumps(self.index))
+            except DatasetError:
+                offset = None
+        if offset is not None:
+            self.f = open(path, 'r+b')
+            self.f.seek(offset)
+            self.f.truncate()
+        else:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            self.f = open(path, 'wb')
+            self.f.write(MAGIC)
+        self.index['meta'].update(meta or {})
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def abort(self):
+        # Sin cerrar el dataset: un fichero nuevo se borra y en modo append se vuelve a escribir el índice anterior (los
+        # bloques nuevos quedan huérfanos), así nunca queda un dataset truncado con índice válido
+        if self.f.closed:
+            return
+        self.buffers.clear()
+        if self.base is None:
+            self.f.close()
+            os.remove(self.path)
+        else:
+            self.index = self.base
+            self.close()
+
+    def reset(self, section):
+        # Descarta una sección ya escrita (sus bloques quedan huérfanos en el fichero)
+        self.index['sections'].pop(section, None)
+        self.buffers.pop(section, None)
+        return self
+
+    def add(self, section, records):
+        buf = self.buffers.setdefault(section, [])
+        self.index['sections'].setdefault(section, {'count': 0, 'blocks': []})
+        for rec in records:
+            buf.append(json.dumps(rec, separators=(',', ':'), ensure_ascii=False))
+            if len(buf) >= self.block_records:
+                self._flush(section)
+        return self
+
+    def _flush(self, section):
+        buf = self.buffers.get(section)
+        if not buf:
+            return
+        comp = zlib.compressobj(6, zlib.DEFLATED, 31)
+        data = comp.compress(('\n'.join(buf) + '\n').encode('utf-8')) + comp.flush()
+        offset = self.f.tell()
+        self.f.write(data)
+        sec = self.index['sections'][section]
+        sec['blocks'].append([offset, len(data), len(buf)])
+        sec['count'] += len(buf)
+        buf.clear()
+
+    def close(self):
+        if self.f.closed:
+            return
+        for section in list(self.buffers):
+            self._flush(section)
+        comp = zlib.compressobj(6, zlib.DEFLATED, 31)
+        data = comp.compress(json.dumps(self.index, separators=(',', ':')).encode('utf-8')) + comp.flush()
+        offset = self.f.tell()
+        self.f.write(data)
+        self.f.write(TRAILER.pack(offset, len(data), TRAILER_MARK))
+        self.f.close()
+
+
+class Dataset:
+    # Lector: mmap del fichero y descompresión perezosa bloque a bloque (no carga el JSON completo en memoria)
+    def __init__(self, path):
+        self.path = path
+        self.f = open(path, 'rb')
+        try:
+            self.mm = mmap.mmap(self.f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self.f.close()
+            raise DatasetError(f"dataset vacío: {path}")
+        size = len(self.mm)
+        if size < len(MAGIC) + TRAILER.size or self.mm[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise DatasetError(f"formato de dataset no reconocido: {path}")
+        offset, length, mark = TRAILER.unpack(self.mm[size-TRAILER.size:])
+        if mark != TRAILER_MARK or offset + length > size - TRAILER.size:
+            self.close()
+            raise DatasetError(f"dataset truncado: {path}")
+        try:
+            index = json.loads(zlib.decompress(self.mm[offset:offset+length], 31))
+        except (zlib.error, ValueError):
+            index = None
+        if not isinstance(index, dict):
+            self.close()
+            raise DatasetError(f"índice de dataset corrupto: {path}")
+        if index.get('version') != VERSION:
+            self.close()
+            raise DatasetError(f"versión de dataset no soportada: {index.get('version')}")
+        self.index_offset = offset
+        self.meta = index.get('meta', {})
+        self.sections = index.get('sections', {})
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if getattr(self, 'mm', None) is not None:
+            self.mm.close()
+            self.mm = None
+        self.f.close()
+
+    def count(self, section):
+        return (self.sections.get(section) or {}).get('count', 0)
+
+    def iter(self, section):
+        for offset, length, _ in (self.sections.get(section) or {}).get('blocks', []):
+            data = zlib.decompress(self.mm[offset:offset+length], 31)
+            for line in data.splitlines():
+                if line:
+                    yield json.loads(line)
+
+
+def iter_section(path, section):
+    with Dataset(path) as ds:
+        yield from ds.iter(section)
+
+def load_records(section, env_var=None, path=None):
+    # Registros de DATASET_PATH si existe; si no, el JSON de env_var (compatibilidad con PRS_DATA/ALERTS_JSON).
+    # Con DATASET_SHA256 un dataset con otro digest se rechaza
+    path = path or os.getenv('DATASET_PATH','').strip()
+    if path and os.path.exists(path):
+        expected = os.getenv('DATASET_SHA256','').strip()
+        if expected and file_digest(path) != expected:
+            raise DatasetError(f"el digest de {path} no coincide con DATASET_SHA256 (artifact de otro run o incompleto)")
+        return iter_section(path, section)
+    raw = (os.getenv(env_var,'') if env_var else '').strip()
+    try:
+        data = json.loads(raw) if raw else []
+    except Exception:
+        data = []
+    return iter(data if isinstance(data, list) else [])
+
+def load_prs(dataset):
+    # dataset: ruta a un dataset (sección 'prs') o iterable de PRs ya cargados (dicts o PRRecord). Devuelve un iterador:
+    # el dataset se recorre bloque a bloque sobre el mmap. Una ruta que no existe da un reporte sin PRs (y queda en el
+    # log); un dataset corrupto o truncado lanza DatasetError
+    if not isinstance(dataset, (str, os.PathLike)):
+        return iter(dataset or [])
+    if not os.path.exists(dataset):
+        log(f"Dataset no encontrado: {dataset}; reporte sin PRs")
+        return iter(())
+    return load_records('prs', path=dataset)
+
+def file_digest(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+def main(argv):
+    # python3 dataset.py info|digest|cat <ruta> [sección]
+    if len(argv) < 2 or argv[0] not in ('info','digest','cat'):
+        print("uso: dataset.py info|digest|cat <ruta> [sección]", file=sys.stderr)
+        return 2
+    cmd, path = argv[0], argv[1]
+    if cmd == 'digest':
+        digest = file_digest(path)
+        out = os.environ.get('GITHUB_OUTPUT')
+        if out:
+            with open(out,'a') as f:
+                f.write(f"dataset_path={path}\n")
+                f.write(f"dataset_sha256={digest}\n")
+        print(digest)
+        return 0
+    with Dataset(path) as ds:
+        if cmd == 'info':
+            print(json.dumps({'meta': ds.meta, 'sections': {k: ds.count(k) for k in ds.sections}, 'bytes': os.path.getsize(path)}, indent=2, ensure_ascii=False))
+        else:
+            for rec in ds.iter(argv[2] if len(argv) > 2 else 'prs'):
+                print(json.dumps(rec, ensure_ascii=False))
+    return 0
+
+if __name__ == '__main__':
+    raise SystemExit(main(sys.argv[1:]))
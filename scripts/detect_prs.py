@@ -1,118 +1,117 @@
-import json, os, subprocess, time
+import json, os
+from datetime import datetime, timezone
+
+from api_budget import allows
+from dataset import DatasetWriter
+from gh_api import fetch_pages
+from pr_state import resolve_states
+from snapshot_store import open_snapshot
+from profiling import phase, step
+from tracing import log, span
+from waiter import AdaptiveWaiter
 
 def main():
     wait_minutes = int(os.getenv('WAIT_MINUTES', '10'))
     poll_interval = int(os.getenv('POLL_INTERVAL', '30'))
+    poll_min_interval = float(os.getenv('POLL_MIN_INTERVAL', '5') or 5)
+    quiet_seconds = float(os.getenv('QUIET_SECONDS', '90') or 90)
+    rate_limit_floor = int(os.getenv('RATE_LIMIT_FLOOR', '100') or 100)
     repo = os.getenv('GITHUB_REPOSITORY')
-    debug_path = os.path.join('docs','output.txt')
     dep_logins = [s.strip() for s in os.getenv('DEP_LOGINS','dependabot,dependabot[bot],app/dependabot').split(',') if s.strip()]
 
-    def log(msg):
-        try:
-            os.makedirs(os.path.dirname(debug_path), exist_ok=True)
-            with open(debug_path,'a') as df:
-                df.write(msg + "\n")
-        except Exception:
-            pass
+    def to_record(it, head_ref=''):
+        return {
+            'number': it.get('number'),
+            'title': it.get('title'),
+            'url': it.get('html_url'),
+            'labels': it.get('labels',[]),
+            'createdAt': it.get('created_at',''),
+            'updatedAt': it.get('updated_at',''),
+            'closedAt': it.get('closed_at') or '',
+            'headRefName': head_ref,
+            'state': it.get('state','')
+        }
+
+    prs_state = os.getenv('PRS_STATE','open')
+    snapshot = open_snapshot()
+    snapshot_scope = f"{repo}|{prs_state}|{','.join(sorted(dep_logins))}"
+
+    def in_state(rec):
+        st = (rec.get('state','') or '').lower()
+        if prs_state == 'open':
+            return st == 'open'
+        if prs_state == 'closed':
+            return st in ('closed','merged')
+        return True
+
+    def collect(path, params, convert, extract=None, stop=None, name=''):
+        out = []
+        seen = set()
+        def on_items(items):
+            for it in items:
+                rec = convert(it)
+                if rec is not None and rec['number'] not in seen:
+                    seen.add(rec['number'])
+                    out.append(rec)
+        # Un span por estrategia (API, búsquedas de respaldo): cuánto tardó cada una y cuántos PRs dio
+        with span(name, path=path, incremental=stop is not None) as attrs:
+            pages = fetch_pages(path, params, on_items=on_items, extract=extract, stop=stop)
+            attrs.update(pages=pages, prs=len(out))
+        out.sort(key=lambda r: r['number'] or 0, reverse=True)
+        return out, pages
 
     def list_prs_api():
         try:
-            state = os.getenv('PRS_STATE','open')
-            path = f"repos/{repo}/pulls?state={state}&per_page=100"
-            args = ['gh','api',path,'--method','GET']
-            result = subprocess.run(args, capture_output=True, text=True)
-            if result.returncode == 0 and result.stdout.strip():
-                data = json.loads(result.stdout)
-                filtered = []
-                for pr in data:
-                    login = (pr.get('user',{}) or {}).get('login','')
-                    if login in dep_logins:
-                        filtered.append({
-                            'number': pr.get('number'),
-                            'title': pr.get('title'),
-                            'url': pr.get('html_url'),
-                            'labels': pr.get('labels',[]),
-                            'createdAt': pr.get('created_at',''),
-                            'headRefName': (pr.get('head',{}) or {}).get('ref',''),
-                            'state': pr.get('state','')
-                        })
+            def convert(pr):
+                login = (pr.get('user',{}) or {}).get('login','')
+                if login not in dep_logins:
+                    return None
+                return to_record(pr, (pr.get('head',{}) or {}).get('ref',''))
+            since = snapshot.watermark('prs', snapshot_scope) if snapshot else ''
+            if since:
+                # Incremental: PRs de cualquier estado ordenados por updated desc hasta pasar el watermark
+                stop = lambda items: any((it.get('updated_at') or '') < since for it in items)
+                delta, pages = collect(f"repos/{repo}/pulls", {'state': 'all', 'sort': 'updated', 'direction': 'desc'}, convert, stop=stop, name='list_prs_api')
+                delta = [r for r in delta if r.get('updatedAt','') >= since]
+                merged = snapshot.merge('prs', delta, key=lambda r: r['number'], updated=lambda r: r.get('updatedAt',''), keep=in_state, scope=snapshot_scope)
+                filtered = sorted(merged, key=lambda r: r['number'] or 0, reverse=True)
+                log(f"list_prs_api incremental since {since} pages: {pages} delta: {len(delta)} PRs: {len(filtered)}")
                 return filtered
-            log(f"list_prs_api non-0 returncode: {result.returncode} stderr={result.stderr.strip()}")
-            return []
+            filtered, pages = collect(f"repos/{repo}/pulls", {'state': prs_state}, convert, name='list_prs_api')
+            if snapshot:
+                snapshot.merge('prs', filtered, key=lambda r: r['number'], updated=lambda r: r.get('updatedAt',''), full=True, scope=snapshot_scope)
+            log(f"list_prs_api pages: {pages} PRs: {len(filtered)}")
+            return filtered
         except Exception as e:
             log(f"list_prs_api exception: {e}")
             return []
 
-    def list_prs_search():
-        try:
-            state = os.getenv('PRS_STATE','open')
-            qp = [f"repo:{repo}", "is:pr", "(author:app/dependabot OR author:dependabot OR author:dependabot[bot])"]
-            if state == 'all':
-                qp.append("(is:open OR is:closed)")
-            elif state in ('open','closed'):
-                qp.append(f"is:{state}")
-            q = " ".join(qp)
-        except Exception:
-            q = ""
-        if not q:
+    def search_query(author_filter):
+        qp = [f"repo:{repo}", "is:pr", author_filter]
+        if prs_state == 'all':
+            qp.append("(is:open OR is:closed)")
+        elif prs_state in ('open','closed'):
+            qp.append(f"is:{prs_state}")
+        return " ".join(qp)
+
+    def list_prs_search_query(q, name):
+        if not allows(1, name):
             return []
         try:
-            result = subprocess.run(['gh','api','search/issues','-f',f"q={q}",'-f','per_page=100'], capture_output=True, text=True)
-            if result.returncode == 0 and result.stdout.strip():
-                data = json.loads(result.stdout)
-                items = data.get('items',[])
-                out = []
-                for it in items:
-                    out.append({
-                        'number': it.get('number'),
-                        'title': it.get('title'),
-                        'url': it.get('html_url'),
-                        'labels': it.get('labels',[]),
-                        'createdAt': it.get('created_at',''),
-                        'headRefName': '',
-                        'state': it.get('state','')
-                    })
-                return out
-            log(f"list_prs_search non-0 returncode: {result.returncode} stderr={result.stderr.strip()}")
+            out, pages = collect('search/issues', {'q': q}, to_record, extract=lambda data: data.get('items',[]), name=name)
+            log(f"{name} pages: {pages} PRs: {len(out)}")
+            return out
         except Exception as e:
-            log(f"list_prs_search exception: {e}")
+            log(f"{name} exception: {e}")
         return []
 
+    def list_prs_search():
+        return list_prs_search_query(search_query("(author:app/dependabot OR author:dependabot OR author:dependabot[bot])"), 'list_prs_search')
+
     def list_prs_search_label_only():
-        try:
-            state = os.getenv('PRS_STATE','open')
-            qp = [f"repo:{repo}", "is:pr", "label:dependencies"]
-            if state == 'all':
-                qp.append("(is:open OR is:closed)")
-            elif state in ('open','closed'):
-                qp.append(f"is:{state}")
-            q = " ".join(qp)
-        except Exception:
-            q = ""
-        if not q:
-            return []
-        try:
-            result = subprocess.run(['gh','api','search/issues','-f',f"q={q}",'-f','per_page=100'], capture_output=True, text=True)
-            if result.returncode == 0 and result.stdout.strip():
-                data = json.loads(result.stdout)
-                items = data.get('items',[])
-                out = []
-                for it in items:
-                    out.append({
-                        'number': it.get('number'),
-                        'title': it.get('title'),
-                        'url': it.get('html_url'),
-                        'labels': it.get('labels',[]),
-                        'createdAt': it.get('created_at',''),
-                        'headRefName': '',
-                        'state': it.get('state','')
-                    })
-                return out
-            log(f"list_prs_search_label_only non-0 returncode: {result.returncode} stderr={result.stderr.strip()}")
-        except Exception as e:
-            log(f"list_prs_search_label_only exception: {e}")
-        return []
+        return list_prs_search_query(search_query("label:dependencies"), 'list_prs_search_label_only')
 
+    step('detect.load')
     prs = list_prs_api()
     log(f"Initial PRs count: {len(prs)}")
     if prs:
@@ -129,13 +128,25 @@ def main():
                 prs = fb2
         log(f"Immediate fallback PRs count: {len(prs)}")
 
-    should_wait = (os.getenv('TRIGGER_DEPENDABOT_NOW','false') == 'true' and os.getenv('PRS_STATE','open') == 'open' and wait_minutes > 0)
-    deadline = time.time() + (wait_minutes*60 if should_wait else 0)
-    
-    while should_wait and len(prs) == 0 and time.time() < deadline:
-        time.sleep(poll_interval)
-        prs = list_prs_api()
-        log(f"Polling... PRs count: {len(prs)}")
+    should_wait = (os.getenv('TRIGGER_DEPENDABOT_NOW','false') == 'true' and prs_state == 'open' and wait_minutes > 0)
+
+    if should_wait:
+        # Espera hasta que el conjunto de PRs deje de cambiar durante QUIET_SECONDS (o se agote WAIT_MINUTES)
+        last = [prs]
+        def poll():
+            # Sin presupuesto se da por bueno lo ya detectado: el conjunto deja de cambiar y la espera termina
+            if not allows(1, 'polling de PRs'):
+                return last[0]
+            found = last[0] = list_prs_api()
+            log(f"Polling... PRs count: {len(found)}")
+            return found
+        waiter = AdaptiveWaiter(wait_minutes*60, poll_min_interval, poll_interval, quiet_seconds, low_budget=rate_limit_floor)
+        with span('adaptive_wait') as attrs:
+            result = waiter.wait(poll, key=lambda found: frozenset(pr['number'] for pr in found), stable=lambda found: len(found) > 0, initial=prs)
+            attrs['result'] = result.summary()
+        prs = result.value or prs
+        log(f"Adaptive wait: {result.summary()}")
+        print(f"⏳ {result.summary()}")
 
     if len(prs) == 0:
         fallback = list_prs_search()
@@ -147,13 +158,29 @@ def main():
                 prs = fallback2
         log(f"Fallback PRs count: {len(prs)}")
 
+    step('detect.enrich')
+    resolve_states(prs, repo, log)
+    step('detect.write')
+    if snapshot:
+        snapshot.save()
+
+    dataset_path = os.getenv('DATASET_PATH','').strip()
+    if dataset_path:
+        # Los datos viajan en el fichero (artifact); por outputs solo pasa la ruta
+        meta = {'repo': repo, 'prs_state': prs_state, 'generated_at': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')}
+        with span('dataset.write', section='prs', prs=len(prs)), DatasetWriter(dataset_path, meta) as ds:
+            ds.add('prs', prs)
     with open(os.environ['GITHUB_OUTPUT'],'a') as f:
-        f.write('prs_data<<EOF\n')
-        f.write(json.dumps(prs))
-        f.write('\nEOF\n')
+        if dataset_path:
+            f.write(f"dataset_path={dataset_path}\n")
+        else:
+            f.write('prs_data<<EOF\n')
+            f.write(json.dumps(prs))
+            f.write('\nEOF\n')
         f.write(f"prs_count={len(prs)}\n")
     
     print(f"📊 PRs detectados: {len(prs)}")
 
 if __name__ == '__main__':
-    main()
+    with phase('detect_prs'):
+        main()
@@ -0,0 +1,259 @@
+import gzip, http.client, json, os, queue, re, threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import NamedTuple
+from urllib.parse import urlencode, urlparse, parse_qs
+
+from api_budget import get_budget
+from http_cache import HttpCache, get_cache
+from tracing import span
+
+LINK_RE = re.compile(r'<([^>]+)>\s*;\s*rel="([^"]+)"')
+_client = None
+_client_lock = threading.Lock()
+
+
+class Response(NamedTuple):
+    status: int
+    headers: dict
+    body: str
+
+    def json(self):
+        return json.loads(self.body) if self.body.strip() else None
+
+
+class ApiError(RuntimeError):
+    def __init__(self, method, path, status, body=''):
+        super().__init__(f"{method} {path} HTTP {status}: {body[:200]}")
+        self.status = status
+
+
+def parse_link(header):
+    return {rel: url for url, rel in LINK_RE.findall(header or '')}
+
+def endpoint(path):
+    # Nombre estable para trazas: sin host, query ni repos/{owner}/{repo}, y números como :n (pulls/123 -> pulls/:n)
+    p = urlparse(path).path if '://' in path else path.split('?')[0]
+    parts = [x for x in p.split('/') if x]
+    if 'repos' in parts:
+        parts = parts[parts.index('repos')+3:]
+    return '/'.join(':n' if x.isdigit() else x for x in parts) or '/'
+
+def last_page(headers):
+    last = parse_link(headers.get('link','')).get('last')
+    if not last:
+        return 1
+    try:
+        return int(parse_qs(urlparse(last).query).get('page',['1'])[0])
+    except Exception:
+        return 1
+
+
+class GitHubClient:
+    # Cliente HTTP en proceso: reutiliza conexiones keep-alive de un pool en lugar de lanzar `gh` por llamada.
+    # base_url es inyectable (GITHUB_API_URL) para apuntar a un servidor local de pruebas.
+    def __init__(self, base_url=None, token=None, pool_size=8, timeout=30, cache=None, budget=None):
+        base_url = (base_url or os.getenv('GITHUB_API_URL') or 'https://api.github.com').rstrip('/')
+        u = urlparse(base_url)
+        self.scheme = u.scheme or 'https'
+        self.host = u.hostname or 'api.github.com'
+        self.port = u.port
+        self.prefix = u.path.rstrip('/')
+        self.token = token if token is not None else (os.getenv('GH_TOKEN') or os.getenv('GITHUB_TOKEN') or '')
+        self.timeout = timeout
+        self.pool = queue.LifoQueue(maxsize=pool_size)
+        self.cache = get_cache() if cache is None else cache
+        self.budget = get_budget() if budget is None else budget
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.connections = 0
+        self.rate = {}
+
+    def _connect(self):
+        with self.lock:
+            self.connections += 1
+        if self.scheme == 'http':
+            return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        return http.client.HTTPSConnection(self.host, self.port, timeout=self.timeout)
+
+    def _acquire(self):
+        try:
+            return self.pool.get_nowait()
+        except queue.Empty:
+            return self._connect()
+
+    def _release(self, conn):
+        try:
+            self.pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def close(self):
+        while True:
+            try:
+                self.pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def _url(self, path, params=None):
+        if path.startswith('http://') or path.startswith('https://'):
+            u = urlparse(path)
+            path = u.path + (f"?{u.query}" if u.query else '')
+        elif not path.startswith('/'):
+            path = f"{self.prefix}/{path}"
+        if params:
+            path += ('&' if '?' in path else '?') + urlencode(params)
+        return path
+
+    def request(self, method, path, params=None, body=None, headers=None, timeout=None, retry=None):
+        # retry: repetir con conexión nueva si falla después de enviar la petición; por defecto solo GET/HEAD. Un POST
+        # que el servidor pudo aceptar (p.ej. crear el Issue) no se repite; sí si falló el propio envío
+        retry = method in ('GET', 'HEAD') if retry is None else retry
+        url = self._url(path, params)
+        hdrs = {'Accept': 'application/vnd.github+json', 'User-Agent': 'reusable-workflows-dependabot-report', 'Accept-Encoding': 'gzip'}
+        if self.token:
+            hdrs['Authorization'] = f"Bearer {self.token}"
+        payload = None
+        if body is not None:
+            payload = json.dumps(body).encode('utf-8')
+            hdrs['Content-Type'] = 'application/json'
+        hdrs.update(headers or {})
+        for attempt in (1, 2):
+            conn = self._acquire()
+            conn.timeout = timeout or self.timeout
+            if conn.sock:
+                conn.sock.settimeout(conn.timeout)
+            sent = False
+            try:
+                conn.request(method, url, body=payload, headers=hdrs)
+                sent = True
+                resp = conn.getresponse()
+                raw = resp.read()
+            except (http.client.HTTPException, OSError):
+                conn.close()
+                # la conexión keep-alive pudo cerrarse en el servidor: un reintento con conexión nueva
+                if attempt == 2 or (sent and not retry):
+                    raise
+                continue
+            with self.lock:
+                self.requests += 1
+                if resp.getheader('X-RateLimit-Remaining') is not None:
+                    self._track_rate(resp)
+            self.budget.record(f"{method} {endpoint(url)}")
+            if resp.getheader('Content-Encoding','') == 'gzip':
+                raw = gzip.decompress(raw)
+            if resp.will_close:
+                conn.close()
+            else:
+                self._release(conn)
+            return Response(resp.status, {k.lower(): v for k, v in resp.getheaders()}, raw.decode('utf-8', 'replace'))
+
+    def _track_rate(self, resp):
+        try:
+            self.rate = {'remaining': int(resp.getheader('X-RateLimit-Remaining')), 'limit': int(resp.getheader('X-RateLimit-Limit') or 0),
+                         'reset': int(resp.getheader('X-RateLimit-Reset') or 0), 'resource': resp.getheader('X-RateLimit-Resource') or 'core'}
+        except (TypeError, ValueError):
+            pass
+
+    def get(self, path, params=None, cache=None, timeout=None):
+        cache = self.cache if cache is None else cache
+        key = HttpCache.key('GET', path, params) if cache else None
+        with span(f"GET {endpoint(path)}", 'api') as attrs:
+            if params and 'page' in params:
+                attrs['page'] = params['page']
+            r = self.request('GET', path, params, headers=cache.conditional_headers(key) if cache else None, timeout=timeout)
+            attrs.update(status=r.status, bytes=len(r.body))
+            if r.status == 304 and cache:
+                cached = cache.hit(key)
+                attrs['cache'] = 'hit' if cached is not None else 'lost'
+                if cached is not None:
+                    body, stored = cached
+                    return Response(200, dict(stored, **r.headers), body)
+            elif cache:
+                attrs['cache'] = 'miss'
+        if r.status == 304 and cache:
+            return self.get(path, params, cache=False, timeout=timeout)
+        if r.status >= 400:
+            raise ApiError('GET', path, r.status, r.body)
+        if cache:
+            cache.store(key, r.body, r.headers)
+        return r
+
+    def post(self, path, body, timeout=None, retry=False):
+        with span(f"POST {endpoint(path)}", 'api') as attrs:
+            r = self.request('POST', path, body=body, timeout=timeout, retry=retry)
+            attrs.update(status=r.status, bytes=len(r.body))
+        if r.status >= 400:
+            raise ApiError('POST', path, r.status, r.body)
+        return r
+
+    def graphql(self, query, variables=None, timeout=None):
+        # Las consultas GraphQL de estos scripts son de solo lectura: se pueden repetir
+        data = self.post('graphql', {'query': query, 'variables': variables or {}}, timeout=timeout, retry=True).json() or {}
+        return data.get('data') or {}
+
+    def paginate(self, path, params=None, on_items=None, extract=None, workers=None, per_page=100, stop=None):
+        # Página 1 en serie para conocer el total (Link rel="last"); el resto en paralelo.
+        # on_items recibe cada página en cuanto llega, en orden de llegada.
+        # Con stop(items) se recorre rel="next" en serie (sirve para cursores) y se corta cuando devuelve True.
+        workers = workers or int(os.getenv('PAGE_WORKERS','4') or 4)
+        extract = extract or (lambda data: data if isinstance(data, list) else [])
+        base = dict(params or {})
+        base['per_page'] = per_page
+
+        if stop:
+            url, query, pages = path, base, 0
+            while url:
+                r = self.get(url, query)
+                items = extract(r.json() or [])
+                pages += 1
+                if on_items:
+                    on_items(items)
+                if stop(items):
+                    break
+                url, query = parse_link(r.headers.get('link','')).get('next'), None
+            return pages
+
+        def get_page(page):
+            r = self.get(path, dict(base, page=page))
+            return r.headers, extract(r.json() or [])
+
+        headers, items = get_page(1)
+        if on_items:
+            on_items(items)
+        total = last_page(headers)
+        pages = 1
+        if total > 1:
+            with ThreadPoolExecutor(max_workers=max(1, min(workers, total-1))) as ex:
+                futures = [ex.submit(get_page, p) for p in range(2, total+1)]
+                for fut in as_completed(futures):
+                    _, page_items = fut.result()
+                    pages += 1
+                    if on_items:
+                        on_items(page_items)
+        return pages
+
+
+def get_client():
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = GitHubClient()
+        return _client
+
+def set_client(client):
+    global _client
+    with _client_lock:
+        _client = client
+
+def gh_get(path, params=None, timeout=None):
+    r = get_client().get(path, params, timeout=timeout)
+    return r.status, r.headers, r.body
+
+def fetch_pages(path, params=None, on_items=None, extract=None, workers=None, per_page=100, stop=None):
+    return get_client().paginate(path, params, on_items, extract, workers, per_page, stop)
+
+def gh_graphql(query, variables=None, timeout=None):
+    return get_client().graphql(query, variables, timeout)
+
+def gh_post(path, body):
+    return get_client().post(path, body).json() or {}
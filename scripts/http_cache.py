@@ -0,0 +1,142 @@
+import atexit, hashlib, json, os, threading, time
+from urllib.parse import urlencode
+
+from tracing import log
+
+INDEX_NAME = 'index.json'
+_cache = None
+
+
+class HttpCache:
+    # Cache en disco de respuestas GET con ETag/Last-Modified y desalojo LRU por tamaño.
+    # Estructura (persistible con actions/cache):
+    #   <root>/index.json              clave -> metadatos (etag, last_modified, link, size, atime)
+    #   <root>/entries/<aa>/<clave>    cuerpo de la respuesta
+    def __init__(self, root, max_bytes=50*1024*1024):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'stored': 0, 'evicted': 0}
+        self.dirty = False
+        self.index = {}
+        try:
+            with open(os.path.join(root, INDEX_NAME), 'r') as f:
+                data = json.load(f)
+            if isinstance(data, dict) and data.get('version') == 1:
+                self.index = data.get('entries', {})
+        except Exception:
+            self.index = {}
+
+    @staticmethod
+    def key(method, url, params=None):
+        q = urlencode(sorted((params or {}).items()))
+        return hashlib.sha256(f"{method.upper()} {url}?{q}".encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.root, 'entries', key[:2], key)
+
+    def conditional_headers(self, key):
+        with self.lock:
+            meta = self.index.get(key)
+        if not meta:
+            return {}
+        if meta.get('etag'):
+            return {'If-None-Match': meta['etag']}
+        if meta.get('last_modified'):
+            return {'If-Modified-Since': meta['last_modified']}
+        return {}
+
+    def hit(self, key):
+        # 304 Not Modified: devuelve el cuerpo guardado y las cabeceras útiles (Link para paginar)
+        try:
+            with open(self._path(key), 'r', encoding='utf-8') as f:
+                body = f.read()
+        except Exception:
+            with self.lock:
+                self.index.pop(key, None)
+                self.stats['misses'] += 1
+            return None
+        with self.lock:
+            meta = self.index.get(key, {})
+            meta['atime'] = time.time()
+            self.stats['hits'] += 1
+            self.dirty = True
+        return body, ({'link': meta['link']} if meta.get('link') else {})
+
+    def store(self, key, body, headers):
+        with self.lock:
+            self.stats['misses'] += 1
+        etag = headers.get('etag','')
+        last_modified = headers.get('last-modified','')
+        if not etag and not last_modified:
+            return
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp, 'w', encoding='utf-8') as f:
+                f.write(body)
+            os.replace(tmp, path)
+        except Exception:
+            return
+        with self.lock:
+            self.index[key] = {'etag': etag, 'last_modified': last_modified, 'link': headers.get('link',''), 'size': len(body.encode('utf-8')), 'atime': time.time()}
+            self.stats['stored'] += 1
+            self.dirty = True
+
+    def _evict(self):
+        total = sum(m.get('size',0) for m in self.index.values())
+        if total <= self.max_bytes:
+            return
+        for key, meta in sorted(self.index.items(), key=lambda kv: kv[1].get('atime',0)):
+            if total <= self.max_bytes:
+                break
+            total -= meta.get('size',0)
+            self.index.pop(key, None)
+            self.stats['evicted'] += 1
+            try:
+                os.remove(self._path(key))
+            except Exception:
+                pass
+
+    def save(self):
+        with self.lock:
+            if not self.dirty:
+                return
+            self._evict()
+            try:
+                os.makedirs(self.root, exist_ok=True)
+                tmp = os.path.join(self.root, INDEX_NAME + '.tmp')
+                with open(tmp, 'w') as f:
+                    json.dump({'version': 1, 'entries': self.index}, f)
+                os.replace(tmp, os.path.join(self.root, INDEX_NAME))
+                self.dirty = False
+            except Exception:
+                pass
+
+    def summary(self):
+        s = self.stats
+        total = s['hits'] + s['misses']
+        ratio = (s['hits'] / total * 100) if total else 0
+        return f"http_cache hits={s['hits']} misses={s['misses']} stored={s['stored']} evicted={s['evicted']} entries={len(self.index)} hit_ratio={ratio:.0f}%"
+
+
+def _close(cache):
+    cache.save()
+    if cache.stats['hits'] or cache.stats['misses']:
+        log(cache.summary(), **cache.stats)
+
+def get_cache():
+    # Activa la cache solo si HTTP_CACHE_DIR está definido
+    global _cache
+    if _cache is None:
+        root = os.getenv('HTTP_CACHE_DIR','').strip()
+        if not root:
+            return None
+        try:
+            max_mb = float(os.getenv('HTTP_CACHE_MAX_MB','50') or 50)
+        except Exception:
+            max_mb = 50
+        _cache = HttpCache(root, int(max_mb*1024*1024))
+        atexit.register(_close, _cache)
+    return _cache
@@ -0,0 +1,701 @@
+import html, math, re, string, zlib
+from types import SimpleNamespace
+from urllib.parse import quote
+
+# Backend PDF mínimo, solo stdlib. Imita el subconjunto de reportlab.platypus que usa generate_pdf (Paragraph,
+# Table/LongTable, ListFlowable, Spacer, Flowable, SimpleDocTemplate) con las fuentes estándar Helvetica/Courier
+# en WinAnsiEncoding (no se incrustan fuentes), así el mismo código del reporte sirve con cualquiera de los dos.
+
+A4 = (595.2755905511812, 841.8897637795277)
+
+# Anchos AFM (1/1000 em) de los códigos 32..255 de WinAnsi; las variantes Oblique miden igual que las rectas
+_HELVETICA = '''
+278 278 355 556 556 889 667 191 333 333 389 584 278 333 278 278 556 556 556 556 556 556 556 556 556 556 278 278
+584 584 584 556 1015 667 667 722 722 667 611 778 722 278 500 667 556 833 722 778 667 778 722 667 611 722 667 944
+667 667 611 278 278 278 469 556 333 556 556 500 556 556 278 556 556 222 222 500 222 833 556 556 556 556 333 500
+278 556 500 722 500 500 500 334 260 334 584 761 556 0 222 556 333 1000 556 556 333 1000 667 333 1000 0 611 0 0
+222 222 333 333 350 556 1000 333 1000 500 333 944 0 500 667 278 333 556 556 556 556 260 556 333 737 370 556 584
+333 737 333 400 584 333 333 333 556 537 278 333 333 365 556 834 834 834 611 667 667 667 667 667 667 1000 722 667
+667 667 667 278 278 278 278 722 722 778 778 778 778 778 584 778 722 722 722 722 667 667 611 556 556 556 556 556
+556 889 500 556 556 556 556 278 278 278 278 556 556 556 556 556 556 556 584 611 556 556 556 556 500 556 500
+'''
+_HELVETICA_BOLD = '''
+278 333 474 556 556 889 722 238 333 333 389 584 278 333 278 278 556 556 556 556 556 556 556 556 556 556 333 333
+584 584 584 611 975 722 722 722 722 667 611 778 722 278 556 722 611 833 722 778 667 778 722 667 611 722 667 944
+667 667 611 333 278 333 584 556 333 556 611 556 611 556 333 611 611 278 278 556 278 889 611 611 611 611 389 556
+333 611 556 778 556 556 500 389 280 389 584 761 556 0 278 556 500 1000 556 556 333 1000 667 333 1000 0 611 0 0
+278 278 500 500 350 556 1000 333 1000 556 333 944 0 500 667 278 333 556 556 556 556 280 556 333 737 370 556 584
+333 737 333 400 584 333 333 333 611 556 278 333 333 365 556 834 834 834 611 722 722 722 722 722 722 1000 722 667
+667 667 667 278 278 278 278 722 722 778 778 778 778 778 584 778 722 722 722 722 667 667 611 556 556 556 556 556
+556 889 556 556 556 556 556 278 278 278 278 611 611 611 611 611 611 611 584 611 611 611 611 611 556 611 556
+'''
+_regular = [0] * 32 + [int(w) for w in _HELVETICA.split()]
+_bold = [0] * 32 + [int(w) for w in _HELVETICA_BOLD.split()]
+_mono = [0] * 32 + [600] * 224
+WIDTHS = {
+    'Helvetica': _regular, 'Helvetica-Oblique': _regular,
+    'Helvetica-Bold': _bold, 'Helvetica-BoldOblique': _bold,
+    'Courier': _mono, 'Courier-Bold': _mono, 'Courier-Oblique': _mono, 'Courier-BoldOblique': _mono,
+    'ZapfDingbats': [762 if i == ord('n') else 0 for i in range(256)],
+}
+# Caracteres del reporte que no existen en WinAnsi; el resto de lo no representable sale como '?'.
+# '■' sí se dibuja: es la 'n' de ZapfDingbats (ver _parse)
+SUBST = str.maketrans({'→': '->', '∞': 'inf', '≥': '>=', '≤': '<=', '✓': 'v', '✗': 'x'})
+URL_SAFE = string.punctuation.replace('%', '')
+
+
+def encode(text):
+    return str(text).translate(SUBST).encode('cp1252', 'replace')
+
+def stringWidth(text, fontName, fontSize):
+    return sum(map(WIDTHS.get(fontName, _regular).__getitem__, encode(text))) * fontSize / 1000
+
+def _literal(data):
+    return b'(' + data.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)').replace(b'\r', b'\\r') + b')'
+
+
+class Color:
+    def __init__(self, red, green, blue):
+        self.red, self.green, self.blue = red, green, blue
+
+    def __eq__(self, other):
+        return isinstance(other, Color) and (self.red, self.green, self.blue) == (other.red, other.green, other.blue)
+
+    def __hash__(self):
+        return hash((self.red, self.green, self.blue))
+
+    def rgb(self):
+        return b'%.3f %.3f %.3f' % (self.red, self.green, self.blue)
+
+def HexColor(value):
+    value = value.lstrip('#')
+    return Color(*(int(value[i:i+2], 16) / 255 for i in (0, 2, 4)))
+
+def _color(c):
+    return HexColor(c) if isinstance(c, str) else c
+
+colors = SimpleNamespace(black=Color(0, 0, 0), white=Color(1, 1, 1), blue=Color(0, 0, 1), grey=HexColor('#808080'),
+                         lightgrey=HexColor('#d3d3d3'), HexColor=HexColor)
+
+
+class Canvas:
+    # Subconjunto de reportlab.pdfgen.canvas.Canvas: lo que usan los flowables de aquí y los Flowable propios del
+    # reporte (p.ej. LinkText). translate() se resuelve en Python; cada página se comprime al cerrarla.
+    def __init__(self, filename, pagesize=A4, title=''):
+        self.filename, self.pagesize, self.title = filename, pagesize, title
+        self.pages = []
+        self.fonts = {}
+        self._new_page()
+
+    def _new_page(self):
+        self._ops, self._annots, self._stack = [], [], []
+        self._dx = self._dy = 0.0
+        self._font, self._size, self._fill, self._stroke = 'Helvetica', 10, colors.black, colors.black
+
+    def setFont(self, name, size, leading=None):
+        self._font, self._size = name, size
+
+    def setFillColor(self, c):
+        c = _color(c)
+        if c != self._fill:
+            self._fill = c
+            self._ops.append(c.rgb() + b' rg')
+
+    def setStrokeColor(self, c):
+        c = _color(c)
+        if c != self._stroke:
+            self._stroke = c
+            self._ops.append(c.rgb() + b' RG')
+
+    def setLineWidth(self, width):
+        self._ops.append(b'%.2f w' % width)
+
+    def saveState(self):
+        self._stack.append((self._dx, self._dy, self._font, self._size, self._fill, self._stroke))
+        self._ops.append(b'q')
+
+    def restoreState(self):
+        self._dx, self._dy, self._font, self._size, self._fill, self._stroke = self._stack.pop()
+        self._ops.append(b'Q')
+
+    def translate(self, dx, dy):
+        self._dx += dx
+        self._dy += dy
+
+    def stringWidth(self, text, fontName=None, fontSize=None):
+        return stringWidth(text, fontName or self._font, fontSize or self._size)
+
+    def drawString(self, x, y, text):
+        ref = self.fonts.setdefault(self._font, b'F%d' % (len(self.fonts) + 1))
+        self._ops.append(b'BT /%s %.2f Tf %.2f %.2f Td %s Tj ET' % (ref, self._size, x + self._dx, y + self._dy, _literal(encode(text))))
+
+    def drawRightString(self, x, y, text):
+        self.drawString(x - self.stringWidth(text), y, text)
+
+    def drawCentredString(self, x, y, text):
+        self.drawString(x - self.stringWidth(text) / 2, y, text)
+
+    def line(self, x1, y1, x2, y2):
+        dx, dy = self._dx, self._dy
+        self._ops.append(b'%.2f %.2f m %.2f %.2f l S' % (x1 + dx, y1 + dy, x2 + dx, y2 + dy))
+
+    def lines(self, segments):
+        dx, dy = self._dx, self._dy
+        self._ops.append(b' '.join(b'%.2f %.2f m %.2f %.2f l' % (x1 + dx, y1 + dy, x2 + dx, y2 + dy) for x1, y1, x2, y2 in segments) + b' S')
+
+    def rect(self, x, y, width, height, stroke=1, fill=0):
+        op = b'B' if stroke and fill else b'f' if fill else b'S' if stroke else b'n'
+        self._ops.append(b'%.2f %.2f %.2f %.2f re %s' % (x + self._dx, y + self._dy, width, height, op))
+
+    def wedge(self, cx, cy, radius, a0, a1, radius1=0):
+        # Sector (o sector de anillo con radius1) relleno con el color actual; ángulos en grados, antihorario
+        cx, cy = cx + self._dx, cy + self._dy
+        if a1 - a0 >= 359.999:
+            ops = [_circle(cx, cy, radius)] + ([_circle(cx, cy, radius1)] if radius1 else [])
+            self._ops.append(b' '.join(ops) + b' f*')
+            return
+        ops = [b'%.2f %.2f m' % _polar(cx, cy, radius, a0), _arc(cx, cy, radius, a0, a1)]
+        if radius1:
+            ops += [b'%.2f %.2f l' % _polar(cx, cy, radius1, a1), _arc(cx, cy, radius1, a1, a0)]
+        else:
+            ops.append(b'%.2f %.2f l' % (cx, cy))
+        self._ops.append(b' '.join(ops) + b' h f')
+
+    def linkURL(self, url, rect, relative=0, thickness=0, **kw):
+        x1, y1, x2, y2 = rect
+        if relative:
+            x1, y1, x2, y2 = x1 + self._dx, y1 + self._dy, x2 + self._dx, y2 + self._dy
+        self._annots.append((x1, y1, x2, y2, url))
+
+    def showPage(self):
+        self.pages.append((zlib.compress(b'\n'.join(self._ops), 6), self._annots))
+        self._new_page()
+
+    def save(self):
+        if self._ops or self._annots or not self.pages:
+            self.showPage()
+        objs = [None, None]
+        def add(body):
+            objs.append(body)
+            return len(objs)
+        font_ids = {ref: add(b'<< /Type /Font /Subtype /Type1 /BaseFont /%s%s >>' % (name.encode(), b'' if name == 'ZapfDingbats' else b' /Encoding /WinAnsiEncoding'))
+                    for name, ref in self.fonts.items()}
+        resources = add(b'<< /Font << %s >> >>' % b' '.join(b'/%s %d 0 R' % (ref, oid) for ref, oid in font_ids.items()))
+        width, height = self.pagesize
+        kids = []
+        for data, annots in self.pages:
+            content = add(b'<< /Length %d /Filter /FlateDecode >>\nstream\n' % len(data) + data + b'\nendstream')
+            links = [add(b'<< /Type /Annot /Subtype /Link /Rect [%.2f %.2f %.2f %.2f] /Border [0 0 0] /A << /S /URI /URI %s >> >>'
+                         % (x1, y1, x2, y2, _literal(quote(url, safe=URL_SAFE).encode('ascii')))) for x1, y1, x2, y2, url in annots]
+            annots_ref = b' /Annots [%s]' % b' '.join(b'%d 0 R' % i for i in links) if links else b''
+            kids.append(add(b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %.2f %.2f] /Resources %d 0 R /Contents %d 0 R%s >>'
+                            % (width, height, resources, content, annots_ref)))
+        objs[0] = b'<< /Type /Catalog /Pages 2 0 R >>'
+        objs[1] = b'<< /Type /Pages /Kids [%s] /Count %d >>' % (b' '.join(b'%d 0 R' % k for k in kids), len(kids))
+        info = add(b'<< /Producer (minipdf) /Title %s >>' % _literal(encode(self.title)))
+        with open(self.filename, 'wb') as f:
+            f.write(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+            offsets = []
+            for i, body in enumerate(objs, 1):
+                offsets.append(f.tell())
+                f.write(b'%d 0 obj\n%s\nendobj\n' % (i, body))
+            xref = f.tell()
+            f.write(b'xref\n0 %d\n0000000000 65535 f \n' % (len(objs) + 1))
+            f.write(b''.join(b'%010d 00000 n \n' % o for o in offsets))
+            f.write(b'trailer\n<< /Size %d /Root 1 0 R /Info %d 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objs) + 1, info, xref))
+
+def _polar(cx, cy, r, a):
+    return cx + r * math.cos(math.radians(a)), cy + r * math.sin(math.radians(a))
+
+def _arc(cx, cy, r, a0, a1):
+    # Arco como curvas de Bézier de hasta 90° cada una
+    n = max(1, math.ceil(abs(a1 - a0) / 90))
+    step = math.radians(a1 - a0) / n
+    k = 4 / 3 * math.tan(step / 4)
+    out = []
+    for i in range(n):
+        t1 = math.radians(a0) + i * step
+        t2 = t1 + step
+        c1, s1, c2, s2 = math.cos(t1), math.sin(t1), math.cos(t2), math.sin(t2)
+        out.append(b'%.2f %.2f %.2f %.2f %.2f %.2f c' % (cx + r * (c1 - k * s1), cy + r * (s1 + k * c1),
+                                                           cx + r * (c2 + k * s2), cy + r * (s2 - k * c2), cx + r * c2, cy + r * s2))
+    return b' '.join(out)
+
+def _circle(cx, cy, r):
+    return b'%.2f %.2f m %s h' % (cx + r, cy, _arc(cx, cy, r, 0, 360))
+
+
+class Flowable:
+    hAlign = 'LEFT'
+    spaceBefore = spaceAfter = 0
+
+    def __init__(self):
+        self.width = self.height = 0
+
+    def wrap(self, availWidth, availHeight):
+        return self.width, self.height
+
+    def split(self, availWidth, availHeight):
+        return []
+
+    def draw(self):
+        pass
+
+    def drawOn(self, canvas, x, y):
+        canvas.saveState()
+        canvas.translate(x, y)
+        self.canv = canvas
+        self.draw()
+        canvas.restoreState()
+
+
+class Spacer(Flowable):
+    def __init__(self, width, height):
+        self.width, self.height = width, height
+
+    def drawOn(self, canvas, x, y):
+        pass
+
+
+class ParagraphStyle:
+    defaults = {'fontName': 'Helvetica', 'fontSize': 10, 'leading': 12, 'alignment': 0, 'spaceBefore': 0,
+                'spaceAfter': 0, 'textColor': colors.black, 'leftIndent': 0}
+
+    def __init__(self, name, parent=None, **kw):
+        self.name = name
+        for key, value in self.defaults.items():
+            setattr(self, key, getattr(parent, key) if parent is not None else value)
+        self.__dict__.update(kw)
+
+def getSampleStyleSheet():
+    # Mismos tamaños y espaciados que la hoja de ejemplo de reportlab para los estilos que usa el reporte
+    normal = ParagraphStyle('Normal')
+    return {
+        'Normal': normal,
+        'Title': ParagraphStyle('Title', normal, fontName='Helvetica-Bold', fontSize=18, leading=22, alignment=1, spaceAfter=6),
+        'Heading2': ParagraphStyle('Heading2', normal, fontName='Helvetica-Bold', fontSize=14, leading=18, spaceBefore=12, spaceAfter=6),
+        'Italic': ParagraphStyle('Italic', normal, fontName='Helvetica-Oblique', spaceBefore=6),
+    }
+
+TAG_RE = re.compile(r'<(/?)(\w+)((?:\s+\w+\s*=\s*(?:"[^"]*"|\'[^\']*\'))*)\s*/?>')
+ATTR_RE = re.compile(r'(\w+)\s*=\s*(?:"([^"]*)"|\'([^\']*)\')')
+SPACE_RE = re.compile(r'(\s+)')
+SQUARE_RE = re.compile('(■)')
+
+def _font(state):
+    if state['code']:
+        return 'Courier'
+    suffix = ('Bold' if state['b'] else '') + ('Oblique' if state['i'] else '')
+    return 'Helvetica' + ('-' + suffix if suffix else '')
+
+def _parse(text, style):
+    # Mini-markup de Paragraph (<b>, <i>, <code>, <font color>, <link href>/<a href>, <br/>) -> [(texto, (fuente, tamaño, color, href))]
+    state = {'b': 'Bold' in style.fontName, 'i': 'Oblique' in style.fontName or 'Italic' in style.fontName,
+             'code': style.fontName.startswith('Courier'), 'size': style.fontSize, 'color': _color(style.textColor), 'href': None}
+    frags, stack, pos = [], [], 0
+    def emit(raw):
+        for part in SQUARE_RE.split(html.unescape(raw)):
+            if part == '■':
+                frags.append(('n', ('ZapfDingbats', state['size'], state['color'], state['href'])))
+            elif part:
+                frags.append((part, (_font(state), state['size'], state['color'], state['href'])))
+    for m in TAG_RE.finditer(text):
+        emit(text[pos:m.start()])
+        pos = m.end()
+        closing, tag = m.group(1), m.group(2).lower()
+        if tag == 'br':
+            frags.append(('\n', None))
+            continue
+        if closing:
+            if stack:
+                state = stack.pop()
+            continue
+        attrs = {k.lower(): dq or sq for k, dq, sq in ATTR_RE.findall(m.group(3))}
+        stack.append(state)
+        state = dict(state)
+        if tag in ('b', 'strong'):
+            state['b'] = True
+        elif tag in ('i', 'em'):
+            state['i'] = True
+        elif tag == 'code':
+            state['code'] = True
+        elif tag == 'font':
+            if attrs.get('color'):
+                state['color'] = getattr(colors, attrs['color'], None) or (HexColor(attrs['color']) if attrs['color'].startswith('#') else state['color'])
+            if attrs.get('size'):
+                state['size'] = float(attrs['size'])
+        elif tag in ('link', 'a'):
+            state['href'] = attrs.get('href')
+    emit(text[pos:])
+    return frags
+
+def _wrap(frags, width):
+    # Palabras (trozos sin espacios, pueden mezclar estilos) repartidas en líneas de hasta `width`
+    words = [[]]
+    for text, fs in frags:
+        if fs is None:
+            words += [None, []]
+            continue
+        for part in SPACE_RE.split(text):
+            if not part:
+                continue
+            if part.isspace():
+                if words[-1]:
+                    words.append([])
+            else:
+                words[-1].append((part, fs))
+    lines, cur, cur_w = [], [], 0.0
+    for word in words:
+        if word is None:
+            lines.append((cur, cur_w))
+            cur, cur_w = [], 0.0
+            continue
+        if not word:
+            continue
+        ww = sum(stringWidth(t, fs[0], fs[1]) for t, fs in word)
+        if ww > width > 0:
+            # Como splitLongWords de reportlab: una palabra más ancha que la línea se corta por caracteres
+            if cur:
+                lines.append((cur, cur_w))
+            chunks = _split_word(word, width)
+            lines.extend(chunks[:-1])
+            cur, cur_w = chunks[-1]
+            continue
+        sp = stringWidth(' ', cur[-1][-1][1][0], cur[-1][-1][1][1]) if cur else 0
+        if cur and cur_w + sp + ww > width:
+            lines.append((cur, cur_w))
+            cur, cur_w, sp = [], 0.0, 0
+        cur.append(word)
+        cur_w += sp + ww
+    if cur or not lines:
+        lines.append((cur, cur_w))
+    return lines
+
+def _split_word(word, width):
+    # -> [([trozos], ancho), ...], una línea por trozo de la palabra que cabe en `width`
+    lines, cur, cur_w = [], [], 0.0
+    for text, fs in word:
+        for ch in text:
+            w = stringWidth(ch, fs[0], fs[1])
+            if cur and cur_w + w > width:
+                lines.append(([cur], cur_w))
+                cur, cur_w = [], 0.0
+            if cur and cur[-1][1] == fs:
+                cur[-1] = (cur[-1][0] + ch, fs)
+            else:
+                cur.append((ch, fs))
+            cur_w += w
+    lines.append(([cur], cur_w))
+    return lines
+
+def _runs(words):
+    # Une palabras consecutivas del mismo estilo en un solo tramo (un Tj y, si hay enlace, una sola anotación)
+    runs = []
+    for i, word in enumerate(words):
+        for j, (text, fs) in enumerate(word):
+            if i and not j:
+                text = ' ' + text
+            if runs and runs[-1][1] == fs:
+                runs[-1][0] += text
+            else:
+                runs.append([text, fs])
+    return runs
+
+
+class Paragraph(Flowable):
+    def __init__(self, text, style=None, _lines=None):
+        self.text = text
+        self.style = style or getSampleStyleSheet()['Normal']
+        self.spaceBefore, self.spaceAfter = self.style.spaceBefore, self.style.spaceAfter
+        self._lines, self._aw = _lines, None if _lines is None else -1
+
+    def wrap(self, availWidth, availHeight):
+        if self._aw is None or (self._aw >= 0 and self._aw != availWidth):
+            self._lines = _wrap(_parse(self.text, self.style), availWidth - self.style.leftIndent)
+            self._aw = availWidth
+        self.width, self.height = availWidth, len(self._lines) * self.style.leading
+        return self.width, self.height
+
+    def split(self, availWidth, availHeight):
+        self.wrap(availWidth, availHeight)
+        n = int(availHeight // self.style.leading)
+        if n <= 0 or n >= len(self._lines):
+            return []
+        first, rest = Paragraph(self.text, self.style, self._lines[:n]), Paragraph(self.text, self.style, self._lines[n:])
+        first.spaceAfter = rest.spaceBefore = 0
+        return [first, rest]
+
+    def draw(self):
+        c, st = self.canv, self.style
+        for i, (words, line_w) in enumerate(self._lines):
+            y = self.height - st.fontSize - i * st.leading
+            x = st.leftIndent + {1: (self.width - st.leftIndent - line_w) / 2, 2: self.width - st.leftIndent - line_w}.get(st.alignment, 0)
+            for text, (font, size, color, href) in _runs(words):
+                c.setFont(font, size)
+                c.setFillColor(color)
+                c.drawString(x, y, text)
+                w = stringWidth(text, font, size)
+                if href:
+                    lead = stringWidth(' ', font, size) if text.startswith(' ') else 0
+                    c.linkURL(href, (x + lead, y - size * 0.2, x + w, y + size), relative=1)
+                x += w
+
+
+class TableStyle:
+    def __init__(self, cmds=None):
+        self.commands = list(cmds or [])
+
+    def add(self, *cmd):
+        self.commands.append(cmd)
+
+
+class Table(Flowable):
+    # Celdas str/número en una línea (como reportlab) o flowables; se parte por filas repitiendo repeatRows.
+    # Los trozos comparten datos, estilos y alturas: solo cambia la lista de filas (_rows) que dibujan.
+    hAlign = 'CENTER'
+    PAD = (6, 6, 3, 3)  # izquierda, derecha, arriba, abajo
+
+    def __init__(self, data, colWidths=None, rowHeights=None, style=None, repeatRows=0, **kw):
+        self._data = data
+        self._ncols = max((len(r) for r in data), default=0)
+        self._rows = list(range(len(data)))
+        self._colWidths = list(colWidths) if colWidths else [None] * self._ncols
+        self._heights = {}
+        self.repeatRows = repeatRows
+        self._cmds = []
+        if style is not None:
+            self.setStyle(style)
+
+    def setStyle(self, style):
+        nrows, ncols = len(self._data), self._ncols
+        for cmd in (style.commands if isinstance(style, TableStyle) else style):
+            (c0, r0), (c1, r1) = cmd[1], cmd[2]
+            c0, c1 = c0 % ncols if ncols else 0, c1 % ncols if ncols else 0
+            r0, r1 = r0 % nrows if nrows else 0, r1 % nrows if nrows else 0
+            self._cmds.append((cmd[0].upper(), c0, r0, c1, r1, cmd[3:]))
+        self._heights = {}
+
+    def _widths(self, availWidth):
+        fixed = sum(w for w in self._colWidths if w is not None)
+        free = [w for w in self._colWidths if w is None]
+        share = (availWidth - fixed) / len(free) if free else 0
+        return [share if w is None else w for w in self._colWidths]
+
+    def _cell(self, c, r):
+        attrs = {'FONTNAME': 'Helvetica', 'FONTSIZE': 10, 'TEXTCOLOR': colors.black, 'ALIGN': 'LEFT', 'VALIGN': 'BOTTOM', 'BACKGROUND': None}
+        for name, c0, r0, c1, r1, args in self._cmds:
+            if name in attrs and c0 <= c <= c1 and r0 <= r <= r1:
+                attrs[name] = args[0]
+        return attrs
+
+    def _row_height(self, r, widths):
+        h = self._heights.get(r)
+        if h is None:
+            h = 0
+            row = self._data[r]
+            for c, value in enumerate(row):
+                if isinstance(value, Flowable):
+                    h = max(h, value.wrap(widths[c] - self.PAD[0] - self.PAD[1], 1e6)[1])
+                else:
+                    attrs = self._cell(c, r)
+                    h = max(h, (str(value).count('\n') + 1) * attrs['FONTSIZE'] * 1.2)
+            h = self._heights[r] = h + self.PAD[2] + self.PAD[3]
+        return h
+
+    def wrap(self, availWidth, availHeight):
+        self._cw = self._widths(availWidth)
+        self.width = sum(self._cw)
+        self.height = sum(self._row_height(r, self._cw) for r in self._rows)
+        return self.width, self.height
+
+    def _view(self, rows):
+        t = Table.__new__(Table)
+        t.__dict__.update(self.__dict__)
+        t._rows = rows
+        return t
+
+    def split(self, availWidth, availHeight):
+        self.wrap(availWidth, availHeight)
+        head = [r for r in self._rows if r < self.repeatRows]
+        used, k = 0, 0
+        for r in self._rows:
+            h = self._row_height(r, self._cw)
+            if used + h > availHeight:
+                break
+            used += h
+            k += 1
+        if k <= len(head) or k >= len(self._rows):
+            return []
+        return [self._view(self._rows[:k]), self._view(head + self._rows[k:])]
+
+    def draw(self):
+        c, widths = self.canv, self._cw
+        xs = [0]
+        for w in widths:
+            xs.append(xs[-1] + w)
+        left, right, top_pad, bottom_pad = self.PAD
+        y = self.height
+        spans = {}
+        for r in self._rows:
+            h = self._row_height(r, widths)
+            y -= h
+            spans[r] = (y, y + h)
+            for col, value in enumerate(self._data[r]):
+                attrs = self._cell(col, r)
+                x0, cw = xs[col], widths[col]
+                if attrs['BACKGROUND'] is not None:
+                    c.setFillColor(attrs['BACKGROUND'])
+                    c.rect(x0, y, cw, h, stroke=0, fill=1)
+                align = attrs['ALIGN'].upper()
+                if isinstance(value, Flowable):
+                    fw, fh = value.wrap(cw - left - right, 1e6)
+                    content = fh
+                else:
+                    lines = str(value).split('\n')
+                    size = attrs['FONTSIZE']
+                    content = len(lines) * size * 1.2
+                valign = attrs['VALIGN'].upper()
+                bottom = y + bottom_pad if valign == 'BOTTOM' else y + h - top_pad - content if valign == 'TOP' else y + (h - content) / 2
+                if isinstance(value, Flowable):
+                    dx = (cw - left - right - fw) / 2 if align in ('CENTER', 'CENTRE') else cw - left - right - fw if align == 'RIGHT' else 0
+                    value.drawOn(c, x0 + left + dx, bottom)
+                    continue
+                c.setFont(attrs['FONTNAME'], size)
+                c.setFillColor(attrs['TEXTCOLOR'])
+                for i, line in enumerate(lines):
+                    by = bottom + content - size - i * size * 1.2
+                    if align == 'RIGHT':
+                        c.drawRightString(x0 + cw - right, by, line)
+                    elif align in ('CENTER', 'CENTRE'):
+                        c.drawCentredString(x0 + cw / 2, by, line)
+                    else:
+                        c.drawString(x0 + left, by, line)
+        for name, c0, r0, c1, r1, args in self._cmds:
+            if name not in ('GRID', 'BOX'):
+                continue
+            rows = [spans[r] for r in self._rows if r0 <= r <= r1]
+            if not rows:
+                continue
+            c.setLineWidth(args[0])
+            c.setStrokeColor(args[1])
+            lo, hi = min(b for b, _ in rows), max(t for _, t in rows)
+            if name == 'BOX':
+                c.rect(xs[c0], lo, xs[c1 + 1] - xs[c0], hi - lo)
+                continue
+            segs = [(xs[c0], yy, xs[c1 + 1], yy) for yy in sorted({b for b, _ in rows} | {t for _, t in rows})]
+            segs += [(xs[k], lo, xs[k], hi) for k in range(c0, c1 + 2)]
+            c.lines(segs)
+
+LongTable = Table
+
+
+class ListItem:
+    def __init__(self, flowable, **kw):
+        self.flowable = flowable
+
+
+class ListFlowable(Flowable):
+    # Solo viñetas ('bullet'), con la sangría por defecto de reportlab (18 pt)
+    def __init__(self, items, bulletType='bullet', leftIndent=18, **kw):
+        self.items = [i if isinstance(i, ListItem) else ListItem(i) for i in items]
+        self.leftIndent = leftIndent
+
+    def wrap(self, availWidth, availHeight):
+        self._sizes = [i.flowable.wrap(availWidth - self.leftIndent, availHeight) for i in self.items]
+        self.width, self.height = availWidth, sum(h for _, h in self._sizes)
+        return self.width, self.height
+
+    def split(self, availWidth, availHeight):
+        self.wrap(availWidth, availHeight)
+        used, k = 0, 0
+        for _, h in self._sizes:
+            if used + h > availHeight:
+                break
+            used += h
+            k += 1
+        if not k or k >= len(self.items):
+            return []
+        return [ListFlowable(self.items[:k], leftIndent=self.leftIndent), ListFlowable(self.items[k:], leftIndent=self.leftIndent)]
+
+    def draw(self):
+        c = self.canv
+        y = self.height
+        for item, (_, h) in zip(self.items, self._sizes):
+            y -= h
+            size = getattr(getattr(item.flowable, 'style', None), 'fontSize', 10)
+            c.setFont('Helvetica', size)
+            c.setFillColor(colors.black)
+            c.drawString(self.leftIndent - 12, y + h - size, '•')
+            item.flowable.drawOn(c, self.leftIndent, y)
+
+
+class Drawing(Flowable):
+    # Dibujo vectorial simple (líneas, rectángulos, sectores y texto) con la y hacia arriba, como reportlab.graphics
+    def __init__(self, width, height):
+        Flowable.__init__(self)
+        self.width, self.height = width, height
+        self.shapes = []
+
+    def add(self, kind, *args):
+        self.shapes.append((kind, args))
+
+    def draw(self):
+        c = self.canv
+        for kind, args in self.shapes:
+            if kind == 'line':
+                x1, y1, x2, y2, color, width = args
+                c.setStrokeColor(color)
+                c.setLineWidth(width)
+                c.line(x1, y1, x2, y2)
+            elif kind == 'rect':
+                x, y, w, h, color = args
+                c.setFillColor(color)
+                c.rect(x, y, w, h, stroke=0, fill=1)
+            elif kind == 'wedge':
+                cx, cy, r, a0, a1, r_in, color = args
+                c.setFillColor(color)
+                c.wedge(cx, cy, r, a0, a1, r_in)
+            else:
+                x, y, text, anchor, size, color = args
+                c.setFont('Helvetica', size)
+                c.setFillColor(color)
+                {'middle': c.drawCentredString, 'end': c.drawRightString}.get(anchor, c.drawString)(x, y, text)
+
+
+class SimpleDocTemplate:
+    # Un solo marco por página con márgenes de 1 pulgada (los de reportlab por defecto)
+    def __init__(self, filename, pagesize=A4, leftMargin=72, rightMargin=72, topMargin=72, bottomMargin=72, title='', **kw):
+        self.filename, self.pagesize, self.title = filename, pagesize, title
+        self.leftMargin, self.bottomMargin = leftMargin, bottomMargin
+        self.width = pagesize[0] - leftMargin - rightMargin
+        self.height = pagesize[1] - topMargin - bottomMargin
+
+    def build(self, flowables):
+        canvas = Canvas(self.filename, self.pagesize, self.title)
+        top = self.bottomMargin + self.height
+        pending = list(reversed(flowables))
+        y, at_top = top, True
+        while pending:
+            f = pending.pop()
+            space = 0 if at_top else f.spaceBefore
+            avail = y - self.bottomMargin - space
+            w, h = f.wrap(self.width, avail)
+            if h > avail + 1e-6:
+                parts = f.split(self.width, avail)
+                if parts:
+                    pending.extend(reversed(parts))
+                    continue
+                if not at_top:
+                    canvas.showPage()
+                    y, at_top = top, True
+                    pending.append(f)
+                    continue
+                # no cabe ni en una página vacía: se dibuja igual (desborda) y se sigue en la siguiente
+            x = self.leftMargin + {'CENTER': (self.width - w) / 2, 'CENTRE': (self.width - w) / 2, 'RIGHT': self.width - w}.get(f.hAlign, 0)
+            f.drawOn(canvas, x, y - space - h)
+            y -= space + h + f.spaceAfter
+            at_top = False
+            if y <= self.bottomMargin and pending:
+                canvas.showPage()
+                y, at_top = top, True
+        canvas.save()
@@ -0,0 +1,165 @@
+import re
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+TITLE_RE = re.compile(r"bump\s+([^\s]+)\s+from\s+([^\s]+)\s+to\s+([^\s]+)(?:\s+in\s+(.+))?", re.IGNORECASE)
+DIGITS_RE = re.compile(r"\d+")
+UPDATE_TYPES = ('major','minor','patch','other')
+
+
+class PRRecord(NamedTuple):
+    number: object
+    title: str
+    url: str
+    labels: tuple
+    label_names: tuple
+    created_at: str
+    created: Optional[datetime]
+    age_days: Optional[int]
+    head_ref: str
+    state: str
+    merged_at: str
+    closed_at: str
+    parsed: bool
+    name: str
+    from_ver: str
+    to_ver: str
+    title_dir: str
+    raw_dir: str
+    directory: str
+    ecosystem: str
+    update_type: str
+
+
+def parse_title(t):
+    m = TITLE_RE.search(t or '')
+    if m:
+        return {'name': m.group(1), 'from': m.group(2), 'to': m.group(3), 'dir': m.group(4) or ''}
+    return None
+
+@lru_cache(maxsize=4096)
+def semver_tuple(s):
+    nums = [int(x) for x in DIGITS_RE.findall(s or '')[:3]]
+    while len(nums) < 3:
+        nums.append(0)
+    return tuple(nums)
+
+@lru_cache(maxsize=8192)
+def update_type(f, t):
+    if not f or not t:
+        return 'other'
+    fM,fm,fp = semver_tuple(f)
+    tM,tm,tp = semver_tuple(t)
+    if tM != fM:
+        return 'major'
+    if tm != fm:
+        return 'minor'
+    if tp != fp:
+        return 'patch'
+    return 'other'
+
+def _ref_parts(ref):
+    if '/' not in (ref or ''):
+        return None, -1
+    parts = ref.split('/')
+    try:
+        return parts, parts.index('dependabot')
+    except ValueError:
+        return parts, -1
+
+def directory_of(title_dir, ref):
+    if title_dir:
+        return title_dir
+    parts, idx = _ref_parts(ref)
+    if idx >= 0 and len(parts) > idx+2:
+        return '/' + '/'.join(parts[idx+2:-1])
+    return '/'
+
+def ecosystem_of(ref):
+    parts, idx = _ref_parts(ref)
+    if idx >= 0 and len(parts) > idx+1:
+        eco = parts[idx+1]
+        return 'npm' if eco == 'npm_and_yarn' else eco
+    return 'unknown'
+
+@lru_cache(maxsize=4096)
+def sanitize_dir_path(s, eco_hint=''):
+    try:
+        d = (s or '/').strip().replace('\\','/')
+        if not d:
+            d = '/'
+        if d == '/':
+            return '/'
+        eco = (eco_hint or '').lower()
+        eco = 'github-actions' if eco == 'github_actions' else eco
+        if d.startswith('/main/') or d == '/main':
+            return '/.github/workflows' if eco == 'github-actions' else '/'
+        if ' ' in d:
+            return '/.github/workflows' if eco == 'github-actions' else '/'
+        first = d.split('/')[1] if d.startswith('/') and len(d.split('/'))>1 else d.split('/')[0]
+        if eco == 'github-actions' and first in ['actions','appleboy','main']:
+            return '/.github/workflows'
+        if '/main' in d:
+            parts = [seg for seg in d.split('/') if seg and seg != 'main']
+            d2 = '/' + '/'.join(parts)
+            return '/' if d2 == '/' else d2
+        return d
+    except Exception:
+        return '/'
+
+def parse_iso(iso):
+    try:
+        return datetime.fromisoformat((iso or '').replace('Z','+00:00'))
+    except Exception:
+        return None
+
+def normalize(pr, now=None):
+    now = now or datetime.now(timezone.utc)
+    title = pr.get('title','') or ''
+    meta = parse_title(title)
+    ref = pr.get('headRefName','') or ''
+    labels = tuple(l for l in (pr.get('labels') or []) if isinstance(l, dict))
+    created_at = pr.get('createdAt','') or ''
+    created = parse_iso(created_at)
+    eco = ecosystem_of(ref)
+    title_dir = meta['dir'] if meta else ''
+    raw_dir = directory_of(title_dir, ref)
+    from_ver = meta['from'] if meta else ''
+    to_ver = meta['to'] if meta else ''
+    return PRRecord(
+        number=pr.get('number',''),
+        title=title,
+        url=pr.get('url','') or '',
+        labels=labels,
+        label_names=tuple(l.get('name','') for l in labels),
+        created_at=created_at,
+        created=created,
+        age_days=(now - created).days if created else None,
+        head_ref=ref,
+        state=(pr.get('state','') or '').lower(),
+        merged_at=pr.get('mergedAt','') or '',
+        closed_at=pr.get('closedAt','') or '',
+        parsed=meta is not None,
+        name=meta['name'] if meta else '—',
+        from_ver=from_ver,
+        to_ver=to_ver,
+        title_dir=title_dir,
+        raw_dir=raw_dir,
+        directory=sanitize_dir_path(raw_dir, eco),
+        ecosystem=eco,
+        update_type=update_type(from_ver, to_ver),
+    )
+
+def as_record(pr, now=None):
+    # PRRecord ya normalizado (p.ej. compartido por render_pipeline) tal cual; dict -> normalize; otro -> None
+    if isinstance(pr, PRRecord):
+        return pr
+    return normalize(pr, now) if isinstance(pr, dict) else None
+
+def normalize_all(prs, now=None):
+    now = now or datetime.now(timezone.utc)
+    return [rec for rec in (as_record(pr, now) for pr in (prs or [])) if rec is not None]
+
+def empty_agg():
+    return {k: 0 for k in UPDATE_TYPES}
@@ -0,0 +1,64 @@
+from api_budget import allows
+from gh_api import gh_graphql
+from tracing import span
+
+BATCH_SIZE = 100
+PR_FIELDS = 'number state mergedAt headRefName labels(first: 20) { nodes { name color } }'
+
+
+def needs_state(pr):
+    if pr.get('stateResolved'):
+        return False
+    st = (pr.get('state','') or '').lower()
+    return st == 'closed' or not pr.get('headRefName')
+
+def build_query(numbers, fields=PR_FIELDS):
+    aliases = ' '.join(f"pr{n}: pullRequest(number: {int(n)}) {{ {fields} }}" for n in numbers)
+    return f"query($owner: String!, $name: String!) {{ repository(owner: $owner, name: $name) {{ {aliases} }} }}"
+
+def query_pull_requests(repo, numbers, fields=PR_FIELDS, batch_size=BATCH_SIZE, graphql=gh_graphql):
+    owner, _, name = (repo or '').partition('/')
+    found = {}
+    numbers = [n for n in numbers if isinstance(n, int)]
+    for i in range(0, len(numbers), batch_size):
+        batch = numbers[i:i+batch_size]
+        data = graphql(build_query(batch, fields), {'owner': owner, 'name': name})
+        for node in ((data or {}).get('repository') or {}).values():
+            if isinstance(node, dict) and node.get('number') is not None:
+                found[node['number']] = node
+    return found
+
+def apply_state(pr, node):
+    st = (node.get('state') or '').lower()
+    pr['state'] = 'merged' if (st == 'merged' or node.get('mergedAt')) else (st or pr.get('state',''))
+    pr['mergedAt'] = node.get('mergedAt') or ''
+    if node.get('headRefName') and not pr.get('headRefName'):
+        pr['headRefName'] = node['headRefName']
+    nodes = (node.get('labels') or {}).get('nodes')
+    if nodes is not None:
+        pr['labels'] = [{'name': l.get('name',''), 'color': l.get('color','')} for l in nodes if isinstance(l, dict)]
+    pr['stateResolved'] = True
+    return pr
+
+def resolve_states(prs, repo, log=None, graphql=gh_graphql):
+    # Una sola etapa: hasta 100 PRs por consulta GraphQL en lugar de un `gh api pulls/{num}` por PR
+    pending = [pr for pr in prs if isinstance(pr, dict) and needs_state(pr)]
+    if not pending or not repo:
+        return prs
+    if not allows((len(pending)+BATCH_SIZE-1)//BATCH_SIZE, f"resolve_states de {len(pending)} PRs (se usa el estado del listado)"):
+        return prs
+    try:
+        with span('resolve_states', pending=len(pending)) as attrs:
+            found = query_pull_requests(repo, [pr.get('number') for pr in pending], graphql=graphql)
+            attrs['found'] = len(found)
+    except Exception as e:
+        if log:
+            log(f"resolve_states exception: {e}")
+        return prs
+    for pr in pending:
+        node = found.get(pr.get('number'))
+        if node:
+            apply_state(pr, node)
+    if log:
+        log(f"resolve_states: {len(found)}/{len(pending)} PRs resueltos en {(len(pending)+BATCH_SIZE-1)//BATCH_SIZE} consultas")
+    return prs
@@ -0,0 +1,161 @@
+import atexit, io, itertools, os, sys, threading
+from contextlib import contextmanager
+
+from tracing import get_tracer
+
+PROFILE_DIR = os.path.join('docs','profile')
+_local = threading.local()
+_seq = itertools.count(1)
+_main_pid = os.getpid()
+
+
+def mode():
+    # PROFILE=true (o --profile en la línea de comandos): cProfile + tracemalloc; PROFILE=cpu: solo cProfile
+    raw = os.getenv('PROFILE','').strip().lower()
+    if '--profile' in sys.argv and raw in ('', 'false'):
+        raw = 'true'
+    return raw if raw in ('true', 'cpu') else ''
+
+def _stack():
+    if not hasattr(_local, 'stack'):
+        _local.stack = []
+    return _local.stack
+
+
+class _Frame:
+    # Una fase abierta: su span de tracing y, si se perfila, su cProfile y su ventana de tracemalloc.
+    # El tiempo de CPU es exclusivo (al abrir una fase anidada se pausa el profiler de fuera); el pico de memoria es
+    # inclusivo (lo que asignan las fases anidadas cuenta también para la de fuera). Los snapshots de tracemalloc y
+    # el informe quedan fuera del span para no inflar la duración de la fase.
+    def __init__(self, name, is_step, attrs):
+        self.name, self.is_step = name, is_step
+        self.prof = self.snap = None
+        self.mem0 = self.peak = 0
+        self.mode = mode()
+        stack = _stack()
+        self.outer = stack[-1] if stack and self.mode else None
+        if self.outer and self.outer.prof:
+            self.outer.prof.disable()
+        if self.mode == 'true':
+            import tracemalloc
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            if self.outer and self.outer.mode == 'true':
+                self.outer.peak = max(self.outer.peak, tracemalloc.get_traced_memory()[1])
+            self.snap = tracemalloc.take_snapshot()
+            tracemalloc.reset_peak()
+            self.mem0 = tracemalloc.get_traced_memory()[0]
+        self.span = get_tracer().span(name, 'phase', **attrs)
+        self.attrs = self.span.__enter__()
+        if self.mode:
+            # cProfile, pstats y tracemalloc solo se importan al perfilar: sin PROFILE no cuestan arranque
+            import cProfile
+            self.prof = cProfile.Profile()
+            self.prof.enable()
+
+    def close(self, exc=(None, None, None)):
+        if not self.prof:
+            self.span.__exit__(*exc)
+            return
+        self.prof.disable()
+        outer = self.outer
+        if self.snap is not None:
+            import tracemalloc
+            cur, peak = tracemalloc.get_traced_memory()
+            self.peak = max(self.peak, peak)
+            self.attrs.update(peak_kib=round(self.peak/1024), alloc_kib=round((cur - self.mem0)/1024))
+            if outer and outer.mode == 'true':
+                outer.peak = max(outer.peak, self.peak)
+        path = self.attrs['pstats'] = _pstats_path(self.name)
+        self.span.__exit__(*exc)
+        _report(self, path, tracemalloc.take_snapshot() if self.snap is not None else None)
+        if outer and outer.prof:
+            outer.prof.enable()
+
+
+def _open(name, is_step, attrs):
+    frame = _Frame(name, is_step, attrs)
+    _stack().append(frame)
+    return frame
+
+def _close_steps(exc=(None, None, None)):
+    stack = _stack()
+    while stack and stack[-1].is_step:
+        stack.pop().close(exc)
+
+@contextmanager
+def phase(name, **attrs):
+    # Fase lógica con span de tracing; con PROFILE además .pstats, hotspots y memoria por fase (ver _report)
+    frame = _open(name, False, attrs)
+    try:
+        yield frame.attrs
+    except BaseException:
+        exc = sys.exc_info()
+        _close_steps(exc)
+        _stack().pop()
+        frame.close(exc)
+        raise
+    _close_steps()
+    _stack().pop()
+    frame.close()
+
+def step(name, **attrs):
+    # Divide la fase abierta en etapas consecutivas (load, enrich, aggregate, render, write) sin anidar bloques:
+    # cierra la etapa anterior y abre `name`; la fase cierra la última al terminar. Devuelve los atributos del span
+    # (para completarlos); sin fase abierta no hace nada.
+    if not _stack():
+        return attrs
+    _close_steps()
+    return _open(name, True, attrs).attrs
+
+def _label():
+    name = get_tracer().process_name
+    return name if os.getpid() == _main_pid else f"{name}-{os.getpid()}"
+
+def _pstats_path(name):
+    return os.path.join(os.getenv('PROFILE_DIR','') or PROFILE_DIR, f"{_label()}.{next(_seq):02d}.{name}.pstats")
+
+def _report(frame, path, snap, top=None):
+    # <dir>/<proceso>.<n>.<fase>.pstats (para snakeviz/pstats) y una sección en <dir>/<proceso>.txt con los
+    # hotspots por tiempo propio y, con tracemalloc, las líneas que más memoria neta asignaron en la fase
+    import pstats
+    top = top or int(os.getenv('PROFILE_TOP','25') or 25)
+    out_dir = os.path.dirname(path)
+    try:
+        os.makedirs(out_dir, exist_ok=True)
+        frame.prof.dump_stats(path)
+        buf = io.StringIO()
+        stats = pstats.Stats(frame.prof, stream=buf)
+        buf.write(f"== {frame.name} ({os.path.basename(path)}) — {stats.total_tt:.3f} s de CPU propios")
+        if snap is not None:
+            buf.write(f", pico {frame.peak/2**20:.1f} MiB, neto {frame.attrs['alloc_kib']/1024:+.1f} MiB")
+        buf.write('\n')
+        stats.strip_dirs().sort_stats('tottime').print_stats(top)
+        if snap is not None:
+            buf.write(f"-- top {top} asignaciones (neto por línea)\n")
+            for d in snap.compare_to(frame.snap, 'lineno')[:top]:
+                buf.write(f"  {d.size_diff/1024:+10.1f} KiB {d.count_diff:+8d} bloques  {d.traceback}\n")
+        with open(os.path.join(out_dir, f"{_label()}.txt"), 'a', encoding='utf-8') as f:
+            f.write(buf.getvalue() + '\n')
+    except Exception as e:
+        get_tracer().log(f"profiling {frame.name}: no se pudo escribir el informe: {e}")
+
+def _at_exit():
+    # Tabla de fases del proceso principal (incluye las de los procesos del pool, que llegan por tracing)
+    if not mode() or os.getpid() != _main_pid:
+        return
+    rows = [(n, s) for n, s in get_tracer().stats.items() if s.get('phase')]
+    if not rows:
+        return
+    lines = [f"{'fase':<28} {'veces':>6} {'total s':>9} {'pico MiB':>9} {'neto MiB':>9}\n"]
+    for name, s in rows:
+        lines.append(f"{name:<28} {s['count']:>6} {s['us']/1e6:>9.3f} {s['peak_kib']/1024:>9.1f} {s['alloc_kib']/1024:>+9.1f}\n")
+    out_dir = os.getenv('PROFILE_DIR','') or PROFILE_DIR
+    try:
+        os.makedirs(out_dir, exist_ok=True)
+        with open(os.path.join(out_dir, f"{_label()}.phases.txt"), 'w', encoding='utf-8') as f:
+            f.writelines(lines)
+    except Exception:
+        pass
+
+atexit.register(_at_exit)
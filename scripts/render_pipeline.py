@@ -0,0 +1,225 @@
+import os, sqlite3, sys, time
+import multiprocessing as mp
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime, timezone
+
+import create_issue, generate_pdf, generate_summary, trends
+from api_budget import get_budget
+from dataset import load_prs, load_records
+from pr_records import normalize_all
+from pr_state import resolve_states
+from profiling import phase, step
+from tracing import get_tracer
+
+HTML_ACTION = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '.github', 'actions', 'dependabot-html-report')
+RENDERERS = ('issue', 'summary', 'html', 'pdf')
+# El summary y el HTML enlazan el Issue: se lanzan cuando se conoce su URL. El PDF no depende de nadie.
+AFTER_ISSUE = ('summary', 'html')
+
+# Opciones de run_pipeline; las de cada renderer son las DEFAULTS de su script (create_issue, generate_summary,
+# generate_html, generate_pdf)
+DEFAULTS = {
+    'renderers': RENDERERS,
+    'workers': 0,                 # 0 = un proceso por renderer (hasta cpu_count); 1 = todo en este proceso, en orden
+    'resolve_states': True,       # una sola consulta GraphQL por cada 100 PRs sin estado, compartida por todos
+    'repository': '',
+    'html_action_path': HTML_ACTION,
+    'trends_db': '',              # histórico SQLite (scripts/trends.py): se registra este run y HTML/PDF muestran tendencias
+    'run_id': '',
+    'issue': {}, 'summary': {}, 'html': {}, 'pdf': {},
+}
+
+
+def _html_module(action_path=HTML_ACTION):
+    if action_path not in sys.path:
+        sys.path.insert(0, action_path)
+    import generate_html
+    return generate_html
+
+def options_from_env():
+    names = [n.strip() for n in os.getenv('RENDERERS', ','.join(RENDERERS)).split(',') if n.strip()]
+    try:
+        workers = int(os.getenv('RENDER_WORKERS','0') or 0)
+    except ValueError:
+        workers = 0
+    action_path = os.getenv('HTML_ACTION_PATH','') or HTML_ACTION
+    return dict(DEFAULTS,
+        renderers=tuple(n for n in RENDERERS if n in names),
+        workers=workers,
+        resolve_states=os.getenv('RESOLVE_STATES','true').lower() != 'false',
+        repository=os.getenv('GITHUB_REPOSITORY',''),
+        html_action_path=action_path,
+        trends_db=os.getenv('TRENDS_DB','').strip(),
+        run_id=os.getenv('GITHUB_RUN_ID','') or os.getenv('RUN_ID',''),
+        issue=create_issue.options_from_env(),
+        summary=generate_summary.options_from_env(),
+        html=_html_module(action_path).options_from_env(),
+        pdf=generate_pdf.options_from_env(),
+    )
+
+# Registros compartidos por los renderers. Con fork los procesos del pool los heredan del padre sin serializarlos;
+# con spawn initializer/initargs los copian una vez por proceso (no una vez por tarea).
+_SHARED = {}
+
+def _init(records, alerts, action_path, parent=None):
+    _SHARED.update(records=records, alerts=alerts, action_path=action_path, parent=parent or os.getpid())
+
+def _issue(records, alerts, opts):
+    url, reused = create_issue.publish_issue(records, opts)
+    return {'url': url, 'reused': reused}
+
+def _summary(records, alerts, opts):
+    # Estados ya resueltos por el pipeline: el summary no vuelve a consultarlos
+    return {'text': generate_summary.build_summary(records, dict(opts, fast=True))}
+
+def _html(records, alerts, opts):
+    return _html_module(_SHARED['action_path']).build_html(records, dict(opts, alerts=alerts))
+
+def _pdf(records, alerts, opts):
+    try:
+        generate_pdf.load_backend(opts.get('backend', 'auto'))
+    except Exception as e:
+        # Como generate_pdf.main: sin el backend pedido el PDF se marca no creado, sin fallar el pipeline
+        return {'created': False, 'error': f"Reportlab no disponible: {e}"}
+    return dict(generate_pdf.build_pdf(records, dict(opts, alerts=alerts, resolve_states=False)), created=True)
+
+RENDER = {'issue': _issue, 'summary': _summary, 'html': _html, 'pdf': _pdf}
+
+def _run(name, opts):
+    # Se ejecuta en un proceso del pool: devuelve (resultado, error, segundos, eventos de traza, llamadas a la API).
+    # En un proceso hijo los eventos y las llamadas de la tarea vuelven al padre, que es quien escribe traza y cuentas.
+    tracer, budget = get_tracer(), get_budget()
+    mark, calls = tracer.mark(), budget.mark()
+    t0 = time.perf_counter()
+    try:
+        with phase(f"render.{name}", records=len(_SHARED['records'])):
+            result, error = RENDER[name](_SHARED['records'], _SHARED['alerts'], opts), ''
+    except Exception as e:
+        result, error = None, f"{type(e).__name__}: {e}"
+    seconds = time.perf_counter() - t0
+    if os.getpid() == _SHARED['parent']:
+        return result, error, seconds, [], {}
+    return result, error, seconds, tracer.detach(mark), budget.delta(calls)
+
+def load(dataset, opts):
+    # Carga y enriquece una sola vez: PRs, alertas, estados (GraphQL) y normalización a PRRecord inmutables
+    dataset_path = dataset if isinstance(dataset, (str, os.PathLike)) else ''
+    step('load.prs')
+    prs = load_prs(dataset)
+    alerts = ()
+    if {'html', 'pdf'} & set(opts['renderers']):
+        pdf_opts = dict(generate_pdf.DEFAULTS, **opts['pdf'])
+        step('load.alerts')
+        alerts = tuple(a for a in generate_pdf.load_alerts(dataset_path, pdf_opts) if isinstance(a, dict))
+    if opts['resolve_states']:
+        step('load.enrich')
+        prs = resolve_states(list(prs), opts['repository'])
+    step('load.normalize')
+    return tuple(normalize_all(prs, datetime.now(timezone.utc))), alerts
+
+def record_trends(records, alerts, opts):
+    # Registra el run en el histórico y devuelve el resumen para HTML y PDF; un fallo de la base no para el pipeline
+    try:
+        with trends.TrendStore(opts['trends_db']) as store:
+            store.record(opts['repository'], records, alerts, run_id=opts['run_id'])
+            return store.summary(opts['repository'])
+    except (sqlite3.Error, OSError) as e:
+        print(f"::warning::histórico de tendencias ({opts['trends_db']}): {e}")
+        return None
+
+def run_pipeline(dataset, options=None):
+    # Devuelve {'results', 'errors', 'timings', 'wall'}; timings en segundos por etapa ('load' y cada renderer)
+    opts = dict(DEFAULTS, **(options or {}))
+    get_budget()  # antes del fork: los procesos del pool heredan lo ya gastado para sus allows()
+    t0 = time.perf_counter()
+    with phase('load') as attrs:
+        records, alerts = load(dataset, opts)
+        attrs.update(prs=len(records), alerts=len(alerts))
+        summary = None
+        if opts['trends_db']:
+            step('load.trends')
+            # Sin HTML ni PDF no se cargan alertas: el run solo actualiza los PRs del histórico
+            summary = record_trends(records, alerts if {'html', 'pdf'} & set(opts['renderers']) else None, opts)
+    timings = {'load': time.perf_counter() - t0}
+    names = [n for n in RENDERERS if n in opts['renderers']]
+    results, errors = {}, {}
+
+    def renderer_opts(name):
+        o = dict(opts[name])
+        if name in AFTER_ISSUE and 'issue' in results:
+            o['issue_url'] = results['issue']['url']
+        if name in ('html', 'pdf') and summary is not None:
+            o['trends'] = summary
+        return o
+
+    def collect(name, outcome):
+        result, error, seconds, events, calls = outcome
+        get_tracer().merge(events)
+        get_budget().merge(calls)
+        timings[name] = seconds
+        if error:
+            errors[name] = error
+        else:
+            results[name] = result
+
+    workers = opts['workers'] or min(len(names), os.cpu_count() or 1)
+    if workers <= 1 or len(names) <= 1:
+        _init(records, alerts, opts['html_action_path'])
+        for name in names:
+            collect(name, _run(name, renderer_opts(name)))
+    else:
+        ctx = mp.get_context('fork') if 'fork' in mp.get_all_start_methods() else None
+        with ProcessPoolExecutor(workers, mp_context=ctx, initializer=_init, initargs=(records, alerts, opts['html_action_path'], os.getpid())) as ex:
+            waiting = [n for n in names if n in AFTER_ISSUE and 'issue' in names]
+            pending = {ex.submit(_run, n, renderer_opts(n)): n for n in names if n not in waiting}
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    name = pending.pop(fut)
+                    collect(name, fut.result())
+                    if name == 'issue':
+                        pending.update({ex.submit(_run, n, renderer_opts(n)): n for n in waiting})
+    return {'results': results, 'errors': errors, 'timings': timings, 'wall': time.perf_counter() - t0}
+
+def timings_markdown(run):
+    rows = ''.join(f"| {name} | {s:.2f} |\n" for name, s in run['timings'].items())
+    return ("<details>\n<summary><h2>⏱️ Tiempos de generación</h2></summary>\n\n"
+            f"| Etapa | Segundos |\n|:------|--------:|\n{rows}| **total (pared)** | **{run['wall']:.2f}** |\n\n</details>\n\n")
+
+def main():
+    opts = options_from_env()
+    dataset_path = os.getenv('DATASET_PATH','').strip()
+    dataset = dataset_path if dataset_path and os.path.exists(dataset_path) else load_records('prs', 'PRS_DATA')
+    run = run_pipeline(dataset, opts)
+    results, errors = run['results'], run['errors']
+
+    for name, s in run['timings'].items():
+        print(f"⏱️ {name}: {s:.2f} s" + (f" ❌ {errors[name]}" if name in errors else ''))
+    print(f"⏱️ total: {run['wall']:.2f} s (suma de etapas {sum(run['timings'].values()):.2f} s)")
+    if 'issue' in results:
+        print(f"🧾 Issue {'reutilizado' if results['issue']['reused'] else 'creado'}: {results['issue']['url'] or 'N/A'}")
+    if 'html' in results:
+        print(f"HTML generado en {results['html']['path']}")
+    pdf = results.get('pdf') or {}
+    if pdf.get('created'):
+        print(f"PDF generado en {pdf['path']} (backend {pdf['backend']})")
+    elif pdf:
+        print(f"{pdf['error']}. Saltando generación de PDF.")
+
+    summary_path = os.getenv('GITHUB_STEP_SUMMARY')
+    if summary_path:
+        with open(summary_path, 'w' if 'summary' in results else 'a') as f:
+            f.write(results.get('summary', {}).get('text', '') + timings_markdown(run))
+    out = os.getenv('GITHUB_OUTPUT')
+    if out:
+        with open(out, 'a') as f:
+            if 'issue' in results:
+                f.write(f"issue_url={results['issue']['url']}\n")
+            f.write(f"pdf_created={'true' if pdf.get('created') else 'false'}\n")
+            f.write(f"html_created={'true' if 'html' in results else 'false'}\n")
+    for name, error in errors.items():
+        print(f"::error::{name}: {error}")
+    return 1 if errors else 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,89 @@
+import gzip, json, os, time
+
+VERSION = 1
+
+
+class SnapshotStore:
+    # Estado de la última ejecución (persistible con actions/cache) para pedir a la API solo lo que cambió.
+    # Un fichero gzip con JSON:
+    #   {'version': 1, 'collections': {nombre: {'scope': ..., 'items': {clave: item}, 'watermark': iso, 'full_at': epoch}}}
+    # watermark es el updated_at más reciente visto; scope invalida la colección si cambian repo/filtros.
+    def __init__(self, path, max_age_days=7):
+        self.path = path
+        self.max_age = max_age_days * 86400
+        self.collections = {}
+        self.dirty = False
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                data = json.load(f)
+            if isinstance(data, dict) and data.get('version') == VERSION:
+                self.collections = data.get('collections', {})
+        except Exception:
+            self.collections = {}
+
+    def _get(self, name, scope=''):
+        coll = self.collections.get(name)
+        if not coll or coll.get('scope','') != scope:
+            coll = self.collections[name] = {'scope': scope, 'items': {}, 'watermark': '', 'full_at': 0}
+        return coll
+
+    def watermark(self, name, scope=''):
+        # Sin watermark, con otro scope o con el último listado completo demasiado antiguo se fuerza un listado completo
+        coll = self.collections.get(name)
+        if not coll or coll.get('scope','') != scope or not coll.get('watermark'):
+            return ''
+        if self.max_age and time.time() - coll.get('full_at', 0) > self.max_age:
+            return ''
+        return coll['watermark']
+
+    def items(self, name, scope=''):
+        return list(self._get(name, scope)['items'].values())
+
+    def merge(self, name, items, key, updated, keep=lambda it: True, full=False, scope=''):
+        # full=True reemplaza la colección (listado completo); si no, aplica el delta encima del estado guardado
+        coll = self._get(name, scope)
+        if full:
+            coll['items'] = {}
+            coll['watermark'] = ''
+            coll['full_at'] = time.time()
+        stored = coll['items']
+        for it in items:
+            k = str(key(it))
+            ts = updated(it) or ''
+            prev = stored.get(k)
+            if prev is not None and (updated(prev) or '') == ts:
+                # sin cambios: se conserva lo ya enriquecido (p.ej. estado resuelto por GraphQL)
+                continue
+            if keep(it):
+                stored[k] = it
+            else:
+                stored.pop(k, None)
+            if ts > coll['watermark']:
+                coll['watermark'] = ts
+        self.dirty = True
+        return list(stored.values())
+
+    def save(self):
+        if not self.dirty:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            tmp = self.path + '.tmp'
+            with gzip.open(tmp, 'wt', encoding='utf-8') as f:
+                json.dump({'version': VERSION, 'collections': self.collections}, f, separators=(',', ':'))
+            os.replace(tmp, self.path)
+            self.dirty = False
+        except Exception:
+            pass
+
+
+def open_snapshot():
+    # Activa el snapshot solo si SNAPSHOT_PATH está definido
+    path = os.getenv('SNAPSHOT_PATH','').strip()
+    if not path:
+        return None
+    try:
+        max_age = float(os.getenv('SNAPSHOT_MAX_AGE_DAYS','7') or 7)
+    except Exception:
+        max_age = 7
+    return SnapshotStore(path, max_age)
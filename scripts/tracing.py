@@ -0,0 +1,171 @@
+import atexit, json, os, sys, threading, time
+from contextlib import contextmanager
+
+DEBUG_PATH = os.path.join('docs','output.txt')
+TRACE_PATH = os.path.join('docs','trace.json')
+FLUSH_EVERY = 512
+_tracer = None
+_tracer_lock = threading.Lock()
+
+
+class Tracer:
+    # Spans con tiempo de inicio/duración y atributos (endpoint, status, bytes, cache...) en un buffer en memoria.
+    # Se vuelcan por bloques y al salir:
+    #   trace_path   eventos Chrome trace-event en formato array ("[" + un evento por línea, sin "]" final: el
+    #                formato lo permite y así cada script del job añade sus eventos al mismo fichero); se abre con
+    #                chrome://tracing o https://ui.perfetto.dev
+    #   debug_path   los mensajes de log() en texto, como antes (docs/output.txt)
+    # Por nombre de span se acumulan contadores para la tabla del step summary (summary_markdown).
+    def __init__(self, trace_path=TRACE_PATH, debug_path=DEBUG_PATH, process_name=''):
+        self.trace_path = trace_path
+        self.debug_path = debug_path
+        self.pid = os.getpid()
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.events = []
+        self.pending = 0
+        self.stats = {}
+        self.process_name = process_name or os.path.splitext(os.path.basename(sys.argv[0] or 'python'))[0]
+        self.events.append(self._meta(self.process_name))
+
+    def _meta(self, name):
+        return {'ph': 'M', 'name': 'process_name', 'pid': os.getpid(), 'tid': 0, 'args': {'name': name}}
+
+    def _add(self, ev):
+        with self.lock:
+            self.events.append(ev)
+            if ev['ph'] == 'X':
+                self._account(ev)
+            flush = len(self.events) - self.pending >= FLUSH_EVERY and os.getpid() == self.pid
+        if flush:
+            self.flush()
+
+    def _account(self, ev):
+        a = ev.get('args') or {}
+        s = self.stats.setdefault(ev['name'], {'count': 0, 'us': 0, 'max_us': 0, 'bytes': 0, 'hits': 0, 'errors': 0})
+        s['count'] += 1
+        s['us'] += ev['dur']
+        s['max_us'] = max(s['max_us'], ev['dur'])
+        s['bytes'] += a.get('bytes') or 0
+        s['hits'] += a.get('cache') == 'hit'
+        s['errors'] += bool(a.get('error')) or (a.get('status') or 0) >= 400
+        if 'pstats' in a:
+            # Fase perfilada (profiling.phase): pico y neto de memoria para la tabla de fases
+            s['phase'] = True
+            s['peak_kib'] = max(s.get('peak_kib', 0), a.get('peak_kib') or 0)
+            s['alloc_kib'] = s.get('alloc_kib', 0) + (a.get('alloc_kib') or 0)
+
+    @contextmanager
+    def span(self, name, cat='phase', **attrs):
+        # attrs es mutable: el bloque puede añadir atributos conocidos al final (status, bytes, páginas...)
+        ts = time.time_ns() // 1000
+        t0 = time.perf_counter()
+        try:
+            yield attrs
+        except BaseException as e:
+            attrs['error'] = f"{type(e).__name__}: {e}"[:300]
+            raise
+        finally:
+            dur = int((time.perf_counter() - t0) * 1e6)
+            self._add({'ph': 'X', 'name': name, 'cat': cat, 'ts': ts, 'dur': dur, 'pid': os.getpid(),
+                       'tid': threading.get_native_id(), 'args': attrs})
+
+    def log(self, msg, **attrs):
+        self._add({'ph': 'i', 'name': 'log', 'cat': 'log', 's': 't', 'ts': time.time_ns() // 1000, 'pid': os.getpid(),
+                   'tid': threading.get_native_id(), 'args': dict(attrs, msg=str(msg))})
+
+    def mark(self):
+        with self.lock:
+            return len(self.events)
+
+    def detach(self, mark):
+        # En un proceso hijo (pool de render_pipeline): saca los eventos registrados desde mark para devolverlos al
+        # padre, que los integra con merge(); el hijo no escribe ficheros
+        with self.lock:
+            events, self.events = self.events[mark:], self.events[:mark]
+        return [self._meta(f"{self.process_name}:{os.getpid()}")] + events
+
+    def merge(self, events):
+        with self.lock:
+            for ev in events:
+                self.events.append(ev)
+                if ev['ph'] == 'X':
+                    self._account(ev)
+
+    def flush(self):
+        if os.getpid() != self.pid:
+            return
+        with self.flush_lock:
+            self._flush()
+
+    def _flush(self):
+        with self.lock:
+            events = self.events[self.pending:]
+            self.pending = len(self.events)
+        if not events:
+            return
+        lines = [ev['args']['msg'] + '\n' for ev in events if ev['ph'] == 'i' and ev['cat'] == 'log']
+        for path, data in ((self.debug_path, lines), (self.trace_path, [json.dumps(ev, separators=(',', ':'), default=str) + ',\n' for ev in events])):
+            if not path or not data:
+                continue
+            try:
+                os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+                with open(path, 'a', encoding='utf-8') as f:
+                    if path == self.trace_path and f.tell() == 0:
+                        f.write('[\n')
+                    f.writelines(data)
+            except Exception:
+                pass
+        # Los eventos ya escritos no hacen falta: la tabla sale de self.stats
+        with self.lock:
+            del self.events[:self.pending]
+            self.pending = 0
+
+    def summary_markdown(self, top=20):
+        with self.lock:
+            rows = sorted(self.stats.items(), key=lambda kv: kv[1]['us'], reverse=True)[:top]
+        if not rows:
+            return ''
+        body = ''.join(f"| `{name}` | {s['count']} | {s['us']/1e6:.2f} | {s['us']/s['count']/1e3:.1f} | {s['max_us']/1e3:.1f} | "
+                       f"{s['bytes']/1024:.0f} | {s['hits']} | {s['errors']} |\n" for name, s in rows)
+        return (f"<details>\n<summary><h2>🔎 Traza: {self.process_name}</h2></summary>\n\n"
+                "| Span | Llamadas | Total s | Media ms | Máx ms | KiB | Cache hits | Errores |\n"
+                "|:-----|--------:|-------:|--------:|------:|----:|----------:|-------:|\n"
+                f"{body}\n</details>\n\n")
+
+
+def get_tracer():
+    # TRACE_PATH='' desactiva el fichero de trazas (los spans y la tabla siguen disponibles)
+    global _tracer
+    with _tracer_lock:
+        if _tracer is None:
+            _tracer = Tracer(os.getenv('TRACE_PATH', TRACE_PATH).strip(), DEBUG_PATH)
+        return _tracer
+
+def set_tracer(tracer):
+    global _tracer
+    with _tracer_lock:
+        _tracer = tracer
+
+def span(name, cat='phase', **attrs):
+    return get_tracer().span(name, cat, **attrs)
+
+def log(msg, **attrs):
+    get_tracer().log(msg, **attrs)
+
+def _at_exit():
+    # Registrado al importar el módulo: corre después de los atexit de quien lo importa (p. ej. el log de
+    # http_cache), así sus mensajes también se vuelcan
+    t = _tracer
+    if t is None or os.getpid() != t.pid:
+        return
+    t.flush()
+    summary_path = os.getenv('GITHUB_STEP_SUMMARY')
+    if summary_path and os.getenv('TRACE_SUMMARY','false').lower() == 'true':
+        try:
+            with open(summary_path, 'a') as f:
+                f.write(t.summary_markdown())
+        except Exception:
+            pass
+
+atexit.register(_at_exit)
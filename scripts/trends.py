@@ -0,0 +1,315 @@
+import json, os, sqlite3, sys, time
+from datetime import date, datetime, timedelta, timezone
+
+from pr_records import UPDATE_TYPES, parse_iso, sanitize_dir_path
+
+VERSION = 1
+SEVERITIES = ('critical','high','medium','low','unknown')
+COMPARE_DAYS = (0, 7, 30, 90)   # backlog de hoy frente al de hace N días
+FLOW_DAYS = 30                  # eventos (abiertos, fusionados, cerrados) de la ventana
+WEEKS = 12                      # barras de backlog semanal
+MERGE_MONTHS = 12               # meses del histograma de tiempo hasta merge
+STALE_DAYS = 30                 # un major abierto más tiempo que esto cuenta como estancado
+STALE_TOP = 10
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (repo TEXT, day TEXT, run_id TEXT, at TEXT, prs INTEGER, alerts INTEGER,
+    PRIMARY KEY (repo, day)) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS prs (repo TEXT, number INTEGER, ecosystem TEXT, directory TEXT, update_type TEXT, name TEXT,
+    state TEXT, created_day TEXT, closed_day TEXT, hours INTEGER, first_seen TEXT, last_seen TEXT,
+    PRIMARY KEY (repo, number)) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS prs_state ON prs (repo, state, update_type, directory, created_day);
+CREATE TABLE IF NOT EXISTS alerts (repo TEXT, number INTEGER, ecosystem TEXT, directory TEXT, severity TEXT, name TEXT,
+    state TEXT, created_day TEXT, closed_day TEXT, hours INTEGER, first_seen TEXT, last_seen TEXT,
+    PRIMARY KEY (repo, number)) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS alerts_state ON alerts (repo, state, last_seen);
+CREATE TABLE IF NOT EXISTS pr_daily (repo TEXT, day TEXT, ecosystem TEXT, directory TEXT, update_type TEXT,
+    open INTEGER DEFAULT 0, opened INTEGER DEFAULT 0, merged INTEGER DEFAULT 0, closed INTEGER DEFAULT 0,
+    PRIMARY KEY (repo, day, ecosystem, directory, update_type)) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS alert_daily (repo TEXT, day TEXT, ecosystem TEXT, directory TEXT, severity TEXT,
+    open INTEGER DEFAULT 0, opened INTEGER DEFAULT 0, fixed INTEGER DEFAULT 0, dismissed INTEGER DEFAULT 0,
+    PRIMARY KEY (repo, day, ecosystem, directory, severity)) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS merge_time (repo TEXT, month TEXT, ecosystem TEXT, update_type TEXT, hours INTEGER, n INTEGER,
+    PRIMARY KEY (repo, month, ecosystem, update_type, hours)) WITHOUT ROWID;
+"""
+
+# (tabla de items, tabla diaria, dimensión, columnas de eventos, estado -> columna del evento que lo cierra)
+PRS = ('prs', 'pr_daily', 'update_type', ('opened', 'merged', 'closed'), {'merged': 1, 'closed': 2})
+ALERTS = ('alerts', 'alert_daily', 'severity', ('opened', 'fixed', 'dismissed'), {'fixed': 1, 'dismissed': 2, 'auto_dismissed': 2})
+
+
+def _day(iso):
+    return iso[:10] if isinstance(iso, str) and len(iso) >= 10 and iso[4:5] == '-' else ''
+
+def _hours(start, end):
+    # Horas enteras hasta el merge/fix; a partir de 48 h se agrupan por día (el histograma no crece con cada PR)
+    start = parse_iso(start) if isinstance(start, str) else start
+    end = parse_iso(end) if isinstance(end, str) else end
+    if not start or not end:
+        return None
+    h = max(0, int((end - start).total_seconds() // 3600))
+    return h if h < 48 else h // 24 * 24
+
+def fmt_hours(h):
+    return '—' if h is None else (f"{h} h" if h < 48 else f"{h / 24:.0f} d")
+
+def pr_item(rec, day):
+    state = rec.state if rec.state in ('open', 'merged', 'closed') else 'open'
+    closed = rec.merged_at if state == 'merged' else rec.closed_at
+    return (rec.number, rec.ecosystem, rec.directory, rec.update_type, rec.name, state, _day(rec.created_at),
+            (_day(closed) or day) if state != 'open' else '', (rec.created, rec.merged_at) if state == 'merged' else None)
+
+def alert_item(a, day):
+    # Alerta REST de repos/{repo}/dependabot/alerts -> (número, ecosistema, directorio, severidad, paquete, estado,
+    # día de apertura, día de cierre, (inicio, fin) para las horas hasta el fix)
+    dep = a.get('dependency') if isinstance(a.get('dependency'), dict) else {}
+    pkg = dep.get('package') if isinstance(dep.get('package'), dict) else {}
+    adv = a.get('security_advisory') if isinstance(a.get('security_advisory'), dict) else {}
+    eco = (pkg.get('ecosystem') or 'unknown').lower()
+    manifest = a.get('manifest_path') or dep.get('manifest_path') or ''
+    directory = sanitize_dir_path('/' + manifest.rsplit('/', 1)[0] if '/' in manifest else '/', eco)
+    sev = (adv.get('severity') or a.get('severity') or 'unknown').lower()
+    sev = 'medium' if sev == 'moderate' else (sev if sev in SEVERITIES else 'unknown')
+    state = (a.get('state') or 'open').lower()
+    closed = a.get('fixed_at') if state == 'fixed' else (a.get('dismissed_at') or a.get('auto_dismissed_at'))
+    created = a.get('created_at') or ''
+    return (a.get('number'), eco, directory, sev, pkg.get('name') or '—', state, _day(created),
+            (_day(closed) or day) if state != 'open' else '', (created, closed) if state == 'fixed' else None)
+
+
+class TrendStore:
+    # Histórico de ejecuciones en SQLite (un fichero persistible con actions/cache, como el snapshot):
+    #   prs, alerts        último estado conocido de cada PR/alerta (upsert por repo + número)
+    #   pr_daily           por día, ecosistema, directorio y tipo: open (backlog que vio el run de ese día) y los
+    #                      eventos opened/merged/closed en el día en que ocurrieron
+    #   alert_daily        lo mismo por severidad: open, opened, fixed, dismissed
+    #   merge_time         histograma de horas hasta el merge por mes, ecosistema y tipo
+    #   runs               un registro por repo y día (repetir el run el mismo día lo reemplaza)
+    # Los agregados se actualizan con las transiciones que detecta el upsert (nuevo, open -> merged...), nunca
+    # recorriendo el histórico. Las consultas de summary() van por clave primaria o índice con una ventana de fechas:
+    # su coste depende de la ventana, no de los años guardados.
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        if self.db.execute('PRAGMA user_version').fetchone()[0] not in (0, VERSION):
+            raise sqlite3.DatabaseError(f"{path}: versión de esquema desconocida")
+        self.db.executescript(SCHEMA + f"PRAGMA user_version={VERSION};")
+        self.db.execute('CREATE TEMP TABLE IF NOT EXISTS seen (number INTEGER PRIMARY KEY)')
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _apply(self, kind, repo, items, day, hist=False):
+        table, daily, dim, cols, closing = kind
+        c = self.db
+        items = [it for it in items if isinstance(it[0], int)]
+        c.execute('DELETE FROM temp.seen')
+        c.executemany('INSERT OR IGNORE INTO temp.seen VALUES (?)', ((it[0],) for it in items))
+        old = dict(c.execute(f"SELECT number, state FROM {table} WHERE repo=? AND number IN (SELECT number FROM temp.seen)", (repo,)))
+        events, merges, backlog, changed = {}, {}, {}, []
+
+        def bump(d, dims, col, n):
+            if d:
+                events.setdefault((d,) + dims, [0, 0, 0])[col] += n
+
+        def merged(d, eco, typ, hours, n):
+            if hist and hours is not None:
+                key = (d[:7], eco, typ, hours)
+                merges[key] = merges.get(key, 0) + n
+
+        for it in items:
+            number, eco, directory, typ, name, state, created_day, closed_day, span = it
+            dims = (eco, directory, typ)
+            if state == 'open':
+                backlog[dims] = backlog.get(dims, 0) + 1
+            prev = old.get(number)
+            # Con PRS_STATE=all el listado trae todo el histórico: los cerrados sin cambios no se reescriben
+            # (los abiertos sí, para actualizar last_seen) y sus horas no se recalculan
+            if prev == state and state != 'open':
+                continue
+            hours = _hours(*span) if span else None
+            changed.append(it[:8] + (hours,))
+            if prev is None:
+                bump(created_day, dims, 0, 1)
+            elif prev == state:
+                continue
+            elif prev in closing:
+                # p.ej. closed -> merged cuando se resolvió el estado por GraphQL: se deshace el evento anterior
+                p_eco, p_dir, p_typ, p_day, p_hours = c.execute(
+                    f"SELECT ecosystem, directory, {dim}, closed_day, hours FROM {table} WHERE repo=? AND number=?", (repo, number)).fetchone()
+                bump(p_day, (p_eco, p_dir, p_typ), closing[prev], -1)
+                if prev == 'merged':
+                    merged(p_day, p_eco, p_typ, p_hours, -1)
+            if state in closing:
+                bump(closed_day, dims, closing[state], 1)
+                if state == 'merged':
+                    merged(closed_day, eco, typ, hours, 1)
+
+        c.executemany(
+            f"INSERT INTO {table} VALUES (?,?,?,?,?,?,?,?,?,?,?,?) ON CONFLICT(repo, number) DO UPDATE SET "
+            f"ecosystem=excluded.ecosystem, directory=excluded.directory, {dim}=excluded.{dim}, name=excluded.name, "
+            f"state=excluded.state, created_day=excluded.created_day, closed_day=excluded.closed_day, hours=excluded.hours, "
+            f"last_seen=excluded.last_seen", ((repo,) + it + (day, day) for it in changed))
+        # Abiertos que este run ya no ve (se cerraron o fusionaron sin pasar por el listado): salen del backlog
+        c.execute(f"UPDATE {table} SET state='gone' WHERE repo=? AND state='open' AND last_seen<?", (repo, day))
+        a, b, d = cols
+        c.executemany(
+            f"INSERT INTO {daily} (repo, day, ecosystem, directory, {dim}, {a}, {b}, {d}) VALUES (?,?,?,?,?,?,?,?) "
+            f"ON CONFLICT(repo, day, ecosystem, directory, {dim}) DO UPDATE SET {a}={a}+excluded.{a}, {b}={b}+excluded.{b}, {d}={d}+excluded.{d}",
+            ((repo,) + k + tuple(v) for k, v in events.items()))
+        c.execute(f"UPDATE {daily} SET open=0 WHERE repo=? AND day=? AND open<>0", (repo, day))
+        c.executemany(
+            f"INSERT INTO {daily} (repo, day, ecosystem, directory, {dim}, open) VALUES (?,?,?,?,?,?) "
+            f"ON CONFLICT(repo, day, ecosystem, directory, {dim}) DO UPDATE SET open=excluded.open", ((repo, day) + k + (n,) for k, n in backlog.items()))
+        if merges:
+            c.executemany("INSERT INTO merge_time VALUES (?,?,?,?,?,?) "
+                          "ON CONFLICT(repo, month, ecosystem, update_type, hours) DO UPDATE SET n=n+excluded.n",
+                          ((repo,) + k + (n,) for k, n in merges.items()))
+        return len(items)
+
+    def record(self, repo, records, alerts=None, now=None, run_id=''):
+        # records: PRRecord de este run; alerts: alertas REST o None para no tocar las de la base
+        now = now or datetime.now(timezone.utc)
+        day = now.strftime('%Y-%m-%d')
+        with self.db:
+            prs = self._apply(PRS, repo, [pr_item(r, day) for r in records], day, hist=True)
+            n_alerts = None
+            if alerts is not None:
+                n_alerts = self._apply(ALERTS, repo, [alert_item(a, day) for a in alerts if isinstance(a, dict)], day)
+            self.db.execute('INSERT OR REPLACE INTO runs VALUES (?,?,?,?,?,?)',
+                            (repo, day, str(run_id or ''), now.strftime('%Y-%m-%dT%H:%M:%SZ'), prs, n_alerts))
+        return day
+
+    def _run_on_or_before(self, repo, d):
+        return self.db.execute('SELECT MAX(day) FROM runs WHERE repo=? AND day<=?', (repo, d)).fetchone()[0]
+
+    def summary(self, repo, today=''):
+        # Datos de la sección de tendencias a fecha del último run (hasta `today`, YYYY-MM-DD, si se da); None si el
+        # repo no tiene ejecuciones guardadas
+        t0 = time.perf_counter()
+        c = self.db
+        last = self._run_on_or_before(repo, today or '9999-12-31')
+        if not last:
+            return None
+        ref = date.fromisoformat(last)
+        ago = lambda n: (ref - timedelta(days=n)).isoformat()
+        runs, first = c.execute('SELECT COUNT(*), MIN(day) FROM runs WHERE repo=?', (repo,)).fetchone()
+
+        compare_days = [self._run_on_or_before(repo, ago(n)) if n else last for n in COMPARE_DAYS]
+        backlog = {k: [None] * len(COMPARE_DAYS) for k in UPDATE_TYPES}
+        alerts_open = {k: [None] * len(COMPARE_DAYS) for k in SEVERITIES}
+        for i, d in enumerate(compare_days):
+            if not d:
+                continue
+            for k in UPDATE_TYPES:
+                backlog[k][i] = 0
+            for typ, n in c.execute('SELECT update_type, SUM(open) FROM pr_daily WHERE repo=? AND day=? GROUP BY update_type', (repo, d)):
+                backlog[typ][i] = n
+            for k in SEVERITIES:
+                alerts_open[k][i] = 0
+            for sev, n in c.execute('SELECT severity, SUM(open) FROM alert_daily WHERE repo=? AND day=? GROUP BY severity', (repo, d)):
+                alerts_open[sev][i] = n
+
+        # Backlog semanal: el del último run de cada semana ISO
+        weekly = {}
+        for d, n in c.execute('SELECT day, SUM(open) FROM pr_daily WHERE repo=? AND day IN '
+                              '(SELECT day FROM runs WHERE repo=? AND day>?) GROUP BY day ORDER BY day',
+                              (repo, repo, ago(WEEKS * 7))):
+            weekly[date.fromisoformat(d).isocalendar()[:2]] = (d, n)
+
+        flow = {k: {'opened': 0, 'merged': 0, 'closed': 0} for k in UPDATE_TYPES}
+        for typ, o, m, cl in c.execute('SELECT update_type, SUM(opened), SUM(merged), SUM(closed) FROM pr_daily '
+                                       'WHERE repo=? AND day>? AND day<=? GROUP BY update_type', (repo, ago(FLOW_DAYS), last)):
+            flow[typ] = {'opened': o, 'merged': m, 'closed': cl}
+
+        # Mediana del tiempo hasta merge por ecosistema y tipo desde el histograma (sin leer los PRs)
+        hist = {}
+        for eco, typ, h, n in c.execute('SELECT ecosystem, update_type, hours, SUM(n) FROM merge_time WHERE repo=? AND month>? '
+                                        'GROUP BY ecosystem, update_type, hours ORDER BY hours', (repo, ago(MERGE_MONTHS * 31)[:7])):
+            if n > 0:
+                hist.setdefault((eco, typ), []).append((h, n))
+        merge_time = {}
+        for (eco, typ), buckets in hist.items():
+            total, acc = sum(n for _, n in buckets), 0
+            for h, n in buckets:
+                acc += n
+                if acc * 2 >= total:
+                    merge_time.setdefault(eco, {})[typ] = (h, total)
+                    break
+
+        before = dict(c.execute("SELECT directory, SUM(open) FROM pr_daily WHERE repo=? AND day=? AND update_type='major' "
+                                "GROUP BY directory", (repo, compare_days[2]))) if compare_days[2] else {}
+        stale = [(d, n, before.get(d), oldest) for d, n, oldest in c.execute(
+            "SELECT directory, COUNT(*), MIN(created_day) FROM prs WHERE repo=? AND state='open' AND update_type='major' "
+            "AND created_day<=? GROUP BY directory ORDER BY 2 DESC, 1 LIMIT ?", (repo, ago(STALE_DAYS), STALE_TOP))]
+
+        return {'repo': repo, 'day': last, 'runs': runs, 'since': first, 'compare_days': compare_days,
+                'backlog': backlog, 'alerts_open': alerts_open, 'weekly': sorted(weekly.values()), 'flow': flow,
+                'merge_time': merge_time, 'stale': stale, 'ms': round((time.perf_counter() - t0) * 1000, 1)}
+
+
+def load_summary(path, repo):
+    # Solo lectura para los generadores: sin base (o ilegible) no hay sección de tendencias
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        with TrendStore(path) as store:
+            return store.summary(repo)
+    except sqlite3.Error:
+        return None
+
+def sections(s):
+    # Tablas de la sección de tendencias (título, cabecera, filas), comunes al HTML y al PDF
+    cell = lambda v: '—' if v is None else v
+    heads = ['Hoy' if not n else f"Hace {n} d" for n in COMPARE_DAYS]
+    totals = [None if d is None else sum(s['backlog'][k][i] for k in UPDATE_TYPES) for i, d in enumerate(s['compare_days'])]
+    out = [('Backlog de PRs abiertos', ['Tipo'] + heads,
+            [[k] + [cell(v) for v in s['backlog'][k]] for k in UPDATE_TYPES] + [['total'] + [cell(v) for v in totals]])]
+    out.append((f"Flujo de los últimos {FLOW_DAYS} días", ['Tipo', 'Abiertos', 'Fusionados', 'Cerrados sin merge'],
+                [[k, v['opened'], v['merged'], v['closed']] for k, v in s['flow'].items()]))
+    if s['merge_time']:
+        out.append((f"Mediana hasta merge ({MERGE_MONTHS} meses)", ['Ecosistema'] + list(UPDATE_TYPES),
+                    [[eco] + [f"{fmt_hours(v[k][0])} ({v[k][1]})" if k in v else '—' for k in UPDATE_TYPES]
+                     for eco, v in sorted(s['merge_time'].items())]))
+    if s['stale']:
+        out.append((f"Directorios con majors abiertos hace más de {STALE_DAYS} días", ['Directorio', 'Majors estancados', 'Majors abiertos hace 30 d', 'Más antiguo'],
+                    [[d, n, cell(b), oldest] for d, n, b, oldest in s['stale']]))
+    if any(v[0] for v in s['alerts_open'].values()):
+        out.append(('Alertas abiertas', ['Severidad'] + heads,
+                    [[k] + [cell(v) for v in vals] for k, vals in s['alerts_open'].items() if k != 'unknown' or any(vals)]))
+    return out
+
+def caption(s):
+    return f"{s['runs']} ejecuciones guardadas desde {s['since']} · último run {s['day']} · consultas en {s['ms']} ms"
+
+def main(argv=None):
+    # dependabot-report trends [ruta] [owner/repo]: la sección de tendencias en texto (o JSON con --json)
+    argv = list(sys.argv[1:] if argv is None else argv)
+    as_json = '--json' in argv
+    argv = [a for a in argv if a != '--json']
+    path = argv[0] if argv else os.getenv('TRENDS_DB','').strip()
+    repo = argv[1] if len(argv) > 1 else os.getenv('GITHUB_REPOSITORY','')
+    s = load_summary(path, repo)
+    if s is None:
+        print(f"Sin histórico para {repo or '—'} en {path or '(TRENDS_DB vacío)'}", file=sys.stderr)
+        return 1
+    if as_json:
+        print(json.dumps(s, ensure_ascii=False, indent=1))
+        return 0
+    print(caption(s))
+    for title, head, rows in sections(s):
+        print(f"\n{title}\n  " + ' | '.join(head))
+        for r in rows:
+            print('  ' + ' | '.join(str(v) for v in r))
+    return 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
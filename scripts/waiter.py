@@ -0,0 +1,87 @@
+import random, time
+from typing import NamedTuple
+
+from gh_api import get_client
+
+
+class WaitResult(NamedTuple):
+    value: object
+    reason: str
+    polls: int
+    api_calls: int
+    elapsed: float
+
+    def summary(self):
+        return f"espera: {self.elapsed:.0f}s, {self.polls} sondeos, {self.api_calls} llamadas API, motivo: {self.reason}"
+
+
+class AdaptiveWaiter:
+    # Sondeo con backoff exponencial + jitter: empieza con intervalos cortos, vuelve al mínimo cuando
+    # el resultado cambia y termina antes del deadline si el resultado se mantiene estable `quiet` segundos.
+    # Si el presupuesto de rate limit baja de `low_budget`, reparte las llamadas restantes hasta el reset.
+    def __init__(self, timeout, min_interval=5, max_interval=30, quiet=90, factor=2.0, jitter=0.2,
+                 low_budget=100, client=None, sleep=time.sleep, clock=time.monotonic, wall=time.time, rand=random.random):
+        self.timeout = max(0, timeout)
+        self.min_interval = max(0.1, min(min_interval, max_interval))
+        self.max_interval = max(max_interval, self.min_interval)
+        self.quiet = quiet
+        self.factor = factor
+        self.jitter = jitter
+        self.low_budget = low_budget
+        self.client = client
+        self.sleep = sleep
+        self.clock = clock
+        self.wall = wall
+        self.rand = rand
+
+    def rate_delay(self, client):
+        rate = getattr(client, 'rate', None) or {}
+        remaining = rate.get('remaining')
+        if remaining is None or remaining >= self.low_budget:
+            return 0
+        until_reset = max(0, rate.get('reset', 0) - self.wall())
+        return until_reset / max(remaining, 1)
+
+    def next_interval(self, interval):
+        spread = interval * self.jitter
+        return max(0.1, interval + (self.rand() * 2 - 1) * spread)
+
+    def wait(self, poll, key=lambda v: v, done=lambda v: False, stable=lambda v: True, initial=None):
+        # poll() -> valor; key(valor) identifica el estado para detectar cambios.
+        # done(valor) termina de inmediato; stable(valor) indica si la calma cuenta (p.ej. ya hay PRs).
+        # initial evita repetir el primer sondeo si el llamador ya tiene un resultado.
+        client = self.client or get_client()
+        start = self.clock()
+        calls0 = client.requests
+        deadline = start + self.timeout
+        interval = self.min_interval
+        value = poll() if initial is None else initial
+        polls = 1 if initial is None else 0
+        last_key = key(value)
+        changed_at = self.clock()
+        reason = 'timeout'
+        while True:
+            now = self.clock()
+            if done(value):
+                reason = 'listo'
+                break
+            if stable(value) and now - changed_at >= self.quiet:
+                reason = 'estable'
+                break
+            if now >= deadline:
+                break
+            delay = max(self.next_interval(interval), self.rate_delay(client))
+            delay = min(delay, deadline - now)
+            if stable(value):
+                delay = min(delay, max(0.1, changed_at + self.quiet - now))
+            self.sleep(delay)
+            value = poll()
+            polls += 1
+            k = key(value)
+            if k != last_key:
+                last_key = k
+                changed_at = self.clock()
+                interval = self.min_interval
+            else:
+                interval = min(self.max_interval, interval * self.factor)
+        return WaitResult(value, reason, polls, client.requests - calls0, self.clock() - start)
@@ -0,0 +1,69 @@
+import json, os, subprocess, sys
+
+import pytest
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+SCRIPTS = os.path.join(ROOT, 'scripts')
+sys.path.insert(0, SCRIPTS)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+import api_budget, gh_api, tracing
+from fake_github import FakeGitHub, start_server
+
+# Fixtures compartidas: benchmarks/fake_github en un puerto libre y los scripts en su propio proceso, como en el
+# workflow (los clientes, la caché y el presupuesto de API son globales de cada proceso)
+
+@pytest.fixture(scope='session', autouse=True)
+def tracer(tmp_path_factory):
+    # Las trazas y el log de los tests en proceso van a un directorio temporal, no a docs/ del repositorio
+    tmp = tmp_path_factory.mktemp('trace')
+    tracing.set_tracer(tracing.Tracer(str(tmp / 'trace.json'), str(tmp / 'output.txt')))
+
+@pytest.fixture
+def github(tmp_path):
+    # github(prs, alerts, **opciones de FakeGitHub) -> (state, env) con las variables del workflow apuntando a tmp_path
+    servers = []
+    def start(prs=(), alerts=(), **kw):
+        state = FakeGitHub(list(prs), alerts=list(alerts), **kw)
+        server, url = start_server(state)
+        servers.append(server)
+        docs = tmp_path / 'docs'
+        docs.mkdir(exist_ok=True)
+        env = dict(os.environ, GITHUB_API_URL=url, GH_TOKEN='x', GITHUB_REPOSITORY=state.repo, REPO=state.repo, RUN_ID='1',
+                   DATASET_PATH=str(docs / 'dependabot-dataset.bin'), ALERTS_FILE=str(docs / 'alerts.ndjson'),
+                   GITHUB_OUTPUT=str(tmp_path / 'out'), GITHUB_STEP_SUMMARY=str(tmp_path / 'summary.md'),
+                   API_BUDGET='0', API_BUDGET_FILE=str(docs / 'api-calls.json'), HTTP_CACHE_DIR='', SNAPSHOT_PATH='',
+                   TRENDS_DB='', TRIGGER_DEPENDABOT_NOW='false', PRS_DATA='', ISSUE_TITLE_TPL='Reporte ${date}')
+        return state, env
+    yield start
+    for server in servers:
+        server.shutdown()
+
+@pytest.fixture
+def api(monkeypatch):
+    # api(prs, alerts, **opciones) -> state, con el cliente global de gh_api (gh_get, fetch_pages, gh_graphql...) y un
+    # presupuesto de API sin límite propios del test, para llamar a las funciones de los scripts en proceso
+    servers = []
+    def start(prs=(), alerts=(), **kw):
+        state = FakeGitHub(list(prs), alerts=list(alerts), **kw)
+        server, url = start_server(state)
+        servers.append(server)
+        monkeypatch.setattr(api_budget, '_budget', api_budget.ApiBudget())
+        monkeypatch.setattr(gh_api, '_client', gh_api.GitHubClient(url, token='x', cache=False, budget=api_budget._budget))
+        return state
+    yield start
+    for server in servers:
+        server.shutdown()
+
+@pytest.fixture
+def run(tmp_path):
+    # run(script, env, **variables extra) -> salida del proceso; falla el test si el script termina con error
+    def run_script(script, env, **extra):
+        r = subprocess.run([sys.executable, os.path.join(SCRIPTS, script)], env=dict(env, **extra), cwd=str(tmp_path),
+                           capture_output=True, text=True)
+        assert r.returncode == 0, r.stdout[-2000:] + r.stderr[-2000:]
+        return r.stdout
+    return run_script
+
+def read_json(path):
+    with open(path) as f:
+        return json.load(f)
@@ -0,0 +1,43 @@
+import pytest
+
+from conftest import read_json
+from synthetic import make_prs
+
+# Llamadas exactas por endpoint con un conjunto sintético fijo (250 PRs, 100 por página): lo que cuenta api_budget en
+# el cliente tiene que coincidir con lo que vio el servidor, y con API_BUDGET los scripts toman el camino degradado
+DETECT = {'GET pulls': 3, 'POST graphql': 1}
+
+def test_exact_counts(github, run):
+    state, env = github(make_prs(250))
+    run('detect_prs.py', env, PRS_STATE='all')
+    assert state.calls == DETECT
+    state.calls.clear()
+    run('create_issue.py', env)
+    assert state.calls == {'GET issues': 1, 'GET pulls/:n': 250, 'POST issues': 1}
+    budget = read_json(env['API_BUDGET_FILE'])
+    assert budget['scripts'] == {'detect_prs': DETECT, 'create_issue': state.calls}
+    assert budget['total'] == 256 and budget['degraded'] == {}
+
+@pytest.mark.parametrize('limit, bodies, degraded', [
+    (8, {'POST graphql': 3}, ['cuerpos de 250 PRs por REST (se usa GraphQL)']),
+    (5, {}, ['cuerpos de 250 PRs por REST (se usa GraphQL)', 'cuerpos de 250 PRs (el Issue va sin fragmentos)']),
+])
+def test_issue_degraded(github, run, limit, bodies, degraded):
+    # detect_prs gasta 4 y buscar el Issue 1: con 8 los cuerpos van por GraphQL (3 lotes), con 5 el Issue va sin ellos.
+    # Crear el Issue es imprescindible y no pregunta
+    state, env = github(make_prs(250))
+    env = dict(env, API_BUDGET=str(limit))
+    run('detect_prs.py', env, PRS_STATE='all')
+    state.calls.clear()
+    run('create_issue.py', env)
+    assert state.calls == dict({'GET issues': 1, 'POST issues': 1}, **bodies)
+    notes = read_json(env['API_BUDGET_FILE'])['degraded']['create_issue']
+    assert len(notes) == len(degraded) and all(n.startswith(what + ' (') for n, what in zip(notes, degraded))
+
+def test_detect_degraded(github, run):
+    # Sin PRs en el listado, las búsquedas de respaldo son opcionales: con API_BUDGET=1 no se hacen
+    state, env = github()
+    out = run('detect_prs.py', dict(env, API_BUDGET='1'), PRS_STATE='all')
+    assert state.calls == {'GET pulls': 1}
+    assert list(read_json(env['API_BUDGET_FILE'])['degraded']) == ['detect_prs']
+    assert 'Presupuesto de API agotado' in out
@@ -0,0 +1,62 @@
+import os
+
+import pytest
+
+from collect_alerts import collect_alerts, iter_alerts
+from gh_api import ApiError
+from snapshot_store import SnapshotStore
+from synthetic import make_alerts
+
+# collect_alerts contra benchmarks/fake_github: qué alertas llegan al NDJSON
+REPO = 'acme/monorepo'
+
+def by_number(path):
+    return {a['number']: a for a in iter_alerts(path)}
+
+def test_incremental_keeps_unchanged(api, tmp_path):
+    # Con snapshot, el segundo run pide una sola página ordenada por updated y el fichero conserva las alertas que no
+    # cambiaron; la que pasa a fixed sale (solo se piden las abiertas) y la editada llega actualizada
+    alerts = make_alerts(600)
+    state = api(alerts=alerts)
+    path, snapshot_path = str(tmp_path / 'alerts.ndjson'), str(tmp_path / 'snapshot.json.gz')
+    snapshot = SnapshotStore(snapshot_path)
+    collect_alerts(REPO, path, ['open'], snapshot)
+    snapshot.save()
+    first = by_number(path)
+    assert set(first) == {a['number'] for a in alerts if a['state'] == 'open'}
+    fixed, edited = sorted(first)[:2]
+    state.touch('alert', fixed, state='fixed', fixed_at='2026-01-02T00:00:00Z')
+    state.touch('alert', edited, severity='critical')
+    state.calls.clear()
+    count = collect_alerts(REPO, path, ['open'], SnapshotStore(snapshot_path))
+    assert state.calls == {'GET dependabot/alerts': 1}
+    second = by_number(path)
+    assert count == len(second) and set(second) == set(first) - {fixed}
+    assert second[edited]['severity'] == 'critical'
+    assert all(second[n] == first[n] for n in second if n != edited)
+
+def test_all_states_streamed(api, tmp_path):
+    # Cuatro estados en paralelo con cursores de 30 alertas: cada alerta aparece una sola vez en el fichero
+    alerts = make_alerts(700)
+    state = api(alerts=alerts, max_per_page=30)
+    path = str(tmp_path / 'alerts.ndjson')
+    states = ['open', 'fixed', 'dismissed', 'auto_dismissed']
+    count = collect_alerts(REPO, path, states)
+    numbers = [a['number'] for a in iter_alerts(path)]
+    assert count == len(numbers) == len(set(numbers)) == 700
+    pages = sum((sum(a['state'] == s for a in alerts) + 29) // 30 or 1 for s in states)
+    assert state.calls == {'GET dependabot/alerts': pages}
+
+def test_failure_keeps_previous_file(api, tmp_path, monkeypatch):
+    # Un fallo a mitad de la paginación no deja un NDJSON a medias: se conserva el del run anterior
+    api(alerts=make_alerts(100))
+    path = tmp_path / 'alerts.ndjson'
+    path.write_text('{"number": 1}\n')
+    def failing(path_, params=None, on_items=None, **kw):
+        on_items([{'number': 2}])
+        raise ApiError('GET', path_, 502, '')
+    monkeypatch.setattr('collect_alerts.fetch_pages', failing)
+    with pytest.raises(ApiError):
+        collect_alerts(REPO, str(path), ['open'])
+    assert path.read_text() == '{"number": 1}\n'
+    assert not os.path.exists(str(path) + '.tmp')
@@ -0,0 +1,35 @@
+import create_issue
+from gh_api import ApiError
+from synthetic import make_prs
+
+# fetch_bodies contra benchmarks/fake_github: cuerpos en el orden pedido por REST concurrente o GraphQL por lotes
+
+def expected(prs, numbers):
+    by_number = {pr['number']: f"Bumps {pr['title']}.\n\nRelease notes..." for pr in prs}
+    return [by_number.get(n, '') for n in numbers]
+
+def test_rest_order(api):
+    # Las respuestas llegan en cualquier orden con 8 hilos; el resultado sigue el de numbers. Un PR que no existe
+    # (404) queda vacío sin afectar al resto
+    prs = make_prs(150)
+    state = api(prs)
+    numbers = [pr['number'] for pr in reversed(prs)] + [9999]
+    assert create_issue.fetch_bodies(numbers, 'acme/monorepo', 'rest', workers=8) == expected(prs, numbers)
+    assert state.calls == {'GET pulls/:n': 151}
+
+def test_graphql_batches(api):
+    prs = make_prs(250)
+    state = api(prs)
+    numbers = [pr['number'] for pr in prs[::-1]]
+    assert create_issue.fetch_bodies(numbers, 'acme/monorepo', 'graphql') == expected(prs, numbers)
+    assert state.calls == {'POST graphql': 3}
+
+def test_graphql_falls_back_to_rest(api, monkeypatch):
+    prs = make_prs(20)
+    state = api(prs)
+    def broken(*args, **kw):
+        raise ApiError('POST', 'graphql', 502, '')
+    monkeypatch.setattr(create_issue, 'gh_graphql', broken)
+    numbers = [pr['number'] for pr in prs]
+    assert create_issue.fetch_bodies(numbers, 'acme/monorepo', 'graphql') == expected(prs, numbers)
+    assert state.calls == {'GET pulls/:n': 20}
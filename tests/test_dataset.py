@@ -0,0 +1,75 @@
+import gzip, os, sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+from dataset import BLOCK_RECORDS, TRAILER, Dataset, DatasetError, DatasetWriter, file_digest, load_records
+
+def write(path):
+    with DatasetWriter(str(path), {'repo': 'acme/monorepo'}) as ds:
+        ds.add('prs', [{'number': i} for i in range(10)])
+
+def open_fds():
+    return len(os.listdir('/proc/self/fd')) if os.path.isdir('/proc/self/fd') else None
+
+def test_roundtrip(tmp_path):
+    write(tmp_path / 'ds.bin')
+    with Dataset(str(tmp_path / 'ds.bin')) as ds:
+        assert ds.count('prs') == 10 and ds.meta == {'repo': 'acme/monorepo'}
+
+def test_roundtrip_blocks(tmp_path):
+    # Varios bloques por sección y las dos secciones intercaladas: ningún registro se pierde ni cambia de orden
+    n_prs, n_alerts = 2 * BLOCK_RECORDS + 201, 2 * BLOCK_RECORDS + 50
+    path = str(tmp_path / 'ds.bin')
+    with DatasetWriter(path) as ds:
+        for start in range(0, n_prs, 300):
+            ds.add('prs', ({'number': i} for i in range(start, min(start + 300, n_prs))))
+            ds.add('alerts', ({'number': i} for i in range(start, min(start + 300, n_alerts))))
+    with Dataset(path) as ds:
+        assert (ds.count('prs'), ds.count('alerts')) == (n_prs, n_alerts)
+        assert len(ds.sections['prs']['blocks']) == 3
+        assert [r['number'] for r in ds.iter('prs')] == list(range(n_prs))
+        assert [r['number'] for r in ds.iter('alerts')] == list(range(n_alerts))
+
+@pytest.mark.parametrize('index', [b'no es gzip', gzip.compress(b'{"version"'), gzip.compress(b'[]')],
+                         ids=['no-gzip', 'json-cortado', 'no-objeto'])
+def test_corrupt_index(tmp_path, index):
+    # Índice ilegible (no gzip, JSON cortado o algo que no es un objeto): DatasetError y el fichero queda cerrado
+    path = tmp_path / 'ds.bin'
+    write(path)
+    data = path.read_bytes()
+    offset, _, mark = TRAILER.unpack(data[-TRAILER.size:])
+    path.write_bytes(data[:offset] + index + TRAILER.pack(offset, len(index), mark))
+    before = open_fds()
+    with pytest.raises(DatasetError, match='índice de dataset corrupto'):
+        Dataset(str(path))
+    assert open_fds() == before
+
+def test_abort_new(tmp_path):
+    # Un fallo dentro del with no deja un dataset truncado con apariencia de válido
+    path = tmp_path / 'ds.bin'
+    with pytest.raises(RuntimeError):
+        with DatasetWriter(str(path)) as ds:
+            ds.add('prs', [{'number': 1}])
+            raise RuntimeError('fallo')
+    assert not path.exists()
+
+def test_abort_append(tmp_path):
+    # En modo append se conserva el dataset anterior tal cual
+    path = tmp_path / 'ds.bin'
+    write(path)
+    with pytest.raises(RuntimeError):
+        with DatasetWriter(str(path), append=True) as ds:
+            ds.reset('prs').add('alerts', [{'number': i} for i in range(BLOCK_RECORDS + 1)])
+            raise RuntimeError('fallo')
+    with Dataset(str(path)) as ds:
+        assert set(ds.sections) == {'prs'} and [r['number'] for r in ds.iter('prs')] == list(range(10))
+
+def test_digest_mismatch(tmp_path, monkeypatch):
+    path = tmp_path / 'ds.bin'
+    write(path)
+    monkeypatch.setenv('DATASET_SHA256', file_digest(str(path)))
+    assert [r['number'] for r in load_records('prs', path=str(path))] == list(range(10))
+    monkeypatch.setenv('DATASET_SHA256', '0' * 64)
+    with pytest.raises(DatasetError, match='DATASET_SHA256'):
+        load_records('prs', path=str(path))
@@ -0,0 +1,43 @@
+from dataset import load_records
+from synthetic import make_prs
+
+# detect_prs contra benchmarks/fake_github: qué PRs llegan al dataset
+
+def dataset_prs(env):
+    return {pr['number']: pr for pr in load_records('prs', path=env['DATASET_PATH'])}
+
+def test_all_pages(github, run):
+    # 2500 PRs con el servidor limitado a 30 por página: se recorren las 84 páginas (en paralelo, con rel="last")
+    # en lugar de quedarse en la primera
+    state, env = github(make_prs(2500), max_per_page=30)
+    out = run('detect_prs.py', env, PRS_STATE='all', PAGE_WORKERS='4')
+    assert state.calls['GET pulls'] == 84
+    assert set(dataset_prs(env)) == set(range(1, 2501))
+    assert 'PRs detectados: 2500' in out
+
+def test_state_filter(github, run):
+    prs = make_prs(300)
+    state, env = github(prs)
+    run('detect_prs.py', env, PRS_STATE='open')
+    assert set(dataset_prs(env)) == {pr['number'] for pr in prs if pr['state'] == 'open'}
+
+def test_incremental_keeps_unchanged(github, run, tmp_path):
+    # Segundo run con SNAPSHOT_PATH: una sola página (sort=updated, se corta al pasar el watermark) y el dataset sigue
+    # teniendo los PRs que no cambiaron; el cerrado sale, el nuevo entra y el editado llega con su título nuevo
+    prs = make_prs(500)
+    state, env = github(prs)
+    env = dict(env, PRS_STATE='open', SNAPSHOT_PATH=str(tmp_path / 'snapshot.json.gz'))
+    run('detect_prs.py', env)
+    first = dataset_prs(env)
+    assert set(first) == {pr['number'] for pr in prs if pr['state'] == 'open'}
+    closed, edited = sorted(first)[:2]
+    state.touch('pr', closed, state='closed')
+    state.touch('pr', edited, title='Bump lodash from 4.17.20 to 4.17.21')
+    state.touch('pr', 501, state='open')
+    state.calls.clear()
+    run('detect_prs.py', env)
+    assert state.calls['GET pulls'] == 1
+    second = dataset_prs(env)
+    assert set(second) == set(first) - {closed} | {501}
+    assert second[edited]['title'] == 'Bump lodash from 4.17.20 to 4.17.21'
+    assert all(second[n] == first[n] for n in first if n not in (closed, edited))
@@ -0,0 +1,57 @@
+import http.client, json, os, sys, threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+from api_budget import ApiBudget
+from gh_api import GitHubClient
+
+class DropOnce(BaseHTTPRequestHandler):
+    # Lee la petición entera (el servidor la "acepta") y cierra la conexión sin responder la primera vez de cada método
+    protocol_version = 'HTTP/1.1'
+    seen = {}
+
+    def log_message(self, *args):
+        pass
+
+    def handle_one(self, method):
+        self.rfile.read(int(self.headers.get('Content-Length', '0') or 0))
+        self.seen[method] = self.seen.get(method, 0) + 1
+        if self.seen[method] == 1:
+            self.close_connection = True
+            return
+        body = json.dumps({'ok': True, 'data': {}}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self.handle_one('GET')
+
+    def do_POST(self):
+        self.handle_one('POST')
+
+@pytest.fixture
+def client():
+    DropOnce.seen = {}
+    server = ThreadingHTTPServer(('127.0.0.1', 0), DropOnce)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield GitHubClient(f"http://127.0.0.1:{server.server_address[1]}", token='x', cache=False, budget=ApiBudget())
+    server.shutdown()
+
+def test_get_retried(client):
+    assert client.get('repos/acme/monorepo/pulls').json() == {'ok': True, 'data': {}}
+    assert DropOnce.seen == {'GET': 2}
+
+def test_post_not_retried(client):
+    # Crear el Issue: si la conexión cae después de enviarlo, repetir podría abrir un duplicado
+    with pytest.raises((http.client.HTTPException, OSError)):
+        client.post('repos/acme/monorepo/issues', {'title': 'Reporte'})
+    assert DropOnce.seen == {'POST': 1}
+
+def test_graphql_retried(client):
+    assert client.graphql('query { viewer { login } }') == {}
+    assert DropOnce.seen == {'POST': 2}
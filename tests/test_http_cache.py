@@ -0,0 +1,82 @@
+import os
+
+import pytest
+
+import http_cache
+from api_budget import ApiBudget
+from fake_github import FakeGitHub, start_server
+from gh_api import GitHubClient
+from http_cache import HttpCache
+from synthetic import make_prs
+
+# Caché HTTP (ETag → If-None-Match → 304) del cliente contra benchmarks/fake_github, que responde 304 sin cuerpo ni Link
+PULLS = 'repos/acme/monorepo/pulls'
+
+@pytest.fixture
+def server():
+    state = FakeGitHub(make_prs(250))
+    server, url = start_server(state)
+    yield state, url
+    server.shutdown()
+
+def client(url, cache):
+    return GitHubClient(url, token='x', cache=cache, budget=ApiBudget())
+
+def test_not_modified(server, tmp_path):
+    state, url = server
+    cache = HttpCache(str(tmp_path / 'cache'))
+    first = client(url, cache).get(PULLS, {'per_page': 100})
+    again = client(url, cache).get(PULLS, {'per_page': 100})
+    assert again.status == 200 and again.body == first.body
+    assert cache.stats == {'hits': 1, 'misses': 1, 'stored': 1, 'evicted': 0}
+    assert state.calls == {'GET pulls': 2}
+
+def test_entry_lost(server, tmp_path):
+    # El índice promete el cuerpo pero el fichero ya no está: tras el 304 se vuelve a pedir sin If-None-Match
+    state, url = server
+    cache = HttpCache(str(tmp_path / 'cache'))
+    first = client(url, cache).get(PULLS, {'per_page': 100})
+    os.remove(cache._path(HttpCache.key('GET', PULLS, {'per_page': 100})))
+    again = client(url, cache).get(PULLS, {'per_page': 100})
+    assert again.status == 200 and again.body == first.body
+    assert state.calls == {'GET pulls': 3}
+    assert cache.stats['hits'] == 0
+
+@pytest.mark.parametrize('serial', [False, True])
+def test_link_replayed(server, tmp_path, serial):
+    # Paginación en paralelo (rel="last" de la página 1) y en serie (rel="next"): los 304 no traen Link y el cliente
+    # usa el guardado, así una segunda ejecución recorre las mismas 3 páginas
+    state, url = server
+    cache = HttpCache(str(tmp_path / 'cache'))
+    runs = []
+    for _ in range(2):
+        items = []
+        pages = client(url, cache).paginate(PULLS, {'state': 'all'}, on_items=items.extend,
+                                            stop=(lambda page: False) if serial else None)
+        runs.append((pages, sorted(pr['number'] for pr in items)))
+    assert runs[0] == runs[1] == (3, list(range(1, 251)))
+    assert cache.stats['hits'] == 3
+
+def test_lru_eviction(server, tmp_path):
+    # Al guardar el índice por encima de max_bytes se desaloja primero la entrada usada hace más tiempo
+    state, url = server
+    root = str(tmp_path / 'cache')
+    cache = HttpCache(root)
+    c = client(url, cache)
+    keys = []
+    for page in (1, 2, 3):
+        c.get(PULLS, {'page': page})
+        keys.append(HttpCache.key('GET', PULLS, {'page': page}))
+    c.get(PULLS, {'page': 1})
+    cache.max_bytes = sum(m['size'] for m in cache.index.values()) - 1
+    cache.save()
+    assert cache.stats['evicted'] == 1
+    assert not os.path.exists(cache._path(keys[1]))
+    assert set(HttpCache(root).index) == {keys[0], keys[2]}
+
+def test_max_mb(tmp_path, monkeypatch):
+    monkeypatch.setattr(http_cache, '_cache', None)
+    monkeypatch.setattr(http_cache.atexit, 'register', lambda *a: None)
+    monkeypatch.setenv('HTTP_CACHE_DIR', str(tmp_path))
+    monkeypatch.setenv('HTTP_CACHE_MAX_MB', '0.5')
+    assert http_cache.get_cache().max_bytes == 512 * 1024
@@ -0,0 +1,74 @@
+import io, json, os, random, re, sys, zlib
+from datetime import datetime, timezone
+
+import pytest
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(ROOT, 'scripts'))
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+from generate_pdf import build_pdf
+from synthetic import make_alert, make_prs
+
+# Reporte pequeño con el backend builtin (minipdf) validado sin dependencias: tabla xref, trailer y que cada offset
+# apunte a su "N 0 obj"; con pypdf instalado, además, que un parser estricto lo abra
+OBJ_RE = re.compile(rb'(\d+) 0 obj\n(.*?)\nendobj\n', re.S)
+
+@pytest.fixture(scope='module')
+def report(tmp_path_factory):
+    tmp = tmp_path_factory.mktemp('pdf')
+    prs = make_prs(120)
+    for pr in prs:
+        # Sin red: estados ya resueltos, así generate_pdf no consulta GraphQL
+        pr['state'] = 'merged' if pr.get('mergedAt') else pr.get('state', 'open')
+        pr['stateResolved'] = True
+    prs[0]['title'] = 'Bump ñandú-€ from 1.0.0 to 2.0.0'
+    rng = random.Random(3)
+    alerts = tmp / 'alerts.ndjson'
+    alerts.write_text(''.join(json.dumps(make_alert(rng, i + 1, datetime(2026, 1, 1, tzinfo=timezone.utc))) + '\n' for i in range(15)))
+    path = str(tmp / 'r.pdf')
+    result = build_pdf(prs, {'backend': 'builtin', 'pdf_path': path, 'alerts_file': str(alerts),
+                             'repository': 'acme/monorepo', 'repo': 'acme/monorepo'})
+    with open(path, 'rb') as f:
+        return result, f.read()
+
+def test_backend(report):
+    result, _ = report
+    assert result['backend'] == 'builtin'
+    assert (result['prs'], result['alerts']) == (120, 15)
+
+def test_xref_trailer(report):
+    _, data = report
+    assert data.startswith(b'%PDF-1.') and data.rstrip().endswith(b'%%EOF')
+    xref = int(re.search(rb'startxref\n(\d+)\n%%EOF\s*$', data).group(1))
+    assert data[xref:xref + 5] == b'xref\n'
+    head, rest = data[xref + 5:].split(b'\n', 1)
+    first, count = map(int, head.split())
+    entries = [rest[i * 20:(i + 1) * 20] for i in range(count)]
+    trailer = rest[count * 20:]
+    assert first == 0 and entries[0] == b'0000000000 65535 f \n'
+    size = int(re.search(rb'/Size (\d+)', trailer).group(1))
+    assert trailer.startswith(b'trailer\n') and size == count
+    for num, entry in enumerate(entries[1:], 1):
+        assert re.fullmatch(rb'\d{10} 00000 n \n', entry), entry
+        offset = int(entry[:10])
+        assert data[offset:offset + len(b'%d 0 obj\n' % num)] == b'%d 0 obj\n' % num
+    root = int(re.search(rb'/Root (\d+) 0 R', trailer).group(1))
+    assert b'/Type /Catalog' in dict((int(n), b) for n, b in OBJ_RE.findall(data))[root]
+
+def test_pages_and_streams(report):
+    _, data = report
+    objs = dict((int(n), b) for n, b in OBJ_RE.findall(data))
+    pages = [n for n, b in objs.items() if b.startswith(b'<< /Type /Page ')]
+    count = int(re.search(rb'/Type /Pages /Kids \[[^\]]*\] /Count (\d+)', data).group(1))
+    assert count == len(pages) > 1
+    for n in pages:
+        content = int(re.search(rb'/Contents (\d+) 0 R', objs[n]).group(1))
+        m = re.fullmatch(rb'<< /Length (\d+) /Filter /FlateDecode >>\nstream\n(.*)\nendstream', objs[content], re.S)
+        assert m and int(m.group(1)) == len(m.group(2))
+        assert b'BT' in zlib.decompress(m.group(2))
+
+def test_pypdf(report):
+    pypdf = pytest.importorskip('pypdf')
+    _, data = report
+    reader = pypdf.PdfReader(io.BytesIO(data), strict=True)
+    assert len(reader.pages) > 1
@@ -0,0 +1,39 @@
+import copy
+
+from pr_state import BATCH_SIZE, resolve_states
+from synthetic import make_prs
+
+# resolve_states: una consulta GraphQL por cada BATCH_SIZE PRs pendientes y el estado real aplicado a cada uno
+
+def listed(prs):
+    # Como los da el listado REST: los fusionados llegan como 'closed' y sin mergedAt
+    out = copy.deepcopy(prs)
+    for pr in out:
+        pr.pop('mergedAt', None)
+    return out
+
+def test_batches_and_states(api):
+    prs = make_prs(600)
+    state = api(prs)
+    records = listed(prs)
+    pending = [r for r in records if r['state'] == 'closed']
+    assert len(pending) > 2 * BATCH_SIZE
+    resolve_states(records, 'acme/monorepo')
+    assert state.calls == {'POST graphql': (len(pending) + BATCH_SIZE - 1) // BATCH_SIZE}
+    for pr, rec in zip(prs, records):
+        expected = 'merged' if pr.get('mergedAt') else pr['state']
+        assert (rec['state'], rec.get('mergedAt', '')) == (expected, pr.get('mergedAt', '')), pr['number']
+    assert all(r['stateResolved'] for r in pending)
+
+def test_only_pending(api):
+    # Abiertos con rama y PRs ya resueltos no se consultan; un número que GitHub no devuelve queda como estaba
+    prs = make_prs(50)
+    state = api(prs)
+    records = listed(prs)
+    for r in records:
+        r['stateResolved'] = r['state'] == 'closed'
+    records.append({'number': 9999, 'state': 'closed', 'headRefName': 'dependabot/npm_and_yarn/x-1.0.0'})
+    resolve_states(records, 'acme/monorepo')
+    assert state.calls == {'POST graphql': 1}
+    assert records[-1] == {'number': 9999, 'state': 'closed', 'headRefName': 'dependabot/npm_and_yarn/x-1.0.0'}
+    assert all(r['state'] in ('open', 'closed') for r in records)
@@ -0,0 +1,68 @@
+from datetime import datetime, timezone
+
+import pytest
+
+import trends
+from pr_records import normalize
+
+# Transiciones del upsert incremental de TrendStore._apply con runs diarios de fecha fija y lo que ve summary()
+REPO = 'acme/monorepo'
+TITLES = {'patch': 'Bump lodash from 4.17.20 to 4.17.21', 'minor': 'Bump axios from 1.6.0 to 1.7.0',
+          'major': 'Bump react from 17.0.2 to 18.0.0'}
+
+def pr(number, typ, created, state='open', merged='', closed=''):
+    return normalize({'number': number, 'title': TITLES[typ], 'url': f"https://github.com/{REPO}/pull/{number}",
+                      'createdAt': created, 'headRefName': f"dependabot/npm_and_yarn/pkg-{number}", 'state': state,
+                      'mergedAt': merged, 'closedAt': closed})
+
+def at(day):
+    return datetime(2026, 3, day, 6, tzinfo=timezone.utc)
+
+DAYS = {
+    # día 1: tres PRs abiertos
+    1: [pr(1, 'patch', '2026-03-01T02:00:00Z'), pr(2, 'patch', '2026-03-01T00:00:00Z'), pr(3, 'major', '2026-02-27T00:00:00Z')],
+    # día 2: #1 fusionado a las 24 h, #2 cerrado (sin resolver aún), #4 nuevo
+    2: [pr(1, 'patch', '2026-03-01T02:00:00Z', 'merged', merged='2026-03-02T02:00:00Z'),
+        pr(2, 'patch', '2026-03-01T00:00:00Z', 'closed', closed='2026-03-02T12:00:00Z'),
+        pr(3, 'major', '2026-02-27T00:00:00Z'), pr(4, 'minor', '2026-03-02T01:00:00Z')],
+    # día 3: #2 resulta fusionado (closed -> merged, 36 h) y #3 ya no aparece en el listado
+    3: [pr(1, 'patch', '2026-03-01T02:00:00Z', 'merged', merged='2026-03-02T02:00:00Z'),
+        pr(2, 'patch', '2026-03-01T00:00:00Z', 'merged', merged='2026-03-02T12:00:00Z'),
+        pr(4, 'minor', '2026-03-02T01:00:00Z')],
+}
+
+@pytest.fixture
+def store(tmp_path):
+    with trends.TrendStore(str(tmp_path / 'trends.sqlite')) as s:
+        for day, records in DAYS.items():
+            # Cada día dos runs: repetir el mismo día no cuenta dos veces los eventos
+            s.record(REPO, records, now=at(day), run_id=f"{day}a")
+            s.record(REPO, records, now=at(day), run_id=f"{day}b")
+        yield s
+
+def test_backlog_by_day(store):
+    assert store.summary(REPO, '2026-03-01')['backlog'] == {'major': [1, None, None, None], 'minor': [0, None, None, None],
+                                                           'patch': [2, None, None, None], 'other': [0, None, None, None]}
+    assert store.summary(REPO, '2026-03-02')['backlog']['patch'][0] == 0
+    s = store.summary(REPO)
+    assert (s['day'], s['runs'], s['since']) == ('2026-03-03', 3, '2026-03-01')
+    # #3 (open -> gone) sale del backlog aunque no se vea cerrarse
+    assert {k: v[0] for k, v in s['backlog'].items()} == {'major': 0, 'minor': 1, 'patch': 0, 'other': 0}
+    assert store.db.execute('SELECT state FROM prs WHERE repo=? AND number=3', (REPO,)).fetchone() == ('gone',)
+
+def test_flow(store):
+    # closed -> merged deshace el evento 'closed' de #2: dos merges y ningún cierre sin merge
+    flow = store.summary(REPO)['flow']
+    assert flow['patch'] == {'opened': 2, 'merged': 2, 'closed': 0}
+    assert flow['major'] == {'opened': 1, 'merged': 0, 'closed': 0}
+    assert flow['minor'] == {'opened': 1, 'merged': 0, 'closed': 0}
+    assert store.db.execute('SELECT SUM(closed) FROM pr_daily WHERE repo=?', (REPO,)).fetchone() == (0,)
+
+def test_merge_time(store):
+    # Histograma con 24 h y 36 h: mediana 24 h sobre 2 merges
+    assert store.summary(REPO)['merge_time'] == {'npm': {'patch': (24, 2)}}
+    assert sorted(store.db.execute('SELECT hours, n FROM merge_time WHERE repo=? AND n<>0', (REPO,))) == [(24, 1), (36, 1)]
+
+def test_no_runs(store):
+    assert store.summary('acme/otro') is None
+    assert store.summary(REPO, '2026-02-01') is None